@@ -0,0 +1,131 @@
+from Package import END_OF_DAY, PackageStatus
+import numpy
+
+
+# returns the bitset(a Python int) with bit i set for every True entry i of a boolean array
+# space-time complexity: O(N)
+def bits_from_mask(mask):
+    return int.from_bytes(numpy.packbits(mask, bitorder='little').tobytes(), 'little')
+
+
+# returns the boolean array of length size flagging the bits set in a bitset
+# space-time complexity: O(N)
+def mask_from_bits(bits, size):
+    packed = numpy.frombuffer(bits.to_bytes((size + 7) // 8, 'little'), dtype=numpy.uint8)
+    return numpy.unpackbits(packed, count=size, bitorder='little').astype(bool)
+
+
+# Typed constraint model compiled once from the package store's parsed Special Notes and the package/location index,
+# so screening a truck's packages takes a few bitset operations instead of passes over every package. A bitset is a
+# Python int whose bit i stands for row i of the package store. Packages that must be delivered together, directly or
+# through a chain of notes, form a co-delivery group: the union-find components of the notes. Loads are built from
+# location groups(every package delivered to one location). Availability times and truck restrictions are kept as
+# bitsets of the packages at the hub by each distinct availability time and of the packages each truck number may
+# carry. The model describes the packages as they were when it was compiled; the network compiles a new one when
+# packages, addresses or availability times change.
+class ConstraintModel:
+    # space-time complexity: O(N*log(N))
+    def __init__(self, package_store, loc_pack_index):
+        self.size = len(package_store.ids)
+        self.package_ids = numpy.array(package_store.ids, dtype=numpy.int64)
+        # rows in ascending package ID order
+        self.id_order = numpy.argsort(self.package_ids, kind='stable')
+        self.all_rows = (1 << self.size) - 1
+
+        # union-find over package rows
+        parent = list(range(self.size))
+
+        def find(row):
+            while parent[row] != row:
+                parent[row] = parent[parent[row]]
+                row = parent[row]
+            return row
+
+        for package_id, partner_ids in package_store.co_deliveries.items():
+            for partner_id in partner_ids:
+                if partner_id in package_store.index:
+                    parent[find(package_store.index[partner_id])] = find(package_store.index[package_id])
+        # co_group_of[row] is the co-delivery group of the package in row
+        roots = numpy.array([find(row) for row in range(self.size)], dtype=numpy.intp)
+        self.co_group_of = numpy.unique(roots, return_inverse=True)[1].reshape(-1)
+        co_group_sizes = numpy.bincount(self.co_group_of)
+        self.co_delivered = bits_from_mask(co_group_sizes[self.co_group_of] > 1)
+
+        # location_of[row] is the location ID of the package in row, or the number of locations if it has none
+        location_count = len(loc_pack_index.packages_at)
+        self.location_of = numpy.array([loc_pack_index.location_of.get(package_id, location_count)
+                                        for package_id in package_store.ids], dtype=numpy.intp)
+        self.location_sizes = numpy.bincount(self.location_of, minlength=location_count + 1)
+        self.located = bits_from_mask(self.location_of < location_count)
+
+        self.due_early = bits_from_mask(numpy.array(package_store.deadlines) < END_OF_DAY)
+        available_at = numpy.array(package_store.available_at)
+        # available_by[i] holds the packages at the hub by release_minutes[i]
+        self.release_minutes = numpy.unique(available_at)
+        self.available_by = [bits_from_mask(available_at <= minute) for minute in self.release_minutes]
+        required_trucks = numpy.array(package_store.required_trucks)
+        self.unrestricted = bits_from_mask(required_trucks == 0)
+        self.truck_only = {int(truck_number): bits_from_mask(required_trucks == truck_number)
+                           for truck_number in numpy.unique(required_trucks[required_trucks > 0])}
+
+    # returns the bitset of packages at the hub by the passed-in minute of the day
+    # space-time complexity: O(log(N))
+    def available_at(self, minute):
+        position = int(numpy.searchsorted(self.release_minutes, minute, side='right')) - 1
+        return self.available_by[position] if position >= 0 else 0
+
+    # returns the bitset of packages truck number truck_number may carry
+    # space-time complexity: O(1)
+    def allowed_on(self, truck_number):
+        return self.unrestricted | self.truck_only.get(truck_number, 0)
+
+    # returns the bitset of packages whose status in statuses(the package store's status column) is status
+    # space-time complexity: O(N)
+    def with_status(self, statuses, status):
+        return bits_from_mask(numpy.frombuffer(statuses, dtype=numpy.uint8) == status)
+
+    # returns the bitset of every package whose group, by group_of(co_group_of or location_of), has a package in bits
+    # space-time complexity: O(N)
+    def whole_groups(self, bits, group_of):
+        touched = numpy.zeros(group_of.max(initial=0) + 1, dtype=bool)
+        touched[group_of[mask_from_bits(bits, self.size)]] = True
+        return bits_from_mask(touched[group_of])
+
+    # returns the location IDs of the packages in bits, in ascending order
+    # space-time complexity: O(N)
+    def locations_in(self, bits):
+        return numpy.unique(self.location_of[mask_from_bits(bits, self.size)])
+
+    # returns the bitset of every package delivered to the passed-in locations
+    # space-time complexity: O(N)
+    def location_bits(self, loc_ids):
+        chosen = numpy.zeros(len(self.location_sizes), dtype=bool)
+        chosen[numpy.asarray(loc_ids, dtype=numpy.intp)] = True
+        return bits_from_mask(chosen[self.location_of])
+
+    # returns the set of package IDs in bits
+    # space-time complexity: O(N)
+    def package_ids_in(self, bits):
+        return set(self.package_ids[mask_from_bits(bits, self.size)].tolist())
+
+    # Screens the packages for truck number truck_number leaving at minute(minutes after midnight), with statuses the
+    # package store's status column. A package is left out if it, its location group or its co-delivery group has a
+    # package not at the hub by then, not allowed on the truck, already loaded/delivered or without a location; this
+    # is repeated until no group is split. Returns the bitsets (must-go, high priority, priority, regular): high
+    # priority location groups have a package in a co-delivery group, priority location groups have a package due
+    # before end of day, regular ones are the rest, and the must-go packages are the high priority & priority ones.
+    # space-time complexity: O(N) per pass
+    def screen(self, statuses, minute, truck_number):
+        eligible = (self.with_status(statuses, PackageStatus.AT_HUB) & self.available_at(minute) &
+                    self.allowed_on(truck_number) & self.located)
+        blocked = self.all_rows & ~eligible
+        while True:
+            closed = self.whole_groups(self.whole_groups(blocked, self.co_group_of), self.location_of)
+            if closed == blocked:
+                break
+            blocked = closed
+        candidates = self.all_rows & ~blocked
+        high_priority = self.whole_groups(candidates & self.co_delivered, self.location_of)
+        priority = self.whole_groups(candidates & ~high_priority & self.due_early, self.location_of)
+        regular = candidates & ~high_priority & ~priority
+        return high_priority | priority, high_priority, priority, regular
@@ -0,0 +1,199 @@
+# Distance providers: where a DeliveryNetwork gets its location descriptions & distance matrix from. DistanceTable
+# reads the hand-maintained distance CSV; RoadDistances computes the matrix from a road graph, so adding an address
+# only takes a line in an address book. A provider's load() returns (list of location descriptions, distance matrix),
+# the hub first.
+
+from concurrent.futures import ProcessPoolExecutor
+import Ingest
+import csv
+import heapq
+import numpy
+import os
+
+# road graph & target node numbers the worker process computes shortest paths on
+_worker_graph = None
+_worker_targets = None
+
+
+# reads the distance matrix from a distance CSV, through Ingest's cache
+class DistanceTable:
+    # space-time complexity: O(1)
+    def __init__(self, path='Distance Table.csv', cache_dir=Ingest.DEFAULT_CACHE_DIR):
+        self.path = path
+        self.cache_dir = cache_dir
+
+    # space-time complexity: O(N^2) cold, O(N) warm
+    def load(self):
+        return Ingest.load_distance_table(self.path, self.cache_dir)
+
+
+# Undirected road graph: roads[n] is a tuple of (node number, miles) pairs for the roads leaving node number n. number
+# maps each node's name in the edge list to its node number.
+class RoadGraph:
+    # space-time complexity: O(V + E*log(E))
+    def __init__(self, names, tails, heads, miles):
+        self.number = {name: number for number, name in enumerate(names)}
+        # every road can be driven both ways
+        tails, heads = numpy.concatenate((tails, heads)), numpy.concatenate((heads, tails))
+        miles = numpy.concatenate((miles, miles))
+        order = numpy.argsort(tails, kind='stable')
+        offsets = numpy.searchsorted(tails[order], numpy.arange(len(names) + 1)).tolist()
+        pairs = list(zip(heads[order].tolist(), miles[order].tolist()))
+        self.roads = [tuple(pairs[offsets[node]:offsets[node + 1]]) for node in range(len(names))]
+
+    # Dijkstra's algorithm from node number source, stopping once every target node number is settled. Returns the
+    # shortest distances to the targets, in targets order, numpy.inf for targets that cannot be reached.
+    # space-time complexity: O((V + E)*log(V))
+    def shortest_distances(self, source, targets):
+        roads = self.roads
+        distances = [numpy.inf] * len(roads)
+        distances[source] = 0.0
+        unsettled_targets = set(targets)
+        queue = [(0.0, source)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while queue and unsettled_targets:
+            distance, node = heappop(queue)
+            # a node is settled the first time it comes off the queue; later, longer entries are stale
+            if distance > distances[node]:
+                continue
+            unsettled_targets.discard(node)
+            for head, miles in roads[node]:
+                through = distance + miles
+                if through < distances[head]:
+                    distances[head] = through
+                    heappush(queue, (through, head))
+        return [distances[target] for target in targets]
+
+
+# Streams a road graph edge-list CSV with a from,to,miles header; each following row is a road between two named
+# nodes(any text) and its length. Raises ValueError for rows without 3 columns or non-numeric or negative lengths.
+# space-time complexity: O(V + E*log(E))
+def parse_road_graph(path):
+    names = {}
+    tails, heads, miles = [], [], []
+    with open(path, newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader)
+        for row in reader:
+            line = reader.line_num
+            if len(row) != 3:
+                raise ValueError('{}:{}: expected 3 columns, found {}'.format(path, line, len(row)))
+            try:
+                length = float(row[2])
+            except ValueError:
+                raise ValueError('{}:{}: length {!r} is not a number'.format(path, line, row[2])) from None
+            if length < 0:
+                raise ValueError('{}:{}: negative length {!r}'.format(path, line, row[2]))
+            tails.append(names.setdefault(row[0].strip(), len(names)))
+            heads.append(names.setdefault(row[1].strip(), len(names)))
+            miles.append(length)
+    return RoadGraph(list(names), numpy.array(tails, dtype=numpy.intp), numpy.array(heads, dtype=numpy.intp),
+                     numpy.array(miles))
+
+
+# Reads an address book CSV with an address,node header; each following row is a location's description(its street
+# address, matching the package CSV) and the road graph node it is at, the hub first. Returns (list of descriptions,
+# list of node names). Raises ValueError for rows without 2 columns or repeated addresses.
+# space-time complexity: O(N)
+def parse_address_book(path):
+    descriptions, nodes = [], []
+    with open(path, newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader)
+        for row in reader:
+            if len(row) != 2:
+                raise ValueError('{}:{}: expected 2 columns, found {}'.format(path, reader.line_num, len(row)))
+            descriptions.append(row[0].strip())
+            nodes.append(row[1].strip())
+    if len(set(descriptions)) != len(descriptions):
+        raise ValueError(path + ': address book repeats an address')
+    return descriptions, nodes
+
+
+# loads the road graph & the target nodes a worker process computes rows for
+# space-time complexity: O(V + E*log(E))
+def _init_worker(graph_path, target_nodes):
+    global _worker_graph, _worker_targets
+    _worker_graph = parse_road_graph(graph_path)
+    _worker_targets = [_worker_graph.number[node] for node in target_nodes]
+
+
+# returns the worker graph's shortest distances from the named node to the worker's target nodes
+# space-time complexity: O((V + E)*log(V))
+def _shortest_row(source_node):
+    return _worker_graph.shortest_distances(_worker_graph.number[source_node], _worker_targets)
+
+
+# Computes the distance matrix from a road graph edge list(graph_path) and an address book(address_path) placing each
+# location at a graph node; distances are shortest paths. Computed distances are kept in cache_dir, between every
+# pair of nodes addresses have been placed at, for as long as the edge list is unchanged, so a load only runs Dijkstra
+# from the nodes of newly added addresses; their columns follow from their rows as roads run both ways. With
+# workers > 1 those rows are computed in that many processes. computed_rows counts the rows the last load computed.
+class RoadDistances:
+    # space-time complexity: O(1)
+    def __init__(self, graph_path, address_path, cache_dir=Ingest.DEFAULT_CACHE_DIR, workers=1):
+        self.graph_path = graph_path
+        self.address_path = address_path
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.computed_rows = 0
+
+    # Returns (location descriptions, distance matrix) for the address book. Raises ValueError for addresses at nodes
+    # not in the road graph or that cannot reach one another.
+    # space-time complexity: O(A*(V + E)*log(V) / workers) for A new addresses, O(N^2) otherwise
+    def load(self):
+        descriptions, address_nodes = parse_address_book(self.address_path)
+        data_path, meta_path = Ingest.cache_paths(self.graph_path, self.cache_dir, '.npy')
+        metadata = Ingest.read_fresh_metadata(self.graph_path, data_path, meta_path)
+        nodes = metadata['nodes'] if metadata is not None else []
+        matrix = numpy.load(data_path) if metadata is not None else numpy.zeros((0, 0))
+
+        position = {node: i for i, node in enumerate(nodes)}
+        new_nodes = [node for node in dict.fromkeys(address_nodes) if node not in position]
+        self.computed_rows = len(new_nodes)
+        if new_nodes:
+            nodes = nodes + new_nodes
+            rows = self.shortest_rows(new_nodes, nodes)
+            cached_count = len(position)
+            grown = numpy.empty((len(nodes), len(nodes)))
+            grown[:cached_count, :cached_count] = matrix
+            grown[cached_count:] = rows
+            grown[:cached_count, cached_count:] = rows[:, :cached_count].T
+            # the two directions between new nodes can differ by rounding; keeps the matrix exactly symmetric
+            new_block = grown[cached_count:, cached_count:]
+            grown[cached_count:, cached_count:] = numpy.minimum(new_block, new_block.T)
+            matrix = grown
+            position = {node: i for i, node in enumerate(nodes)}
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(data_path + '.tmp', 'wb') as data_file:
+                numpy.save(data_file, matrix)
+            os.replace(data_path + '.tmp', data_path)
+            metadata = Ingest.source_metadata(self.graph_path)
+            metadata['nodes'] = nodes
+            Ingest.write_metadata(meta_path, metadata)
+
+        positions = [position[node] for node in address_nodes]
+        return descriptions, matrix[numpy.ix_(positions, positions)]
+
+    # Returns the matrix of shortest distances from each of the source nodes to each of the target nodes. Raises
+    # ValueError if a node is not in the road graph or a source cannot reach a target.
+    # space-time complexity: O(S*(V + E)*log(V) / workers)
+    def shortest_rows(self, source_nodes, target_nodes):
+        graph = parse_road_graph(self.graph_path)
+        missing = [node for node in dict.fromkeys(target_nodes) if node not in graph.number]
+        if missing:
+            raise ValueError('{}: no road graph node {}'.format(self.address_path, ', '.join(missing)))
+        if self.workers <= 1 or len(source_nodes) < 2:
+            targets = [graph.number[node] for node in target_nodes]
+            rows = [graph.shortest_distances(graph.number[node], targets) for node in source_nodes]
+        else:
+            workers = min(self.workers, len(source_nodes))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.graph_path, target_nodes)) as executor:
+                rows = list(executor.map(_shortest_row, source_nodes,
+                                         chunksize=max(1, len(source_nodes) // (4 * workers))))
+        rows = numpy.array(rows)
+        if numpy.isinf(rows).any():
+            raise ValueError('{}: some addresses cannot be reached from others on {}'.format(self.address_path,
+                                                                                             self.graph_path))
+        return rows
@@ -0,0 +1,302 @@
+from Package import PackageStatus
+import Route
+import Timer
+import numpy
+import random
+import time
+
+# minimum distance reduction for a fleet move to count as an improvement
+IMPROVEMENT_EPSILON = 1e-9
+
+
+# A delivery job: the packages that have to ride the same truck. Every package at a location shares its job, and
+# co-delivered packages pull their locations into one job. locs are the job's locations, earliest deadline first.
+class Job:
+    __slots__ = ('packages', 'locs', 'size', 'available_at', 'required_truck')
+
+    # space-time complexity: O(N)
+    def __init__(self, packages, locs, available_at, required_truck):
+        self.packages = frozenset(packages)
+        self.locs = locs
+        self.size = len(self.packages)
+        self.available_at = available_at
+        self.required_truck = required_truck
+
+
+# One truck's route while the fleet is being planned: the truck, its departure in minutes after midnight, the
+# locations visited between leaving & returning to the hub, the jobs on board, the package count and the distance.
+class FleetRoute:
+    __slots__ = ('truck', 'number', 'depart', 'stops', 'jobs', 'load', 'distance')
+
+    # space-time complexity: O(1)
+    def __init__(self, truck):
+        self.truck = truck
+        self.number = truck.number
+        self.depart = Timer.minutes_after_midnight(truck.current_time)
+        self.stops = []
+        self.jobs = set()
+        self.load = 0
+        self.distance = 0.0
+
+
+# Plans every truck's route together as one capacitated vehicle-routing problem with deadlines, instead of letting
+# each truck grab a load in turn. Packages still at the hub are grouped into jobs, inserted one job at a time(earliest
+# deadline first) where they add the least distance, and then improved until time_budget seconds have passed by moving
+# jobs between routes(relocate), swapping jobs between routes(exchange) and finally 2-opt/Or-opt within each route.
+# A job may only ride a truck that leaves after its packages reach the hub, that its notes allow, and that has room
+# for it within capacity packages; every stop must be reached by its earliest package deadline. Moves only look at
+# routes visiting one of a job's neighbor_count closest locations, so a pass stays close to linear in the number of
+# jobs. seed makes the improvement order reproducible.
+class FleetPlanner:
+    # space-time complexity: O(N^2*log(N))
+    def __init__(self, trucks, capacity=16, speed=18.0, time_budget=1.0, neighbor_count=16, seed=None):
+        self.trucks = trucks
+        self.network = trucks[0].network
+        self.capacity = capacity
+        self.minutes_per_mile = 60.0 / speed
+        self.time_budget = time_budget
+        self.rng = random.Random(seed)
+        self.distance_matrix = numpy.asarray(self.network.distance_matrix)
+        self.routes = [FleetRoute(truck) for truck in trucks]
+        self.route_of_job = {}
+        self.route_of_loc = {}
+        self.stop_deadlines = self.network.stop_deadlines
+        self.jobs = self.create_jobs()
+        job_locs = sorted(loc for job in self.jobs for loc in job.locs)
+        self.neighbors = Route.neighbor_lists(self.distance_matrix, job_locs, neighbor_count) if job_locs else {}
+
+    # groups the packages still at the hub into jobs: locations are merged(union-find) whenever a package must be
+    # delivered with a package at another location
+    # space-time complexity: O(N*log(N))
+    def create_jobs(self):
+        store = self.network.package_store
+        loc_pack_index = self.network.loc_pack_index
+        at_hub = store.with_status(PackageStatus.AT_HUB)
+        # packages whose street matches no location can go on no route
+        self.unlocated = at_hub - loc_pack_index.location_of.keys()
+        parent = {loc: loc for loc in loc_pack_index.locations_of(at_hub)}
+
+        def find(loc):
+            while parent[loc] != loc:
+                parent[loc] = parent[parent[loc]]
+                loc = parent[loc]
+            return loc
+
+        for package_id in at_hub & store.co_deliveries.keys() & loc_pack_index.location_of.keys():
+            for partner_id in store.co_deliveries[package_id]:
+                if partner_id in at_hub and partner_id in loc_pack_index.location_of:
+                    partner_root = find(loc_pack_index.location_of[partner_id])
+                    parent[partner_root] = find(loc_pack_index.location_of[package_id])
+
+        job_locs = {}
+        for loc in parent:
+            job_locs.setdefault(find(loc), []).append(loc)
+        jobs = []
+        for locs in job_locs.values():
+            packages = set()
+            for loc in locs:
+                packages |= loc_pack_index.packages_at[loc] & at_hub
+            rows = [store.index[package_id] for package_id in packages]
+            required_trucks = {store.required_trucks[row] for row in rows} - {0}
+            # a job whose notes name two different trucks can never be assigned
+            required_truck = required_trucks.pop() if len(required_trucks) == 1 else (-1 if required_trucks else 0)
+            locs.sort(key=lambda loc: (self.stop_deadlines[loc], loc))
+            jobs.append(Job(packages, locs, max(store.available_at[row] for row in rows), required_truck))
+        jobs.sort(key=lambda job: (self.stop_deadlines[job.locs[0]], -self.distance_matrix[0, job.locs].max()))
+        return jobs
+
+    # returns whether the job's packages may ride on the route's truck
+    # space-time complexity: O(1)
+    def eligible(self, route, job):
+        return job.available_at <= route.depart and job.required_truck in (0, route.number)
+
+    # Returns (added distance, new stops) for the cheapest feasible way to add every location of the job to the
+    # passed-in stops of route, or None if the job does not fit. Locations are inserted one at a time.
+    # space-time complexity: O(N)
+    def job_insertion(self, route, stops, load, job):
+        if load + job.size > self.capacity or not self.eligible(route, job):
+            return None
+        stops = list(stops)
+        added = 0.0
+        for loc in job.locs:
+            insertion = Route.cheapest_insertion(self.distance_matrix, self.stop_deadlines, self.minutes_per_mile,
+                                                 route.depart, stops, loc)
+            if insertion is None:
+                return None
+            added += insertion[0]
+            stops.insert(insertion[1], loc)
+        return added, stops
+
+    # returns whether every stop of a route leaving the hub at depart is reached by its deadline
+    # space-time complexity: O(N)
+    def feasible(self, depart, stops):
+        path = numpy.array([0] + list(stops), dtype=numpy.intp)
+        arrivals = depart + numpy.cumsum(self.distance_matrix[path[:-1], path[1:]]) * self.minutes_per_mile
+        return bool((arrivals <= self.stop_deadlines[path[1:]] + IMPROVEMENT_EPSILON).all())
+
+    # returns the distance of a route leaving the hub, visiting stops and returning
+    # space-time complexity: O(N)
+    def route_distance(self, stops):
+        return Route.tour_distance(self.distance_matrix, [0] + stops + [0])
+
+    # Returns (removed distance, remaining stops) for taking the job off its route, or None if the shorter route would
+    # reach some stop after its deadline(possible when distances break the triangle inequality).
+    # space-time complexity: O(N)
+    def job_removal(self, route, job):
+        stops = [loc for loc in route.stops if loc not in job.locs]
+        if not self.feasible(route.depart, stops):
+            return None
+        return route.distance - self.route_distance(stops), stops
+
+    # returns the routes worth trying for the job: routes visiting a near neighbor of its locations, plus one empty
+    # route per departure time(empty routes with the same departure are interchangeable for unrestricted jobs)
+    # space-time complexity: O(N)
+    def candidate_routes(self, job):
+        candidates = {id(route): route for loc in job.locs for neighbor in self.neighbors[loc]
+                      for route in (self.route_of_loc.get(neighbor),) if route is not None}
+        departures = set()
+        for route in self.routes:
+            if not route.stops and (job.required_truck == route.number or route.depart not in departures):
+                departures.add(route.depart)
+                candidates[id(route)] = route
+        return list(candidates.values())
+
+    # places a job on a route with the passed-in stops, keeping the job & location lookups current
+    # space-time complexity: O(N)
+    def assign(self, job, route, stops):
+        route.stops = stops
+        route.jobs.add(job)
+        route.load += job.size
+        route.distance = self.route_distance(stops)
+        self.route_of_job[job] = route
+        for loc in job.locs:
+            self.route_of_loc[loc] = route
+
+    # takes a job off its route, leaving the route with the passed-in stops
+    # space-time complexity: O(N)
+    def unassign(self, job, stops):
+        route = self.route_of_job.pop(job)
+        route.stops = stops
+        route.jobs.discard(job)
+        route.load -= job.size
+        route.distance = self.route_distance(stops)
+        for loc in job.locs:
+            del self.route_of_loc[loc]
+
+    # inserts a job where it adds the least distance among routes, returning whether it fit anywhere
+    # space-time complexity: O(T*N)
+    def insert_job(self, job, routes):
+        best = None
+        for route in routes:
+            insertion = self.job_insertion(route, route.stops, route.load, job)
+            if insertion is not None and (best is None or insertion[0] < best[0]):
+                best = insertion[0], insertion[1], route
+        if best is None:
+            return False
+        self.assign(job, best[2], best[1])
+        return True
+
+    # moves the job to the route where it adds the least distance, if that is less than its current route saves by
+    # dropping it
+    # space-time complexity: O(T*N)
+    def relocate(self, job):
+        route = self.route_of_job[job]
+        removal = self.job_removal(route, job)
+        if removal is None:
+            return False
+        best = None
+        for other in self.candidate_routes(job):
+            if other is route:
+                continue
+            insertion = self.job_insertion(other, other.stops, other.load, job)
+            if insertion is not None and insertion[0] < removal[0] - IMPROVEMENT_EPSILON and \
+                    (best is None or insertion[0] < best[0]):
+                best = insertion[0], insertion[1], other
+        if best is None:
+            return False
+        self.unassign(job, removal[1])
+        self.assign(job, best[2], best[1])
+        return True
+
+    # swaps the job with a job on another route if that shortens the two routes together
+    # space-time complexity: O(T*N^2)
+    def exchange(self, job):
+        route = self.route_of_job[job]
+        removal = self.job_removal(route, job)
+        if removal is None:
+            return False
+        best = None
+        for other_route in self.candidate_routes(job):
+            if other_route is route:
+                continue
+            for other_job in other_route.jobs:
+                other_removal = self.job_removal(other_route, other_job)
+                if other_removal is None:
+                    continue
+                there = self.job_insertion(other_route, other_removal[1], other_route.load - other_job.size, job)
+                if there is None:
+                    continue
+                here = self.job_insertion(route, removal[1], route.load - job.size, other_job)
+                if here is None:
+                    continue
+                change = there[0] + here[0] - removal[0] - other_removal[0]
+                if change < -IMPROVEMENT_EPSILON and (best is None or change < best[0]):
+                    best = change, other_route, other_job, removal[1], other_removal[1], here[1], there[1]
+        if best is None:
+            return False
+        change, other_route, other_job, stops, other_stops, new_stops, new_other_stops = best
+        self.unassign(job, stops)
+        self.unassign(other_job, other_stops)
+        self.assign(other_job, route, new_stops)
+        self.assign(job, other_route, new_other_stops)
+        return True
+
+    # Plans the fleet and hands each truck its route, ready for Truck.deliver_packages. A truck's baseline is the
+    # nearest neighbor tour over its route's stops, as in sequential planning. Returns the set of package IDs no truck
+    # could take, those without a location included.
+    # space-time complexity: O(J*T*N) to construct, then bounded by time_budget
+    def plan(self):
+        end_time = time.perf_counter() + self.time_budget
+        unassigned = []
+        for job in self.jobs:
+            if not (self.insert_job(job, self.candidate_routes(job)) or self.insert_job(job, self.routes)):
+                unassigned.append(job)
+
+        # inter-route improvement: passes over the jobs in random order until a pass changes nothing
+        improved = True
+        while improved and time.perf_counter() < end_time:
+            improved = False
+            for job in self.rng.sample(self.jobs, len(self.jobs)):
+                if time.perf_counter() >= end_time:
+                    break
+                if job not in self.route_of_job:
+                    if self.insert_job(job, self.routes):
+                        unassigned.remove(job)
+                        improved = True
+                elif self.relocate(job) or self.exchange(job):
+                    improved = True
+
+        # intra-route improvement, sharing what is left of the budget between the routes
+        for i, route in enumerate(self.routes):
+            time_left = max(end_time - time.perf_counter(), 0.0) / (len(self.routes) - i)
+            windows = Route.TimeWindows(self.distance_matrix, self.stop_deadlines, route.depart, self.minutes_per_mile)
+            tour = Route.improve_route(self.distance_matrix, [0] + route.stops + [0], time_budget=time_left,
+                                       windows=windows)
+            route.stops = tour[1:-1]
+            route.distance = self.route_distance(route.stops)
+
+        stop_masks = numpy.zeros((len(self.routes), len(self.distance_matrix)), dtype=bool)
+        for row, route in enumerate(self.routes):
+            stop_masks[row, route.stops] = True
+        baselines, baseline_tours = Route.batch_nearest_neighbor(self.distance_matrix, stop_masks,
+                                                                 self.network.nearest_neighbors)
+        for route, baseline, baseline_tour in zip(self.routes, baselines, baseline_tours):
+            truck = route.truck
+            truck.route = [0] + route.stops + [0]
+            truck.destination_table = numpy.array(sorted([0] + route.stops), dtype=numpy.intp)
+            truck.load = set().union(*(job.packages for job in route.jobs))
+            truck.package_set_list = [set(truck.load)]
+            truck.baseline_distance = float(baseline)
+            truck.nearest_neighbor_tour = [int(loc) for loc in baseline_tour]
+            truck.lateness = truck.package_lateness(truck.route)
+        return self.unlocated.union(*(job.packages for job in unassigned))
@@ -1,3 +1,6 @@
+from array import array
+
+
 # implements a chaining hashtable to use as base data structure for storing package & location data
 class ChainingHashTable:
     # constructor creates a list of initially empty lists
@@ -64,3 +67,157 @@ class ChainingHashTable:
                     bucket_list.remove(entry)
                     return True
         return False
+
+    # returns, for every stored key, how many entries a lookup of it compares(its position in its bucket, plus 1)
+    # space-time complexity: O(N)
+    def probe_lengths(self):
+        return [position + 1 for bucket_list in self.table if bucket_list for position in range(len(bucket_list))]
+
+
+# implements an open-addressing(linear probing) hashtable with the same insert/update/lookup/remove interface as
+# ChainingHashTable. Keys must be non-negative integers or numeric strings and are stored as integers in a flat array,
+# with values in a parallel list. The table doubles in size whenever it becomes more than max_load full, so operations
+# stay O(1) on average however many packages are inserted.
+class OpenAddressingHashTable:
+    __slots__ = ('keys_array', 'values', 'count', 'used', 'max_load', 'shift')
+
+    # marks a slot that has never held a key
+    EMPTY = -1
+    # marks a slot whose key was removed; probing continues past it
+    DELETED = -2
+
+    # constructor sizes the table to hold initial_cap keys without resizing
+    # space-time complexity: O(N)
+    def __init__(self, initial_cap=8, max_load=0.5):
+        self.max_load = max_load
+        capacity = 8
+        while capacity * max_load < initial_cap:
+            capacity *= 2
+        self.allocate(capacity)
+
+    # replaces the table's storage with capacity empty slots; capacity must be a power of 2
+    # space-time complexity: O(N)
+    def allocate(self, capacity):
+        self.keys_array = array('q', [OpenAddressingHashTable.EMPTY]) * capacity
+        self.values = [None] * capacity
+        self.count = 0
+        self.used = 0
+        self.shift = 64 - (capacity.bit_length() - 1)
+
+    # hash function spreads the integer key across the table with Fibonacci(multiplicative) hashing
+    # space-time complexity: O(1)
+    def hash_key(self, key):
+        return ((int(key) * 11400714819323198485) & 0xFFFFFFFFFFFFFFFF) >> self.shift
+
+    # returns the slot holding the passed-in key, or -1 if the key is not in the table
+    # space-time complexity: O(1) average
+    def find_slot(self, key):
+        int_key = int(key)
+        keys_array = self.keys_array
+        mask = len(keys_array) - 1
+        slot = self.hash_key(int_key)
+        while True:
+            slot_key = keys_array[slot]
+            if slot_key == int_key:
+                return slot
+            if slot_key == OpenAddressingHashTable.EMPTY:
+                return -1
+            slot = (slot + 1) & mask
+
+    # inserts a passed-in value under the passed-in key, replacing the value of an existing key
+    # space-time complexity: O(1) average
+    def insert(self, key, value):
+        int_key = int(key)
+        if int_key < 0:
+            raise ValueError('OpenAddressingHashTable keys must be non-negative: ' + str(key))
+        slot = self.find_slot(int_key)
+        if slot >= 0:
+            self.values[slot] = value
+            return True
+        if self.used + 1 > len(self.keys_array) * self.max_load:
+            # doubles the table unless removed-key markers account for most of the used slots
+            capacity = len(self.keys_array)
+            if self.count + 1 > capacity * self.max_load / 2:
+                capacity *= 2
+            self.resize(capacity)
+        keys_array = self.keys_array
+        mask = len(keys_array) - 1
+        slot = self.hash_key(int_key)
+        # reuses the first removed or empty slot on the probe path
+        while keys_array[slot] >= 0:
+            slot = (slot + 1) & mask
+        if keys_array[slot] == OpenAddressingHashTable.EMPTY:
+            self.used += 1
+        keys_array[slot] = int_key
+        self.values[slot] = value
+        self.count += 1
+        return True
+
+    # rehashes every key into a new table of the passed-in capacity, dropping removed-key markers
+    # space-time complexity: O(N)
+    def resize(self, capacity):
+        old_keys, old_values = self.keys_array, self.values
+        self.allocate(capacity)
+        for slot, slot_key in enumerate(old_keys):
+            if slot_key >= 0:
+                self.insert(slot_key, old_values[slot])
+
+    # replaces existing value with passed-in value at list index corresponding to the passed-in key
+    # space-time complexity: O(1) average
+    def update(self, key, value):
+        slot = self.find_slot(key)
+        if slot < 0:
+            print('Error attempting to update key: ' + str(key))
+        else:
+            # value specifically pertaining to package hashtable delivery_status column
+            self.values[slot][8] = value
+            return True
+
+    # hashtable lookup function: returns value corresponding to passed-in key
+    # space-time complexity: O(1) average
+    def lookup(self, key):
+        slot = self.find_slot(key)
+        if slot < 0:
+            return None
+        return self.values[slot]
+
+    # removes a value from the hashtable corresponding to passed-in key
+    # space-time complexity: O(1) average
+    def remove(self, key):
+        slot = self.find_slot(key)
+        if slot < 0:
+            return False
+        self.keys_array[slot] = OpenAddressingHashTable.DELETED
+        self.values[slot] = None
+        self.count -= 1
+        return True
+
+    # returns the number of keys in the table
+    # space-time complexity: O(1)
+    def __len__(self):
+        return self.count
+
+    # returns, for every stored key, how many slots a lookup of it inspects(its distance from its home slot, plus 1)
+    # space-time complexity: O(N)
+    def probe_lengths(self):
+        mask = len(self.keys_array) - 1
+        return [((slot - self.hash_key(slot_key)) & mask) + 1 for slot, slot_key in enumerate(self.keys_array)
+                if slot_key >= 0]
+
+    # returns the table's keys(as integers) in ascending order
+    # space-time complexity: O(N*log(N))
+    def keys(self):
+        return sorted(slot_key for slot_key in self.keys_array if slot_key >= 0)
+
+    # yields (key, value) pairs in slot order, without sorting them
+    # space-time complexity: O(N)
+    def slot_items(self):
+        values = self.values
+        for slot, slot_key in enumerate(self.keys_array):
+            if slot_key >= 0:
+                yield slot_key, values[slot]
+
+    # returns (key, value) pairs in ascending key order
+    # space-time complexity: O(N*log(N))
+    def items(self):
+        return sorted((slot_key, self.values[slot]) for slot, slot_key in enumerate(self.keys_array) if slot_key >= 0)
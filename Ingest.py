@@ -0,0 +1,181 @@
+import Timer
+import csv
+import hashlib
+import json
+import numpy
+import os
+import pickle
+
+# bump whenever the layout of the cached files changes so stale caches are rebuilt
+CACHE_VERSION = 1
+# directory, relative to the working directory, that holds cached copies of parsed CSV files
+DEFAULT_CACHE_DIR = '.tsp_cache'
+
+
+# returns the SHA-256 hex digest of a file, read in 1 MiB blocks
+# space-time complexity: O(N)
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Returns the (data, metadata) file paths caching the passed-in source file. They are named after the file and a hash
+# of its absolute path, so sources sharing a file name in different directories get separate caches.
+# space-time complexity: O(1)
+def cache_paths(source_path, cache_dir, extension):
+    stem = os.path.splitext(os.path.basename(source_path))[0].replace(' ', '_')
+    stem += '_' + hashlib.sha256(os.path.abspath(source_path).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, stem + extension), os.path.join(cache_dir, stem + '.json')
+
+
+# Returns the cache metadata if the cache of source_path is current, else None. A cache is current when it has the
+# current CACHE_VERSION, was made from the same absolute path, and either the source's size & mtime are unchanged, or
+# its contents hash to the same SHA-256(e.g. after a fresh checkout), in which case the recorded mtime is refreshed.
+# space-time complexity: O(N)
+def read_fresh_metadata(source_path, data_path, meta_path):
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path) as meta_file:
+            metadata = json.load(meta_file)
+    except ValueError:
+        return None
+    if metadata.get('version') != CACHE_VERSION or metadata.get('source') != os.path.abspath(source_path):
+        return None
+    stat = os.stat(source_path)
+    if stat.st_size == metadata['size'] and stat.st_mtime_ns == metadata['mtime_ns']:
+        return metadata
+    if file_sha256(source_path) == metadata['sha256']:
+        metadata['size'], metadata['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+        write_metadata(meta_path, metadata)
+        return metadata
+    return None
+
+
+# writes cache metadata through a temporary file so readers never see a partial file
+# space-time complexity: O(1)
+def write_metadata(meta_path, metadata):
+    temp_path = meta_path + '.tmp'
+    with open(temp_path, 'w') as meta_file:
+        json.dump(metadata, meta_file)
+    os.replace(temp_path, meta_path)
+
+
+# returns fresh cache metadata describing the passed-in source file
+# space-time complexity: O(N)
+def source_metadata(source_path):
+    stat = os.stat(source_path)
+    return {'version': CACHE_VERSION, 'source': os.path.abspath(source_path), 'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(source_path)}
+
+
+# Streams the distance CSV one row at a time into a float64 matrix. The header row fixes the number of locations; each
+# following row holds a location's street address and its distance to every location, with blank cells allowed where
+# the table is only filled in on one side of the diagonal. Blank cells are mirrored from the opposite triangle.
+# Raises ValueError for ragged rows, non-numeric or negative distances, disagreeing mirrored cells, or pairs missing
+# on both sides. Returns (list of location descriptions, distance matrix).
+# space-time complexity: O(N^2)
+def parse_distance_csv(path):
+    with open(path, newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader)
+        size = len(header) - 1
+        distance_matrix = numpy.full((size, size), numpy.nan)
+        descriptions = []
+        for loc_id, row in enumerate(reader):
+            line = reader.line_num
+            if loc_id >= size:
+                raise ValueError('{}:{}: more location rows than header columns'.format(path, line))
+            if len(row) != size + 1:
+                raise ValueError('{}:{}: expected {} columns, found {}'.format(path, line, size + 1, len(row)))
+            descriptions.append(row[0].strip())
+            for j, elem in enumerate(row[1:]):
+                if elem.strip():
+                    try:
+                        distance_matrix[loc_id, j] = float(elem)
+                    except ValueError:
+                        raise ValueError('{}:{}: distance {!r} is not a number'.format(path, line, elem)) from None
+    if len(descriptions) != size:
+        raise ValueError('{}: expected {} location rows, found {}'.format(path, size, len(descriptions)))
+
+    mirrored = numpy.where(numpy.isnan(distance_matrix), distance_matrix.T, distance_matrix)
+    numpy.fill_diagonal(mirrored, 0.0)
+    if numpy.isnan(mirrored).any():
+        raise ValueError(path + ': distance table is missing both entries for at least one pair of locations')
+    if (mirrored < 0).any():
+        raise ValueError(path + ': distance table contains negative distances')
+    both_given = ~numpy.isnan(distance_matrix) & ~numpy.isnan(distance_matrix.T)
+    if not numpy.allclose(distance_matrix[both_given], distance_matrix.T[both_given]):
+        raise ValueError(path + ': distance table is not symmetric')
+    return descriptions, mirrored
+
+
+# Returns (location descriptions, distance matrix) for the distance CSV. The first load parses the CSV and writes the
+# matrix to cache_dir as an .npy file; later loads memory-map that file read-only as long as the CSV is unchanged.
+# space-time complexity: O(N^2) cold, O(N) warm
+def load_distance_table(path='Distance Table.csv', cache_dir=DEFAULT_CACHE_DIR):
+    data_path, meta_path = cache_paths(path, cache_dir, '.npy')
+    metadata = read_fresh_metadata(path, data_path, meta_path)
+    if metadata is not None:
+        return metadata['locations'], numpy.load(data_path, mmap_mode='r')
+
+    descriptions, distance_matrix = parse_distance_csv(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(data_path + '.tmp', 'wb') as data_file:
+        numpy.save(data_file, distance_matrix)
+    os.replace(data_path + '.tmp', data_path)
+    metadata = source_metadata(path)
+    metadata['locations'] = descriptions
+    write_metadata(meta_path, metadata)
+    return descriptions, distance_matrix
+
+
+# Streams the package CSV one row at a time, returning a list of (package ID, street, city, state, zip, deadline,
+# mass, notes) tuples. Raises ValueError for rows without 8 columns, non-integer or duplicate package IDs, deadlines
+# that are neither 'EOD' nor a time like '10:30 AM', and non-numeric masses.
+# space-time complexity: O(N)
+def parse_package_csv(path):
+    rows = []
+    seen_ids = set()
+    with open(path, newline='') as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader)
+        for row in reader:
+            line = reader.line_num
+            if len(row) != 8:
+                raise ValueError('{}:{}: expected 8 columns, found {}'.format(path, line, len(row)))
+            if not row[0].strip().isdigit() or int(row[0]) in seen_ids:
+                raise ValueError('{}:{}: invalid or duplicate package ID {!r}'.format(path, line, row[0]))
+            seen_ids.add(int(row[0]))
+            if row[5] != 'EOD':
+                try:
+                    Timer.parse_minutes(row[5])
+                except ValueError:
+                    raise ValueError('{}:{}: invalid deadline {!r}'.format(path, line, row[5])) from None
+            try:
+                float(row[6])
+            except ValueError:
+                raise ValueError('{}:{}: invalid mass {!r}'.format(path, line, row[6])) from None
+            rows.append(tuple(row))
+    return rows
+
+
+# Returns the package CSV's rows as parsed by parse_package_csv. The first load writes them to cache_dir as a compact
+# pickle; later loads read that file instead as long as the CSV is unchanged.
+# space-time complexity: O(N)
+def load_package_rows(path='Package File.csv', cache_dir=DEFAULT_CACHE_DIR):
+    data_path, meta_path = cache_paths(path, cache_dir, '.pkl')
+    if read_fresh_metadata(path, data_path, meta_path) is not None:
+        with open(data_path, 'rb') as data_file:
+            return pickle.load(data_file)
+
+    rows = parse_package_csv(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(data_path + '.tmp', 'wb') as data_file:
+        pickle.dump(rows, data_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(data_path + '.tmp', data_path)
+    write_metadata(meta_path, source_metadata(path))
+    return rows
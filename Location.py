@@ -1,36 +1,67 @@
-from HashTable import ChainingHashTable
-import csv
+from HashTable import OpenAddressingHashTable
 
 
-# creates 27-key hashtable and reads in data from location csv file
+# creates location hashtable sized for the number of locations(growing as needed). Each location ID maps to its street
+# address and its row of the distance matrix, as loaded by Ingest.load_distance_table.
 # space-time complexity: O(N)
-def create_location_table():
-    loc_table = ChainingHashTable(27)
-    with open('Distance Table.csv', newline='') as csvfile:
-        reader = csv.reader(csvfile)
-        next(reader)
-        i = 0
-        for row in reader:
-            loc_id = i
-            loc_description = row[0]
-            distances = row[1:]
-
-            key = loc_id
-            value = loc_description, distances
-
-            loc_table.insert(key, value)
-            i += 1
+def create_location_table(loc_descriptions, distance_matrix):
+    loc_table = OpenAddressingHashTable(len(loc_descriptions))
+    for loc_id, loc_description in enumerate(loc_descriptions):
+        key = loc_id
+        value = loc_description, distance_matrix[loc_id]
+
+        loc_table.insert(key, value)
     return loc_table
 
 
-# creates 27-key hashtable to associate packages with locations
+# Bidirectional index between packages and locations. location_of maps a package ID to the ID of the location it is
+# delivered to, and packages_at[loc_id] is the frozenset of package IDs delivered to that location. Packages whose
+# street matches no location are in neither, and lookups over several packages skip them.
+class LocationPackageIndex:
+    __slots__ = ('location_of', 'packages_at')
+
+    # space-time complexity: O(N)
+    def __init__(self, location_of, location_count):
+        self.location_of = location_of
+        packages_at = [set() for _ in range(location_count)]
+        for package_id, loc_id in location_of.items():
+            packages_at[loc_id].add(package_id)
+        self.packages_at = [frozenset(packages) for packages in packages_at]
+
+    # returns the IDs of the locations the passed-in packages are delivered to, skipping packages without a location
+    # space-time complexity: O(N)
+    def locations_of(self, package_ids):
+        location_of = self.location_of
+        return {location_of[package_id] for package_id in package_ids if package_id in location_of}
+
+    # (re)assigns a package to the passed-in location, taking it off its previous location if it had one
+    # space-time complexity: O(N) in the packages at the two locations
+    def assign(self, package_id, loc_id):
+        old_loc_id = self.location_of.get(package_id)
+        if old_loc_id is not None:
+            self.packages_at[old_loc_id] = self.packages_at[old_loc_id] - {package_id}
+        self.location_of[package_id] = loc_id
+        self.packages_at[loc_id] = self.packages_at[loc_id] | {package_id}
+
+    # returns the IDs of every package delivered to the same location as any of the passed-in packages
+    # space-time complexity: O(N)
+    def location_groups(self, package_ids):
+        groups = set()
+        for loc_id in self.locations_of(package_ids):
+            groups |= self.packages_at[loc_id]
+        return groups
+
+
+# creates the package/location index in one hashed pass: each location's street address is hashed once, then every
+# package is matched to its location by looking up its street
 # space-time complexity: O(N)
-def create_loc_package_table(loc_table, package_table):
-    loc_pack_table = ChainingHashTable(27)
-    for location in loc_table.table:
-        for package in package_table.table:
-            # checks matching street addresses between loc_table & package_table and populates loc_pack_table with
-            # the resulting integers. Each location ID indexes a list of matching package IDs.
-            if location[0][1][0] == package[0][1][1]:
-                loc_pack_table.table[int(location[0][0])].append(int(package[0][0]))
-    return loc_pack_table
+def create_loc_package_index(loc_table, package_table):
+    loc_by_street = {location[0]: loc_id for loc_id, location in loc_table.items()}
+    location_of = {}
+    for package_id, package in package_table.items():
+        loc_id = loc_by_street.get(package[1])
+        if loc_id is None:
+            print('Error: no location found for package ' + str(package_id) + ' at ' + package[1])
+        else:
+            location_of[package_id] = loc_id
+    return LocationPackageIndex(location_of, len(loc_table))
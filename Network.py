@@ -0,0 +1,193 @@
+from Constraints import ConstraintModel
+from RouteCache import RouteCache
+import Distance
+import Ingest
+import Location
+import Package
+import Route
+import Telemetry
+import functools
+import hashlib
+import numpy
+
+# shared network used by trucks created without one; see default_network()
+_default_network = None
+
+
+# Holds everything planning reads about one depot: the distance matrix & location descriptions, the package & location
+# hashtables, the package store, the package/location index and per-location deadlines. Nothing is loaded until first
+# used. Data comes from the CSV paths(through Ingest's cache), or from in-memory loc_descriptions, distance_matrix &
+# package_rows(rows in the package CSV's column order), which skip the files entirely. A distance_provider(see
+# Distance.py, e.g. Distance.RoadDistances) supplies the locations & distances in place of the distance CSV. Pass one
+# network to every Truck that plans against it; call reset_statuses() to reuse a warm network for a new plan. Trucks
+# memoize evaluated candidate routes in route_cache, holding up to route_cache_size entries; with route_cache_path, the
+# cache starts from the routes saved there by save_route_cache() on an earlier run over the same distance matrix.
+class DeliveryNetwork:
+    # space-time complexity: O(1)
+    def __init__(self, distance_path='Distance Table.csv', package_path='Package File.csv',
+                 cache_dir=Ingest.DEFAULT_CACHE_DIR, loc_descriptions=None, distance_matrix=None, package_rows=None,
+                 route_cache_size=4096, route_cache_path=None, distance_provider=None):
+        self.distance_path = distance_path
+        self.package_path = package_path
+        self.cache_dir = cache_dir
+        self.route_cache_size = route_cache_size
+        self.route_cache_path = route_cache_path
+        if distance_provider is None:
+            distance_provider = Distance.DistanceTable(distance_path, cache_dir)
+        self.distance_provider = distance_provider
+        self._distance_data = None if distance_matrix is None else (list(loc_descriptions), distance_matrix)
+        self._package_rows = None if package_rows is None else list(package_rows)
+
+    # (location descriptions, distance matrix), loaded on first use
+    # space-time complexity: O(N^2) on first use, O(1) after
+    @property
+    def distance_data(self):
+        if self._distance_data is None:
+            self._distance_data = self.distance_provider.load()
+        return self._distance_data
+
+    @property
+    def loc_descriptions(self):
+        return self.distance_data[0]
+
+    @property
+    def distance_matrix(self):
+        return self.distance_data[1]
+
+    # package CSV rows, loaded on first use
+    # space-time complexity: O(N) on first use, O(1) after
+    @property
+    def package_rows(self):
+        if self._package_rows is None:
+            self._package_rows = Ingest.load_package_rows(self.package_path, self.cache_dir)
+        return self._package_rows
+
+    @functools.cached_property
+    def package_table(self):
+        package_table = Package.create_package_table(self.package_rows)
+        Telemetry.record_table('package_table', package_table)
+        return package_table
+
+    @functools.cached_property
+    def loc_table(self):
+        loc_table = Location.create_location_table(self.loc_descriptions, self.distance_matrix)
+        Telemetry.record_table('loc_table', loc_table)
+        return loc_table
+
+    @functools.cached_property
+    def loc_pack_index(self):
+        return Location.create_loc_package_index(self.loc_table, self.package_table)
+
+    # parsed deadlines, constraints & status codes for every package
+    @functools.cached_property
+    def package_store(self):
+        return Package.create_package_store(self.package_table)
+
+    # Special Notes compiled into co-delivery groups & bitsets for screening; compiled again after add_package,
+    # change_address or set_available_at
+    # space-time complexity: O(N*log(N)) on first use, O(1) after
+    @functools.cached_property
+    def constraints(self):
+        return ConstraintModel(self.package_store, self.loc_pack_index)
+
+    # maps each location's street address to its location ID
+    @functools.cached_property
+    def location_by_street(self):
+        return {location[0]: loc_id for loc_id, location in self.loc_table.items()}
+
+    # every location's closest locations(Route.nearest_neighbor_lists), so nearest neighbor steps need not scan whole
+    # matrix rows
+    # space-time complexity: O(N^2) on first use, O(1) after
+    @functools.cached_property
+    def nearest_neighbors(self):
+        return Route.nearest_neighbor_lists(self.distance_matrix, Route.NEAREST_NEIGHBOR_COUNT)
+
+    # each location's earliest package deadline in minutes after midnight, numpy.inf where nothing is delivered
+    # space-time complexity: O(N)
+    @functools.cached_property
+    def stop_deadlines(self):
+        stop_deadlines = numpy.full(len(self.distance_matrix), numpy.inf)
+        for package_id, loc_id in self.loc_pack_index.location_of.items():
+            stop_deadlines[loc_id] = min(stop_deadlines[loc_id], self.package_store.deadline(package_id))
+        return stop_deadlines
+
+    # SHA-256 hex digest of the distance matrix, identifying which matrix saved routes were evaluated on
+    # space-time complexity: O(N^2)
+    @functools.cached_property
+    def matrix_fingerprint(self):
+        return hashlib.sha256(numpy.ascontiguousarray(self.distance_matrix, dtype=numpy.float64)).hexdigest()
+
+    # memo of evaluated candidate routes shared by the trucks planning against this network
+    # space-time complexity: O(1), or O(N^2) to load a saved cache
+    @functools.cached_property
+    def route_cache(self):
+        route_cache = RouteCache(self.route_cache_size)
+        if self.route_cache_path is not None:
+            route_cache.load(self.route_cache_path, self.matrix_fingerprint)
+        return route_cache
+
+    # saves the route cache to route_cache_path, if one was given
+    # space-time complexity: O(N^2)
+    def save_route_cache(self):
+        if self.route_cache_path is not None:
+            self.route_cache.save(self.route_cache_path, self.matrix_fingerprint)
+
+    # recomputes the earliest package deadline of the passed-in location
+    # space-time complexity: O(N) in the packages at the location
+    def refresh_stop_deadline(self, loc_id):
+        self.stop_deadlines[loc_id] = min((self.package_store.deadline(package_id)
+                                           for package_id in self.loc_pack_index.packages_at[loc_id]),
+                                          default=numpy.inf)
+
+    # Adds a package given as a row in the package CSV's column order to every table, index & store. Returns the ID of
+    # the location it is delivered to. Raises ValueError for a duplicate ID or an address not in the distance table.
+    # space-time complexity: O(1)
+    def add_package(self, row):
+        package_id = int(row[0])
+        if self.package_table.lookup(package_id) is not None:
+            raise ValueError('package {} already exists'.format(package_id))
+        loc_id = self.location_by_street.get(row[1])
+        if loc_id is None:
+            raise ValueError('no location found for package {} at {}'.format(package_id, row[1]))
+        self.package_table.insert(package_id, list(row) + ['At hub'])
+        self.package_store.append(package_id, row[5], row[6], row[7])
+        self.loc_pack_index.assign(package_id, loc_id)
+        self.refresh_stop_deadline(loc_id)
+        self.__dict__.pop('constraints', None)
+        return loc_id
+
+    # Changes a package's delivery address. Returns (old location ID, new location ID); raises ValueError for an
+    # address not in the distance table.
+    # space-time complexity: O(1)
+    def change_address(self, package_id, street, city, state, zip_code):
+        loc_id = self.location_by_street.get(street)
+        if loc_id is None:
+            raise ValueError('no location found for package {} at {}'.format(package_id, street))
+        self.package_table.lookup(package_id)[1:5] = [street, city, state, zip_code]
+        old_loc_id = self.loc_pack_index.location_of.get(package_id)
+        self.loc_pack_index.assign(package_id, loc_id)
+        if old_loc_id is not None:
+            self.refresh_stop_deadline(old_loc_id)
+        self.refresh_stop_deadline(loc_id)
+        self.__dict__.pop('constraints', None)
+        return old_loc_id, loc_id
+
+    # sets the minute of the day the passed-in package reaches the hub
+    # space-time complexity: O(1)
+    def set_available_at(self, package_id, minute):
+        self.package_store.set_available_at(package_id, minute)
+        self.__dict__.pop('constraints', None)
+
+    # returns every package to 'At hub' so the network can be planned again
+    # space-time complexity: O(N)
+    def reset_statuses(self):
+        self.package_store.reset()
+
+
+# returns the network loaded from the CSV files in the working directory, creating it on first call
+# space-time complexity: O(1)
+def default_network():
+    global _default_network
+    if _default_network is None:
+        _default_network = DeliveryNetwork()
+    return _default_network
@@ -1,36 +1,217 @@
-from HashTable import ChainingHashTable
+from HashTable import OpenAddressingHashTable
+from array import array
+import Timer
 import csv
+import enum
+import json
+import re
 
+# deadline, in minutes after midnight, given to packages due at end of day('EOD')
+END_OF_DAY = 17 * 60
+# delivered_at of a package that has not been delivered
+NOT_DELIVERED = -1.0
+# columns of a package snapshot, in order
+SNAPSHOT_COLUMNS = ('id', 'street', 'city', 'state', 'zip', 'deadline', 'mass', 'notes', 'status', 'delivered_at')
 
-# creates 40-key package hashtable and reads in data from package csv file
+
+# delivery status codes kept for every package in a PackageStore
+class PackageStatus(enum.IntEnum):
+    AT_HUB = 0
+    EN_ROUTE = 1
+    DELIVERED = 2
+
+
+# constraint flags compiled from a package's Special Notes
+class PackageFlag(enum.IntFlag):
+    NONE = 0
+    DELAYED = 1
+    WRONG_ADDRESS = 2
+    CO_DELIVERY = 4
+    TRUCK_ONLY = 8
+
+
+# Columnar store of the parsed package fields used for planning, built once from the package hashtable. Row i of every
+# column describes the package ids[i]; index maps a package ID to its row. Deadlines & availability times are minutes
+# after midnight, masses are kilograms, and Special Notes become PackageFlag bits plus the required truck number and
+# co-delivery package IDs. The store also keeps every package's live delivery status: statuses are PackageStatus codes
+# and delivered_at the minute after midnight each package was delivered(NOT_DELIVERED until it is).
+class PackageStore:
+    __slots__ = ('ids', 'index', 'deadlines', 'masses', 'flags', 'available_at', 'required_trucks', 'co_deliveries',
+                 'statuses', 'delivered_at')
+
+    # space-time complexity: O(1)
+    def __init__(self):
+        self.ids = array('l')
+        self.index = {}
+        self.deadlines = array('l')
+        self.masses = array('d')
+        self.flags = array('B')
+        self.available_at = array('l')
+        self.required_trucks = array('h')
+        self.co_deliveries = {}
+        self.statuses = array('B')
+        self.delivered_at = array('d')
+
+    # parses one package's deadline, mass & notes and appends them as a new row
+    # space-time complexity: O(1)
+    def append(self, package_id, deadline, mass, notes):
+        flags = PackageFlag.NONE
+        available_at = 0
+        required_truck = 0
+        delayed = re.search(r'Delayed.*until (\d{1,2}:\d{2} ?[ap]m)', notes, re.IGNORECASE)
+        if delayed:
+            flags |= PackageFlag.DELAYED
+            available_at = Timer.parse_minutes(delayed.group(1))
+        wrong_address = re.search(r'Wrong address.*at (\d{1,2}:\d{2} ?[ap]m)', notes, re.IGNORECASE)
+        if wrong_address:
+            flags |= PackageFlag.WRONG_ADDRESS
+            available_at = Timer.parse_minutes(wrong_address.group(1))
+        if 'Must be delivered with' in notes:
+            flags |= PackageFlag.CO_DELIVERY
+            self.co_deliveries[package_id] = tuple(int(s) for s in re.findall(r'\d+', notes))
+        truck_only = re.search(r'only be on truck (\d+)', notes, re.IGNORECASE)
+        if truck_only:
+            flags |= PackageFlag.TRUCK_ONLY
+            required_truck = int(truck_only.group(1))
+
+        self.index[package_id] = len(self.ids)
+        self.ids.append(package_id)
+        self.deadlines.append(END_OF_DAY if deadline == 'EOD' else Timer.parse_minutes(deadline))
+        self.masses.append(float(mass))
+        self.flags.append(flags)
+        self.available_at.append(available_at)
+        self.required_trucks.append(required_truck)
+        self.statuses.append(PackageStatus.AT_HUB)
+        self.delivered_at.append(NOT_DELIVERED)
+
+    # returns the IDs of packages whose status is the passed-in PackageStatus
+    # space-time complexity: O(N)
+    def with_status(self, status):
+        return {package_id for package_id, package_status in zip(self.ids, self.statuses) if package_status == status}
+
+    # returns the passed-in package's deadline in minutes after midnight
+    # space-time complexity: O(1)
+    def deadline(self, package_id):
+        return self.deadlines[self.index[package_id]]
+
+    # sets the minute of the day the passed-in package reaches the hub
+    # space-time complexity: O(1)
+    def set_available_at(self, package_id, minute):
+        self.available_at[self.index[package_id]] = minute
+
+    # Sets the status of every passed-in package ID to the passed-in PackageStatus. Delivered packages are stamped with
+    # minute(minutes after midnight); any other status clears the delivery time.
+    # space-time complexity: O(N)
+    def update_many(self, package_ids, status, minute=NOT_DELIVERED):
+        index, statuses, delivered_at = self.index, self.statuses, self.delivered_at
+        if status != PackageStatus.DELIVERED:
+            minute = NOT_DELIVERED
+        for package_id in package_ids:
+            row = index[package_id]
+            statuses[row] = status
+            delivered_at[row] = minute
+
+    # returns every package to 'At hub'
+    # space-time complexity: O(N)
+    def reset(self):
+        self.statuses = array('B', [PackageStatus.AT_HUB]) * len(self.ids)
+        self.delivered_at = array('d', [NOT_DELIVERED]) * len(self.ids)
+
+    # returns the delivery status text of the package in row, e.g. 'Delivered at 09:48:21'
+    # space-time complexity: O(1)
+    def status_text_at(self, row):
+        status = self.statuses[row]
+        if status == PackageStatus.DELIVERED:
+            return 'Delivered at ' + Timer.format_minutes(self.delivered_at[row])
+        return 'In route to destination' if status == PackageStatus.EN_ROUTE else 'At hub'
+
+    # returns the passed-in package's delivery status text
+    # space-time complexity: O(1)
+    def status_text(self, package_id):
+        return self.status_text_at(self.index[package_id])
+
+
+# creates package hashtable sized for the number of packages(growing as needed) from the package rows loaded by
+# Ingest.load_package_rows
 # space-time complexity: O(N)
-def create_package_table():
-    package_table = ChainingHashTable(40)
-    with open('Package File.csv', newline='') as csvfile:
-        reader = csv.reader(csvfile)
-        next(reader)
-        for row in reader:
-            package_id = row[0]
-            street = row[1]
-            city = row[2]
-            state = row[3]
-            zip_code = row[4]
-            deadline = row[5]
-            mass = row[6]
-            notes = row[7]
-            delivery_status = 'At hub'
-            entry_value = [package_id, street, city, state, zip_code, deadline, mass, notes, delivery_status]
-
-            key = package_id
-            value = entry_value
-
-            package_table.insert(key, value)
+def create_package_table(package_rows):
+    package_table = OpenAddressingHashTable(len(package_rows))
+    for row in package_rows:
+        package_id = row[0]
+        street = row[1]
+        city = row[2]
+        state = row[3]
+        zip_code = row[4]
+        deadline = row[5]
+        mass = row[6]
+        notes = row[7]
+        delivery_status = 'At hub'
+        entry_value = [package_id, street, city, state, zip_code, deadline, mass, notes, delivery_status]
+
+        key = package_id
+        value = entry_value
+
+        package_table.insert(key, value)
     return package_table
 
 
-# accesses the package hashtable lookup function and prints results for the package ID argument passed in
+# parses every package in the package hashtable into a columnar PackageStore, in ascending package ID order
 # space-time complexity: O(N)
-def get_package_info(package_table, package_id):
-    p_info = package_table.lookup(package_id)
+def create_package_store(package_table):
+    package_store = PackageStore()
+    for package_id, package in package_table.items():
+        package_store.append(package_id, package[5], package[6], package[7])
+    return package_store
+
+
+# accesses the package hashtable lookup function and prints results for the package ID argument passed in. A passed-in
+# delivery_status(e.g. as of a check time, or PackageStore.status_text) is printed instead of the table's status
+# column, which keeps the status the package was loaded with; live statuses are kept in the PackageStore.
+# space-time complexity: O(1)
+def get_package_info(package_table, package_id, delivery_status=None):
+    print_package_info(package_table.lookup(package_id), delivery_status)
+
+
+# prints one package hashtable entry, with delivery_status instead of its status column if one is passed in
+# space-time complexity: O(1)
+def print_package_info(p_info, delivery_status=None):
+    if delivery_status is None:
+        delivery_status = p_info[8]
     print('{:<4}{:<30}{:<18}{:<8}{:<5}{:<11}{:<2}'.format(p_info[0], p_info[1][:30], p_info[2], p_info[4], p_info[6],
-                                                          p_info[5], p_info[8]))
+                                                          p_info[5], delivery_status))
+
+
+# Writes every package's details & live delivery status to path in one pass over the package hashtable, with statuses
+# & delivery times read from the package store's arrays. Paths ending in '.jsonl' get one JSON object per line, others
+# CSV with a header row; either way columns follow SNAPSHOT_COLUMNS and rows are in hashtable slot order. Returns the
+# number of packages written.
+# space-time complexity: O(N)
+def write_snapshot(path, package_table, package_store):
+    index, statuses, delivered_at = package_store.index, package_store.statuses, package_store.delivered_at
+    delivered, en_route = int(PackageStatus.DELIVERED), int(PackageStatus.EN_ROUTE)
+    # packages delivered at one stop share a delivery time, so each time is only formatted once
+    delivery_times = {}
+
+    # yields each package's snapshot values in SNAPSHOT_COLUMNS order
+    def snapshot_rows():
+        for package_id, p_info in package_table.slot_items():
+            row = index[package_id]
+            status = statuses[row]
+            if status == delivered:
+                minute = delivered_at[row]
+                delivery_time = delivery_times.get(minute)
+                if delivery_time is None:
+                    delivery_time = delivery_times[minute] = Timer.format_minutes(minute)
+                yield (package_id, *p_info[1:8], 'Delivered at ' + delivery_time, delivery_time)
+            else:
+                yield (package_id, *p_info[1:8], 'In route to destination' if status == en_route else 'At hub', '')
+
+    with open(path, 'w', newline='') as snapshot_file:
+        if path.endswith('.jsonl'):
+            encode = json.JSONEncoder().encode
+            snapshot_file.writelines(encode(dict(zip(SNAPSHOT_COLUMNS, values))) + '\n' for values in snapshot_rows())
+        else:
+            writer = csv.writer(snapshot_file)
+            writer.writerow(SNAPSHOT_COLUMNS)
+            writer.writerows(snapshot_rows())
+    return len(package_table)
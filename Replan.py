@@ -0,0 +1,209 @@
+import Route
+import Timer
+import math
+import numpy
+
+
+# Repairs an already-built plan as things change during the day, touching only the routes a change affects instead of
+# planning the day again. trucks are the planned Truck objects(routes & loads already set) and every event is given the
+# datetime it happens at. The part of a route the truck has driven by then, plus the stop it is driving to, stays as
+# it is; later stops are dropped when nothing on the truck goes there any more, and new stops are inserted where they
+# add the least distance while keeping every stop on time(or where they add the least distance, if no place is on
+# time). New & displaced packages go to a truck that is still at the hub when they are. Packages no truck can take
+# are kept in unassigned. Events return the set of trucks whose routes changed; after a batch of events, call
+# record(event_log) with a new Simulation.EventLog to drive the repaired plan.
+class Replanner:
+    # space-time complexity: O(1)
+    def __init__(self, trucks, capacity=16, speed=18.0):
+        self.trucks = trucks
+        self.network = trucks[0].network
+        self.capacity = capacity
+        self.minutes_per_mile = 60.0 / speed
+        self.unassigned = set()
+
+    # returns the truck carrying the passed-in package, or None
+    # space-time complexity: O(T)
+    def truck_of(self, package_id):
+        for truck in self.trucks:
+            if package_id in truck.load:
+                return truck
+        return None
+
+    # Returns (index of the truck's first route position that may still change, minute the truck leaves the position
+    # before it) as of when, or None once the truck is heading back to the hub.
+    # space-time complexity: O(N)
+    def open_route(self, truck, when):
+        now = Timer.minutes_after_midnight(when)
+        depart = Timer.minutes_after_midnight(truck.current_time)
+        if now < depart:
+            return 1, depart
+        path = numpy.array(truck.route, dtype=numpy.intp)
+        distance_matrix = self.network.distance_matrix
+        arrivals = depart + numpy.concatenate(([0.0], numpy.cumsum(distance_matrix[path[:-1], path[1:]]))) * \
+            self.minutes_per_mile
+        # positions reached by now, plus the one the truck is driving to
+        first_open = int(numpy.searchsorted(arrivals, now, side='right')) + 1
+        if first_open > len(truck.route) - 1:
+            return None
+        return first_open, float(arrivals[first_open - 1])
+
+    # returns whether the truck has left the hub by when
+    # space-time complexity: O(1)
+    def left_hub(self, truck, when):
+        return Timer.minutes_after_midnight(when) >= Timer.minutes_after_midnight(truck.current_time)
+
+    # returns whether the truck has reached loc by when, or is driving to it
+    # space-time complexity: O(N)
+    def delivering(self, truck, loc, when):
+        open_route = self.open_route(truck, when)
+        first_open = open_route[0] if open_route is not None else len(truck.route)
+        return loc in truck.route[1:first_open]
+
+    # Returns (late, added distance, new route) for visiting loc on the open part of the truck's route as of when,
+    # where late tells whether no on-time place was found, or None if the route can no longer change.
+    # space-time complexity: O(N)
+    def stop_insertion(self, truck, loc, when):
+        open_route = self.open_route(truck, when)
+        if open_route is None:
+            return None
+        first_open, leave = open_route
+        if loc in truck.route[max(first_open - 1, 1):-1]:
+            return False, 0.0, truck.route
+        start = truck.route[first_open - 1]
+        stops = truck.route[first_open:-1]
+        late = False
+        insertion = Route.cheapest_insertion(self.network.distance_matrix, self.network.stop_deadlines,
+                                             self.minutes_per_mile, leave, stops, loc, start)
+        if insertion is None:
+            late = True
+            insertion = Route.cheapest_insertion(self.network.distance_matrix, None, self.minutes_per_mile, leave,
+                                                 stops, loc, start)
+        added, position = insertion
+        return late, added, truck.route[:first_open] + stops[:position] + [loc] + stops[position:] + [0]
+
+    # brings the truck's destination table, candidate list & lateness in line with its repaired route & load; a repaired
+    # route's optimality gap is no longer known
+    # space-time complexity: O(N)
+    def refresh(self, truck):
+        truck.destination_table = numpy.array(sorted(set(truck.route[:-1])), dtype=numpy.intp)
+        truck.package_set_list = [set(truck.load)]
+        truck.lateness = truck.package_lateness(truck.route)
+        truck.optimality_gap = None
+
+    # Takes the package(delivered to loc) off its truck, dropping loc from the open part of the route if nothing else
+    # on the truck goes there. Returns the truck, or None if no truck carried it. Raises ValueError if the truck has
+    # already delivered the package or is about to.
+    # space-time complexity: O(N)
+    def unload(self, package_id, loc, when):
+        truck = self.truck_of(package_id)
+        if truck is None:
+            return None
+        if self.delivering(truck, loc, when):
+            raise ValueError('package {} is already delivered or being delivered'.format(package_id))
+        truck.load.discard(package_id)
+        open_route = self.open_route(truck, when)
+        if open_route is not None and not self.network.loc_pack_index.packages_at[loc] & truck.load:
+            first_open = open_route[0]
+            truck.route = truck.route[:first_open] + [stop for stop in truck.route[first_open:-1] if stop != loc] + [0]
+        self.refresh(truck)
+        return truck
+
+    # Puts the package on the truck where its stop adds the least distance, preferring trucks that reach it on time.
+    # Candidates are the passed-in trucks, or else the trucks still at the hub once the package is, that have room,
+    # that its notes allow, and that carry any package it must be delivered with. Returns the truck, or None after
+    # adding the package to unassigned.
+    # space-time complexity: O(T*N)
+    def place(self, package_id, when, trucks=None):
+        store = self.network.package_store
+        row = store.index[package_id]
+        loc = self.network.loc_pack_index.location_of[package_id]
+        if trucks is None:
+            available = max(Timer.minutes_after_midnight(when), store.available_at[row])
+            trucks = [truck for truck in self.trucks if Timer.minutes_after_midnight(truck.current_time) >= available]
+        partner_trucks = {self.truck_of(partner_id) for partner_id in store.co_deliveries.get(package_id, ())} - {None}
+
+        best = None
+        for truck in trucks:
+            if len(truck.load) >= self.capacity or store.required_trucks[row] not in (0, truck.number):
+                continue
+            if partner_trucks and truck not in partner_trucks:
+                continue
+            insertion = self.stop_insertion(truck, loc, when)
+            if insertion is not None and (best is None or insertion[:2] < best[0][:2]):
+                best = insertion, truck
+        if best is None:
+            self.unassigned.add(package_id)
+            return None
+        (late, added, route), truck = best
+        truck.route = route
+        truck.load.add(package_id)
+        self.refresh(truck)
+        self.unassigned.discard(package_id)
+        return truck
+
+    # Event: the package's delivery address is corrected to another location in the distance table. A package already
+    # on a truck that left stays on it and is re-routed; one on a truck still at the hub may move to another truck.
+    # space-time complexity: O(T*N)
+    def change_address(self, package_id, street, city, state, zip_code, when):
+        truck = self.truck_of(package_id)
+        old_loc = self.network.loc_pack_index.location_of.get(package_id)
+        if truck is not None and self.delivering(truck, old_loc, when):
+            raise ValueError('package {} is already delivered or being delivered'.format(package_id))
+        self.network.change_address(package_id, street, city, state, zip_code)
+        changed = {self.unload(package_id, old_loc, when)}
+        changed.add(self.place(package_id, when, [truck] if truck is not None and self.left_hub(truck, when) else None))
+        return changed - {None}
+
+    # Event: the package reaches the hub later than planned, at the datetime available_at. A package on a truck that
+    # leaves before then is moved to a later truck; a package already on board is unaffected.
+    # space-time complexity: O(T*N)
+    def delay_package(self, package_id, available_at, when):
+        minute = Timer.minutes_after_midnight(available_at)
+        self.network.set_available_at(package_id, math.ceil(minute))
+        truck = self.truck_of(package_id)
+        if truck is None:
+            return {self.place(package_id, when)} - {None}
+        if Timer.minutes_after_midnight(truck.current_time) >= minute or self.left_hub(truck, when):
+            return set()
+        changed = {self.unload(package_id, self.network.loc_pack_index.location_of[package_id], when)}
+        changed.add(self.place(package_id, when))
+        return changed - {None}
+
+    # Event: a new package, given as a row in the package CSV's column order, is at the hub(or arrives when its notes
+    # say it does)
+    # space-time complexity: O(T*N)
+    def add_package(self, row, when):
+        self.network.add_package(row)
+        return {self.place(int(row[0]), when)} - {None}
+
+    # Event: the truck breaks down. It finishes the stop it is driving to and is brought back to the hub, which cuts
+    # the rest of its route; the packages it did not deliver are back at the hub when it is, and go to later trucks.
+    # space-time complexity: O(T*N^2)
+    def break_down(self, truck, when):
+        open_route = self.open_route(truck, when)
+        if open_route is None:
+            return set()
+        first_open = open_route[0]
+        truck.route = truck.route[:first_open] + [0]
+        undelivered = {package_id for package_id in truck.load
+                       if self.network.loc_pack_index.location_of[package_id] not in truck.route[1:-1]}
+        truck.load -= undelivered
+        self.refresh(truck)
+
+        distance_matrix = self.network.distance_matrix
+        back_at_hub = Timer.minutes_after_midnight(truck.current_time) + \
+            Route.tour_distance(distance_matrix, truck.route) * self.minutes_per_mile
+        later_trucks = [other for other in self.trucks
+                        if other is not truck and Timer.minutes_after_midnight(other.current_time) >= back_at_hub]
+        changed = {truck}
+        for package_id in sorted(undelivered):
+            self.network.set_available_at(package_id, math.ceil(back_at_hub))
+            changed.add(self.place(package_id, when, later_trucks))
+        return changed - {None}
+
+    # resets every package to 'At hub' and drives the trucks' repaired routes, in order of departure, into event_log
+    # space-time complexity: O(N)
+    def record(self, event_log):
+        self.network.reset_statuses()
+        for truck in sorted(self.trucks, key=lambda truck: truck.current_time):
+            truck.deliver_packages(event_log)
@@ -0,0 +1,570 @@
+import collections
+import numpy
+import time
+
+
+# closest locations listed per location for nearest neighbor steps
+NEAREST_NEIGHBOR_COUNT = 16
+# rows of the distance matrix ranked at once by nearest_neighbor_lists, which bounds its temporary memory
+NEIGHBOR_BLOCK_ROWS = 1024
+
+
+# Evaluates K candidate routes at once with the nearest neighbor heuristic. Row k of stop_masks flags the locations
+# (columns of distance_matrix) candidate k must visit. All K tours start at the hub(location 0), advance together one
+# stop per step via a masked argmin, and return to the hub. With nearest_neighbors(from nearest_neighbor_lists), a step
+# first looks for the next stop among the current location's listed neighbors and only scans the whole matrix row for
+# tours whose neighbors are all visited; the tours are the same either way. Returns an array of the K tour distances
+# and a list of the K tours as arrays of location IDs, e.g. [0, 20, 21, 2, 0].
+# space-time complexity: O(K*N^2), or O(K*N*k) when the neighbor lists find every stop
+def batch_nearest_neighbor(distance_matrix, stop_masks, nearest_neighbors=None):
+    unvisited = numpy.array(stop_masks, dtype=bool, ndmin=2)
+    unvisited[:, 0] = False
+    num_candidates = unvisited.shape[0]
+    rows = numpy.arange(num_candidates)
+    stop_counts = unvisited.sum(axis=1)
+    max_stops = int(stop_counts.max()) if num_candidates > 0 else 0
+
+    tours = numpy.zeros((num_candidates, max_stops + 2), dtype=numpy.intp)
+    distances = numpy.zeros(num_candidates)
+    current_locs = numpy.zeros(num_candidates, dtype=numpy.intp)
+    # each step visits the closest unvisited location of every tour that still has stops left
+    # space-time complexity: O(K*N) per step, or O(K*k) when the neighbor lists find every tour's next stop
+    for step in range(1, max_stops + 1):
+        active = stop_counts >= step
+        if nearest_neighbors is None:
+            adj_distances = numpy.where(unvisited, distance_matrix[current_locs], numpy.inf)
+            next_locs = numpy.argmin(adj_distances, axis=1)
+            step_distances = adj_distances[rows, next_locs]
+        else:
+            next_locs, step_distances = nearest_unvisited(distance_matrix, nearest_neighbors, unvisited,
+                                                          current_locs, active)
+        next_locs = numpy.where(active, next_locs, current_locs)
+        distances += numpy.where(active, step_distances, 0.0)
+        unvisited[rows, next_locs] = False
+        current_locs = next_locs
+        tours[:, step] = next_locs
+    # return to hub once all locations visited
+    distances += distance_matrix[current_locs, 0]
+    tours[rows, stop_counts + 1] = 0
+
+    return distances, [tours[k, :stop_counts[k] + 2] for k in range(num_candidates)]
+
+
+# Returns (next locations, distances to them) for the closest unvisited location of each tour's current location, read
+# from the neighbor lists. A listed neighbor is only taken if it is closer than the list's last entry(or the list
+# holds every location), since an unlisted location could tie with it; other active tours scan their matrix row, so
+# ties go to the lowest location ID just as with a full scan. Entries for inactive tours are meaningless.
+# space-time complexity: O(K*k), plus O(N) per tour that scans its row
+def nearest_unvisited(distance_matrix, nearest_neighbors, unvisited, current_locs, active):
+    neighbors, neighbor_distances = nearest_neighbors
+    rows = numpy.arange(len(current_locs))
+    near = neighbors[current_locs]
+    near_distances = neighbor_distances[current_locs]
+    open_near = unvisited[rows[:, None], near]
+    first_open = numpy.argmax(open_near, axis=1)
+    next_locs = near[rows, first_open]
+    step_distances = near_distances[rows, first_open]
+    listed_all = neighbors.shape[1] >= len(distance_matrix)
+    found = open_near[rows, first_open] & (listed_all | (step_distances < near_distances[:, -1]))
+    scans = numpy.flatnonzero(active & ~found)
+    if len(scans) > 0:
+        adj_distances = numpy.where(unvisited[scans], distance_matrix[current_locs[scans]], numpy.inf)
+        next_locs[scans] = numpy.argmin(adj_distances, axis=1)
+        step_distances[scans] = adj_distances[numpy.arange(len(scans)), next_locs[scans]]
+    return next_locs, step_distances
+
+
+# Returns (neighbors, neighbor distances), two N x k arrays listing every location's neighbor_count(k) closest
+# locations(itself included) closest first, ties in location ID order, and their distances. Rows are ranked in blocks
+# with a partial sort, so no full copy of the matrix is made.
+# space-time complexity: O(N^2)
+def nearest_neighbor_lists(distance_matrix, neighbor_count):
+    num_locs = len(distance_matrix)
+    neighbor_count = min(neighbor_count, num_locs)
+    neighbors = numpy.empty((num_locs, neighbor_count), dtype=numpy.intp)
+    neighbor_distances = numpy.empty((num_locs, neighbor_count))
+    for start in range(0, num_locs, NEIGHBOR_BLOCK_ROWS):
+        block = numpy.asarray(distance_matrix[start:start + NEIGHBOR_BLOCK_ROWS])
+        if neighbor_count < num_locs:
+            # the neighbor_count smallest distances of each row, unordered, ties at the boundary broken arbitrarily
+            candidates = numpy.argpartition(block, neighbor_count - 1, axis=1)[:, :neighbor_count]
+        else:
+            candidates = numpy.broadcast_to(numpy.arange(num_locs), block.shape)
+        candidate_distances = numpy.take_along_axis(block, candidates, axis=1)
+        order = numpy.lexsort((candidates, candidate_distances), axis=1)
+        neighbors[start:start + len(block)] = numpy.take_along_axis(candidates, order, axis=1)
+        neighbor_distances[start:start + len(block)] = numpy.take_along_axis(candidate_distances, order, axis=1)
+    return neighbors, neighbor_distances
+
+
+# Cluster-first splitting of a large stop set: recursively halves the stops by proximity until no part holds more than
+# cluster_size stops. Each split picks two far-apart stops and divides the rest by how much closer they are to one
+# than the other, so the halves are equal in size. Returns the clusters as arrays of location IDs.
+# space-time complexity: O(N*log^2(N))
+def cluster_stops(distance_matrix, stops, cluster_size):
+    pending = [numpy.asarray(stops, dtype=numpy.intp)]
+    clusters = []
+    while pending:
+        group = pending.pop()
+        if len(group) <= max(cluster_size, 1):
+            clusters.append(group)
+            continue
+        first_seed = group[int(numpy.argmax(distance_matrix[group[0], group]))]
+        second_seed = group[int(numpy.argmax(distance_matrix[first_seed, group]))]
+        order = numpy.argsort(distance_matrix[first_seed, group] - distance_matrix[second_seed, group],
+                              kind='stable')
+        pending += [group[order[:len(group) // 2]], group[order[len(group) // 2:]]]
+    return clusters
+
+
+# Route-second construction over cluster_stops: starting from the hub at minute depart, repeatedly moves on to the
+# cluster holding the stop closest to where the truck is, and builds that cluster's part of the route with cheapest
+# insertion(earliest deadline first, farthest first among equal deadlines) from the last stop of the previous part.
+# Deadlines are only checked within a cluster's part, so a later part may still be pushed late. Returns the stops in
+# route order, hub excluded.
+# space-time complexity: O(N*(c + N/c)) for clusters of c stops
+def cluster_first_route(distance_matrix, deadlines, minutes_per_mile, depart, locs, cluster_size):
+    clusters = cluster_stops(distance_matrix, locs, cluster_size)
+    stops = []
+    current_loc = 0
+    leave = depart
+    while clusters:
+        closest = [distance_matrix[current_loc, cluster].min() for cluster in clusters]
+        cluster = clusters.pop(int(numpy.argmin(closest)))
+        part = []
+        for loc in sorted((int(loc) for loc in cluster),
+                          key=lambda loc: (deadlines[loc], -distance_matrix[current_loc, loc], loc)):
+            insertion = cheapest_insertion(distance_matrix, deadlines, minutes_per_mile, leave, part, loc, current_loc)
+            if insertion is None:
+                insertion = cheapest_insertion(distance_matrix, None, minutes_per_mile, leave, part, loc, current_loc)
+            part.insert(insertion[1], loc)
+        leave += tour_distance(distance_matrix, [current_loc] + part) * minutes_per_mile
+        stops += part
+        current_loc = part[-1]
+    return stops
+
+
+# sums the distances of consecutive legs of a tour given as a sequence of location IDs
+# space-time complexity: O(N)
+def tour_distance(distance_matrix, tour):
+    tour = numpy.asarray(tour, dtype=numpy.intp)
+    return float(distance_matrix[tour[:-1], tour[1:]].sum())
+
+
+# Creates, for every location in locs, a list of the neighbor_count closest other locations in locs, closest first and
+# ties in locs order. Only each row's closest entries are ranked(through a partial sort); rows where an unranked entry
+# ties the farthest ranked one are sorted in full.
+# space-time complexity: O(N^2)
+def neighbor_lists(distance_matrix, locs, neighbor_count):
+    locs = numpy.asarray(locs, dtype=numpy.intp)
+    route_matrix = distance_matrix[numpy.ix_(locs, locs)]
+    # the location itself is among its closest entries
+    ranked_count = min(neighbor_count + 1, len(locs))
+    if ranked_count < len(locs):
+        candidates = numpy.argpartition(route_matrix, ranked_count - 1, axis=1)[:, :ranked_count]
+        candidate_distances = numpy.take_along_axis(route_matrix, candidates, axis=1)
+        order = numpy.take_along_axis(candidates, numpy.lexsort((candidates, candidate_distances), axis=1), axis=1)
+        farthest = candidate_distances.max(axis=1)
+        tied = numpy.flatnonzero((route_matrix <= farthest[:, None]).sum(axis=1) > ranked_count)
+        if len(tied) > 0:
+            order[tied] = numpy.argsort(route_matrix[tied], axis=1, kind='stable')[:, :ranked_count]
+    else:
+        order = numpy.argsort(route_matrix, axis=1, kind='stable')
+    neighbors = {}
+    for row, loc in enumerate(locs):
+        closest = [int(locs[col]) for col in order[row] if col != row]
+        neighbors[int(loc)] = closest[:neighbor_count]
+    return neighbors
+
+
+# Deadline bookkeeping for a tour(starting & ending at the hub) driven from minute depart at minutes_per_mile, used
+# to check in O(1) whether a 2-opt or Or-opt move keeps every stop on time. deadlines holds each location's deadline
+# in minutes after midnight(numpy.inf for none). For tour position k, arrival[k] is the forward arrival time, slack[k]
+# the minutes stop k could be delayed before missing its deadline, and suffix_slack[k] the least slack from k to the
+# end. Range minima of slack and of deadline plus distance-so-far come from sparse tables. Call rebuild(cycle) after
+# the tour changes. The matrix must be symmetric, since a reversed path is as long as the original.
+class TimeWindows:
+    # space-time complexity: O(1)
+    def __init__(self, distance_matrix, deadlines, depart, minutes_per_mile):
+        self.distance_matrix = distance_matrix
+        self.deadlines = deadlines
+        self.depart = depart
+        self.minutes_per_mile = minutes_per_mile
+        self.cycle = []
+        self.arrival = None
+        self.driven = None
+        self.slack = None
+        self.suffix_slack = None
+        self.slack_table = None
+        self.reach_table = None
+
+    # recomputes the forward times, slack and sparse tables for cycle(the tour without its return to the hub)
+    # space-time complexity: O(N*log(N))
+    def rebuild(self, cycle):
+        self.cycle = cycle
+        path = numpy.array(list(cycle) + [cycle[0]], dtype=numpy.intp)
+        # driving minutes from leaving the hub to reaching each tour position
+        self.driven = numpy.concatenate(([0.0], numpy.cumsum(self.distance_matrix[path[:-1], path[1:]]))) * \
+            self.minutes_per_mile
+        self.arrival = self.depart + self.driven
+        stop_deadlines = self.deadlines[path]
+        stop_deadlines[0] = stop_deadlines[-1] = numpy.inf
+        self.slack = stop_deadlines - self.arrival
+        self.suffix_slack = numpy.minimum.accumulate(self.slack[::-1])[::-1]
+        self.slack_table = sparse_table(self.slack)
+        self.reach_table = sparse_table(stop_deadlines + self.driven)
+
+    # returns the least slack of tour positions lo through hi, or numpy.inf for an empty range
+    # space-time complexity: O(1)
+    def min_slack(self, lo, hi):
+        return range_min(self.slack_table, lo, hi) if lo <= hi else numpy.inf
+
+    # returns whether reversing tour positions lo through hi keeps every stop on time. A reversed stop k is reached
+    # after the new edge into position hi plus the driving from k to hi, so the whole path is on time when that edge's
+    # arrival plus driven[hi] is at most the least deadline + driven[k] of the path; later stops shift by one amount.
+    # space-time complexity: O(1)
+    def two_opt_feasible(self, lo, hi):
+        mpm = self.minutes_per_mile
+        before, first, last = self.cycle[lo - 1], self.cycle[lo], self.cycle[hi]
+        after = self.cycle[(hi + 1) % len(self.cycle)]
+        reach_last = self.arrival[lo - 1] + self.distance_matrix[before, last] * mpm
+        if reach_last + self.driven[hi] > range_min(self.reach_table, lo, hi) + IMPROVEMENT_EPSILON:
+            return False
+        reach_after = reach_last + (self.driven[hi] - self.driven[lo]) + self.distance_matrix[first, after] * mpm
+        return reach_after - self.arrival[hi + 1] <= self.suffix_slack[hi + 1] + IMPROVEMENT_EPSILON
+
+    # Returns whether moving tour positions s through e(reversed if reverse) onto the edge leaving position x keeps
+    # every stop on time. The stops between the old & new place of the path shift by one amount, as do the stops
+    # after both; the at most 3 moved stops are timed directly.
+    # space-time complexity: O(1)
+    def or_opt_feasible(self, s, e, x, reverse):
+        mpm = self.minutes_per_mile
+        n = len(self.cycle)
+        d = self.distance_matrix
+        segment = self.cycle[s:e + 1][::-1] if reverse else self.cycle[s:e + 1]
+        y = x + 1
+        removal_shift = (d[self.cycle[s - 1], self.cycle[(e + 1) % n]] * mpm -
+                         (self.driven[e + 1] - self.driven[s - 1]))
+        insertion_shift = (d[self.cycle[x], segment[0]] + d[segment[-1], self.cycle[y % n]] -
+                           d[self.cycle[x], self.cycle[y % n]]) * mpm + (self.driven[e] - self.driven[s])
+        if x > e:
+            # path moves later: stops e+1..x move up, the path follows x, stops from y on shift by both changes
+            if removal_shift > self.min_slack(e + 1, x) + IMPROVEMENT_EPSILON:
+                return False
+            reach = self.arrival[x] + removal_shift
+        else:
+            # path moves earlier: it follows x, stops y..s-1 are pushed back, stops after e shift by both changes
+            if insertion_shift > self.min_slack(y, s - 1) + IMPROVEMENT_EPSILON:
+                return False
+            reach = self.arrival[x]
+        prev_loc = self.cycle[x]
+        for loc in segment:
+            reach += d[prev_loc, loc] * mpm
+            if reach > self.deadlines[loc] + IMPROVEMENT_EPSILON:
+                return False
+            prev_loc = loc
+        after = y if x > e else e + 1
+        return removal_shift + insertion_shift <= self.suffix_slack[after] + IMPROVEMENT_EPSILON
+
+
+# builds a sparse table of range minima: level j holds the minimum of every run of 2^j consecutive values
+# space-time complexity: O(N*log(N))
+def sparse_table(values):
+    table = [numpy.asarray(values, dtype=float)]
+    width = 1
+    while 2 * width <= len(values):
+        previous = table[-1]
+        table.append(numpy.minimum(previous[:-width], previous[width:]))
+        width *= 2
+    return table
+
+
+# returns the minimum of positions lo through hi(inclusive) from a sparse table
+# space-time complexity: O(1)
+def range_min(table, lo, hi):
+    level = (hi - lo + 1).bit_length() - 1
+    return min(table[level][lo], table[level][hi - (1 << level) + 1])
+
+
+# Finds the cheapest place to visit loc on a route that leaves start(the hub unless given) at minute depart, visits
+# stops and returns to the hub. A place is feasible when loc is reached by its deadline and the detour delays no later
+# stop past its deadline; the delay check is O(1) per place against the suffix minimum of every stop's slack(deadline
+# minus arrival). deadlines holds each location's deadline(numpy.inf for none), or is None to ignore deadlines.
+# Returns (added distance, insert index into stops), or None if no place is feasible.
+# space-time complexity: O(N)
+def cheapest_insertion(distance_matrix, deadlines, minutes_per_mile, depart, stops, loc, start=0):
+    path = numpy.array([start] + list(stops) + [0], dtype=numpy.intp)
+    legs = distance_matrix[path[:-1], path[1:]]
+    to_loc = distance_matrix[path[:-1], loc]
+    added = to_loc + distance_matrix[loc, path[1:]] - legs
+    if deadlines is None:
+        position = int(numpy.argmin(added))
+        return float(added[position]), position
+
+    # time the truck leaves each location of the path, start first
+    leave = depart + numpy.concatenate(([0.0], numpy.cumsum(legs[:-1]))) * minutes_per_mile
+    slack = numpy.append(deadlines[path[1:-1]] - leave[1:], numpy.inf)
+    suffix_slack = numpy.minimum.accumulate(slack[::-1])[::-1]
+    feasible = ((leave + to_loc * minutes_per_mile <= deadlines[loc] + IMPROVEMENT_EPSILON) &
+                (added * minutes_per_mile <= suffix_slack + IMPROVEMENT_EPSILON))
+    if not feasible.any():
+        return None
+    position = int(numpy.argmin(numpy.where(feasible, added, numpy.inf)))
+    return float(added[position]), position
+
+
+# 2-opt move: replaces tour edges (a, b) & (c, d) with (a, c) & (b, d) by reversing the path between them, where c is
+# one of a's near neighbors. Edges are tried in both tour directions. Returns the locations whose edges changed, or
+# None if no improving move was found. Positions below fixed_prefix are never moved, and with windows(a TimeWindows
+# for the current tour) moves that would make a stop late are skipped.
+# space-time complexity: O(N)
+def two_opt_move(distance_matrix, cycle, position, neighbors, loc, fixed_prefix, windows=None):
+    n = len(cycle)
+    i = position[loc]
+    for direction in (1, -1):
+        a = loc
+        b = cycle[(i + direction) % n]
+        d_ab = distance_matrix[a, b]
+        for c in neighbors[a]:
+            d_ac = distance_matrix[a, c]
+            # neighbors are sorted, so no later neighbor can shorten edge (a, b)
+            if d_ac >= d_ab:
+                break
+            j = position[c]
+            d = cycle[(j + direction) % n]
+            if c == b or d == a:
+                continue
+            gain = d_ab + distance_matrix[c, d] - d_ac - distance_matrix[b, d]
+            if gain <= IMPROVEMENT_EPSILON:
+                continue
+            if direction == 1:
+                lo, hi = (i + 1, j) if i < j else (j + 1, i)
+            else:
+                lo, hi = (i, j - 1) if i < j else (j, i - 1)
+            if lo < fixed_prefix or hi > n - 1 or lo >= hi:
+                continue
+            if windows is not None and not windows.two_opt_feasible(lo, hi):
+                continue
+            cycle[lo:hi + 1] = cycle[lo:hi + 1][::-1]
+            return [a, b, c, d]
+    return None
+
+
+# Or-opt move: relocates the path of 1 to 3 locations starting at loc to another edge (x, y) of the tour, in either
+# orientation, where x or y is a near neighbor of the path's endpoints. Returns the locations whose edges changed, or
+# None if no improving move was found. Positions below fixed_prefix are never moved, and with windows(a TimeWindows
+# for the current tour) moves that would make a stop late are skipped.
+# space-time complexity: O(N)
+def or_opt_move(distance_matrix, cycle, position, neighbors, loc, fixed_prefix, windows=None):
+    n = len(cycle)
+    s = position[loc]
+    if s < fixed_prefix:
+        return None
+    for length in (1, 2, 3):
+        e = s + length - 1
+        if e > n - 1:
+            break
+        segment = cycle[s:e + 1]
+        first, last = segment[0], segment[-1]
+        prev_loc, next_loc = cycle[s - 1], cycle[(e + 1) % n]
+        remove_gain = (distance_matrix[prev_loc, first] + distance_matrix[last, next_loc] -
+                       distance_matrix[prev_loc, next_loc])
+        if remove_gain <= IMPROVEMENT_EPSILON:
+            continue
+        for end_loc in (first, last):
+            for c in neighbors[end_loc]:
+                if distance_matrix[end_loc, c] >= remove_gain:
+                    break
+                j = position[c]
+                if s <= j <= e:
+                    continue
+                # tries inserting the path on the edge before and the edge after c
+                for x_pos in (j - 1, j):
+                    x, y = cycle[x_pos % n], cycle[(x_pos + 1) % n]
+                    if s <= x_pos % n <= e or s <= (x_pos + 1) % n <= e or x_pos % n < fixed_prefix - 1:
+                        continue
+                    d_xy = distance_matrix[x, y]
+                    forward_cost = distance_matrix[x, first] + distance_matrix[last, y] - d_xy
+                    reverse_cost = distance_matrix[x, last] + distance_matrix[first, y] - d_xy
+                    insert_cost = min(forward_cost, reverse_cost)
+                    if remove_gain - insert_cost <= IMPROVEMENT_EPSILON:
+                        continue
+                    if windows is not None and not windows.or_opt_feasible(s, e, x_pos % n,
+                                                                           reverse_cost < forward_cost):
+                        continue
+                    if reverse_cost < forward_cost:
+                        segment = segment[::-1]
+                    del cycle[s:e + 1]
+                    x_index = cycle.index(x)
+                    cycle[x_index + 1:x_index + 1] = segment
+                    return [prev_loc, next_loc, x, y, first, last]
+    return None
+
+
+# minimum distance reduction for a move to count as an improvement; guards against cycling on rounding noise
+IMPROVEMENT_EPSILON = 1e-9
+
+# route-improvement moves available to improve_route, tried in the order given
+IMPROVEMENT_MOVES = {
+    '2-opt': two_opt_move,
+    'or-opt': or_opt_move,
+}
+
+
+# Local search that improves a tour(starting & ending at the hub) until no move in moves shortens it or time_budget
+# seconds have elapsed. Moves only consider each location's neighbor_count closest locations, and a location is only
+# re-examined once one of its edges changes(don't-look bits), so each pass is close to linear. The first
+# fixed_prefix locations of the tour stay in place. With windows(a TimeWindows), only moves that keep every stop on
+# time are made. Returns the improved tour as a list of location IDs.
+# space-time complexity: O(N^2)
+def improve_route(distance_matrix, tour, moves=('2-opt', 'or-opt'), time_budget=0.25, neighbor_count=8,
+                  fixed_prefix=1, windows=None):
+    cycle = [int(loc) for loc in tour[:-1]]
+    if len(cycle) - max(fixed_prefix, 1) < 2:
+        return cycle + [cycle[0]]
+    end_time = time.perf_counter() + time_budget
+    move_functions = [IMPROVEMENT_MOVES[move] for move in moves]
+    neighbors = neighbor_lists(distance_matrix, cycle, neighbor_count)
+    position = {cycle_loc: i for i, cycle_loc in enumerate(cycle)}
+    if windows is not None:
+        windows.rebuild(cycle)
+
+    # queue of locations whose don't-look bit is off
+    active = collections.deque(cycle)
+    is_active = set(cycle)
+    while active and time.perf_counter() < end_time:
+        loc = active.popleft()
+        is_active.discard(loc)
+        for move_function in move_functions:
+            touched = move_function(distance_matrix, cycle, position, neighbors, loc, max(fixed_prefix, 1), windows)
+            if touched is not None:
+                position = {cycle_loc: i for i, cycle_loc in enumerate(cycle)}
+                if windows is not None:
+                    windows.rebuild(cycle)
+                for touched_loc in touched:
+                    if touched_loc not in is_active:
+                        active.append(touched_loc)
+                        is_active.add(touched_loc)
+                break
+    return cycle + [cycle[0]]
+
+
+# most stops held_karp accepts: its tables hold 2^N*N entries each, about 250MB together at 20 stops
+EXACT_STOP_LIMIT = 20
+
+
+# Held-Karp dynamic program: returns (distance, tour) for the shortest tour that starts at the hub, visits every
+# location in stops once and returns to the hub, or None if no tour reaches every stop by its deadline. The table is
+# indexed by (bitmask of the stops visited, last stop) and filled one subset size at a time, every subset of that size
+# at once. With deadlines(minutes after midnight, indexed by location ID), states that reach their last stop late are
+# dropped; as the truck never waits, the shortest way into a state is also the earliest, so the tour found is the
+# shortest of those keeping every deadline. Meant for small stop sets: the table holds 2^N*N entries, so raises
+# ValueError for more than EXACT_STOP_LIMIT stops.
+# space-time complexity: O(2^N*N^2) time, O(2^N*N) space
+def held_karp(distance_matrix, stops, deadlines=None, depart=0.0, minutes_per_mile=0.0):
+    stops = numpy.asarray(stops, dtype=numpy.intp)
+    stop_count = len(stops)
+    if stop_count > EXACT_STOP_LIMIT:
+        raise ValueError('held_karp takes at most {} stops, not {}'.format(EXACT_STOP_LIMIT, stop_count))
+    if stop_count == 0:
+        return 0.0, [0, 0]
+    stop_matrix = distance_matrix[numpy.ix_(stops, stops)]
+    # longest distance the truck may have driven on arriving at each stop
+    latest = numpy.full(stop_count, numpy.inf)
+    if deadlines is not None:
+        latest = (deadlines[stops] - depart) / minutes_per_mile + IMPROVEMENT_EPSILON
+
+    subsets = 1 << stop_count
+    distance = numpy.full((subsets, stop_count), numpy.inf)
+    previous = numpy.full((subsets, stop_count), -1, dtype=numpy.int16)
+    firsts = numpy.arange(stop_count)
+    from_hub = distance_matrix[0, stops]
+    distance[1 << firsts, firsts] = numpy.where(from_hub <= latest, from_hub, numpy.inf)
+
+    masks = numpy.arange(subsets)
+    sizes = numpy.zeros(subsets, dtype=numpy.intp)
+    for stop in range(stop_count):
+        sizes += (masks >> stop) & 1
+    for size in range(2, stop_count + 1):
+        size_masks = masks[sizes == size]
+        for stop in range(stop_count):
+            ending = size_masks[(size_masks >> stop) & 1 == 1]
+            # a stop outside the previous subset, this one included, is still infinitely far
+            candidates = distance[ending ^ (1 << stop)] + stop_matrix[:, stop]
+            best = numpy.argmin(candidates, axis=1)
+            best_distance = candidates[numpy.arange(len(ending)), best]
+            distance[ending, stop] = numpy.where(best_distance <= latest[stop], best_distance, numpy.inf)
+            previous[ending, stop] = best
+
+    totals = distance[subsets - 1] + distance_matrix[stops, 0]
+    stop = int(numpy.argmin(totals))
+    if not numpy.isfinite(totals[stop]):
+        return None
+    shortest = float(totals[stop])
+    tour = []
+    mask = subsets - 1
+    while stop >= 0:
+        tour.append(int(stops[stop]))
+        mask, stop = mask ^ (1 << stop), int(previous[mask, stop])
+    return shortest, [0] + tour[::-1] + [0]
+
+
+# Returns (cost, degree of every node) of a minimum spanning tree of the complete graph with the passed-in symmetric
+# cost matrix, grown from node 0 with Prim's algorithm.
+# space-time complexity: O(N^2)
+def spanning_tree(costs):
+    node_count = len(costs)
+    in_tree = numpy.zeros(node_count, dtype=bool)
+    in_tree[0] = True
+    closest = costs[0].copy()
+    closest_node = numpy.zeros(node_count, dtype=numpy.intp)
+    degrees = numpy.zeros(node_count, dtype=numpy.intp)
+    cost = 0.0
+    for _ in range(node_count - 1):
+        node = int(numpy.argmin(numpy.where(in_tree, numpy.inf, closest)))
+        cost += closest[node]
+        degrees[node] += 1
+        degrees[closest_node[node]] += 1
+        in_tree[node] = True
+        closer = costs[node] < closest
+        closest = numpy.where(closer, costs[node], closest)
+        closest_node = numpy.where(closer, node, closest_node)
+    return cost, degrees
+
+
+# Held-Karp lower bound on the length of any tour that starts at the hub, visits every location in stops and returns
+# to the hub. A 1-tree(a spanning tree of the stops plus the hub's two shortest edges) is no longer than such a tour;
+# subgradient steps then add a penalty to every node, pushing nodes of degree above 2 away and below 2 closer, which
+# tightens the bound until the 1-tree is itself a tour or time_budget seconds have elapsed. upper_bound, the length of
+# a known tour, sizes the steps. Deadlines are ignored, so the bound holds for routes keeping them too.
+# space-time complexity: O(N^2) per step
+def one_tree_bound(distance_matrix, stops, upper_bound, time_budget=0.05):
+    nodes = numpy.concatenate(([0], numpy.asarray(stops, dtype=numpy.intp)))
+    if len(nodes) < 3:
+        return tour_distance(distance_matrix, numpy.concatenate((nodes, [0])))
+    base_costs = distance_matrix[numpy.ix_(nodes, nodes)]
+    end_time = time.perf_counter() + time_budget
+    penalties = numpy.zeros(len(nodes))
+    step_scale = 2.0
+    best_bound = 0.0
+    steps_since_improvement = 0
+    while True:
+        costs = base_costs + penalties[:, None] + penalties[None, :]
+        tree_cost, tree_degrees = spanning_tree(costs[1:, 1:])
+        hub_edges = numpy.argpartition(costs[0, 1:], 1)[:2]
+        bound = tree_cost + costs[0, 1 + hub_edges].sum() - 2.0 * penalties.sum()
+        degrees = numpy.concatenate(([2], tree_degrees))
+        degrees[1 + hub_edges] += 1
+        if bound > best_bound + IMPROVEMENT_EPSILON:
+            best_bound = bound
+            steps_since_improvement = 0
+        else:
+            steps_since_improvement += 1
+            if steps_since_improvement >= 5:
+                step_scale /= 2.0
+                steps_since_improvement = 0
+        subgradient = degrees - 2
+        if not subgradient.any() or bound >= upper_bound or time.perf_counter() >= end_time or step_scale < 1e-3:
+            break
+        penalties += step_scale * (upper_bound - bound) / (subgradient @ subgradient) * subgradient
+    return min(float(best_bound), upper_bound)
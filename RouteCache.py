@@ -0,0 +1,70 @@
+import collections
+import os
+import pickle
+
+# bump whenever the layout of saved route caches changes so stale files are ignored
+CACHE_VERSION = 1
+
+
+# Least-recently-used memo of evaluated candidate routes. Keys are frozensets of the location IDs a route visits and
+# values are whatever the caller evaluated for them(Truck stores the nearest neighbor distance & tour). Holds at most
+# capacity entries, dropping the least recently used one when full. The cache can be saved to & loaded from disk;
+# saved entries are only valid for the distance matrix they were evaluated on, so each file records the matrix's
+# fingerprint and is ignored when it does not match.
+class RouteCache:
+    # space-time complexity: O(1)
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # returns the value cached under key(marking it most recently used), or None
+    # space-time complexity: O(1) average
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    # caches value under key, dropping the least recently used entry if the cache is full
+    # space-time complexity: O(1) average
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    # returns the number of cached entries
+    # space-time complexity: O(1)
+    def __len__(self):
+        return len(self.entries)
+
+    # Loads the entries saved at path if they were evaluated on a matrix with the passed-in fingerprint, keeping the
+    # most recently used ones that fit. Returns whether anything was loaded; a missing or stale file loads nothing.
+    # space-time complexity: O(N)
+    def load(self, path, fingerprint):
+        try:
+            with open(path, 'rb') as cache_file:
+                saved = pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False
+        if saved.get('version') != CACHE_VERSION or saved.get('fingerprint') != fingerprint:
+            return False
+        for key, value in list(saved['entries'])[-self.capacity:]:
+            self.put(key, value)
+        return True
+
+    # saves the entries, least recently used first, to path through a temporary file
+    # space-time complexity: O(N)
+    def save(self, path, fingerprint):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path + '.tmp', 'wb') as cache_file:
+            pickle.dump({'version': CACHE_VERSION, 'fingerprint': fingerprint, 'entries': list(self.entries.items())},
+                        cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
@@ -0,0 +1,217 @@
+# Batch what-if mode: plans many departure-time / fleet scenarios in one run and prints a table comparing their miles,
+# late packages and finish times. Scenarios come from a JSON file holding a list of objects, each with a name and any
+# of the DEFAULTS settings it changes, e.g.
+#     [{"name": "two trucks", "departures": ["08:00:01", "09:05:01"]},
+#      {"name": "fast fleet", "planner": "fleet", "speed": 25, "check_times": ["1030", "1200"]}]
+# departures are the trucks' departure times(HH:MM:SS), Truck 1's first, so their count is the fleet size; check_times
+# (HHMM) add columns with the packages delivered & miles driven by then. Scenarios are spread over worker processes,
+# each loading the network once(through Ingest's cache) and reusing it for every scenario it plans. Run from the
+# repository root:
+#     python Scenario.py scenarios.json [--workers 4] [--output results.csv]
+
+from Network import DeliveryNetwork
+from Simulation import EventLog
+from Truck import Truck
+from concurrent.futures import ProcessPoolExecutor
+import Fleet
+import Ingest
+import Route
+import argparse
+import csv
+import datetime
+import json
+import math
+import os
+import time
+
+# settings used for whatever a scenario leaves out; the departures are main.py's
+DEFAULTS = {'planner': 'sequential', 'departures': ['08:00:01', '10:05:01', '09:05:01'], 'speed': 18.0,
+            'capacity': 16, 'check_times': [], 'candidates': 30, 'budget': 1.0, 'seed': 0, 'cluster_size': None,
+            'exact_stops': 15}
+# columns every scenario has, in table order; check time columns follow
+COLUMNS = ('name', 'planner', 'trucks', 'speed', 'capacity', 'miles', 'late_packages', 'minutes_late', 'finish',
+           'undelivered', 'plan_seconds')
+
+# network the worker process plans its scenarios against
+_worker_network = None
+
+
+# loads the network a worker process plans every scenario against
+# space-time complexity: O(N^2)
+def _init_worker(distance_path, package_path, cache_dir):
+    global _worker_network
+    _worker_network = DeliveryNetwork(distance_path, package_path, cache_dir)
+
+
+# returns whether value is a number(an int or a float, but not a bool) at least minimum, above it if not inclusive
+# space-time complexity: O(1)
+def _is_number(value, minimum, inclusive=False, integer=False):
+    if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)):
+        return False
+    return math.isfinite(value) and (value >= minimum if inclusive else value > minimum)
+
+
+# Returns the passed-in scenario settings completed with DEFAULTS, named name if they have no name. Raises ValueError
+# for unknown settings, planners, settings of the wrong type or out of range, or badly formatted times.
+# space-time complexity: O(T + C)
+def complete_scenario(settings, name):
+    unknown = settings.keys() - DEFAULTS.keys() - {'name'}
+    if unknown:
+        raise ValueError('{} has unknown settings: {}'.format(name, ', '.join(sorted(unknown))))
+    scenario = dict(DEFAULTS, name=name)
+    scenario.update(settings)
+    if not isinstance(scenario['name'], str):
+        raise ValueError('{!r}: name must be a string'.format(scenario['name']))
+    if scenario['planner'] not in ('sequential', 'fleet'):
+        raise ValueError('{} has unknown planner: {}'.format(name, scenario['planner']))
+    for setting in ('departures', 'check_times'):
+        if not isinstance(scenario[setting], list) or not all(isinstance(time_string, str)
+                                                              for time_string in scenario[setting]):
+            raise ValueError('{}: {} must be a list of strings'.format(name, setting))
+    if not _is_number(scenario['speed'], 0):
+        raise ValueError('{}: speed must be a positive number of miles per hour'.format(name))
+    if not _is_number(scenario['budget'], 0, inclusive=True):
+        raise ValueError('{}: budget must be a number of seconds, 0 or more'.format(name))
+    for setting in ('capacity', 'candidates'):
+        if not _is_number(scenario[setting], 0, integer=True):
+            raise ValueError('{}: {} must be a positive whole number'.format(name, setting))
+    exact_stops = scenario['exact_stops']
+    if not _is_number(exact_stops, 0, inclusive=True, integer=True) or exact_stops > Route.EXACT_STOP_LIMIT:
+        raise ValueError('{}: exact_stops must be a whole number from 0 to {}'.format(name, Route.EXACT_STOP_LIMIT))
+    if scenario['cluster_size'] is not None and not _is_number(scenario['cluster_size'], 0, integer=True):
+        raise ValueError('{}: cluster_size must be a positive whole number or null'.format(name))
+    seed = scenario['seed']
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+        raise ValueError('{}: seed must be a whole number or null'.format(name))
+    if not scenario['departures']:
+        raise ValueError('{} has no trucks'.format(name))
+    for departure in scenario['departures']:
+        datetime.datetime.strptime(departure, '%H:%M:%S')
+    for check_time in scenario['check_times']:
+        datetime.datetime.strptime(check_time, '%H%M')
+    return scenario
+
+
+# returns the scenarios in a JSON scenario file, each completed with DEFAULTS and named 'scenario N' if unnamed
+# space-time complexity: O(S)
+def load_scenarios(path):
+    with open(path) as scenario_file:
+        entries = json.load(scenario_file)
+    return [complete_scenario(entry, 'scenario {}'.format(number)) for number, entry in enumerate(entries, 1)]
+
+
+# Plans & drives a completed scenario on the passed-in network, resetting its package statuses first. Trucks are
+# planned and driven in order of departure. Returns (trucks in order of departure, Simulation.EventLog of the day).
+# space-time complexity: O(T*K*N^2)
+def plan_scenario(network, scenario):
+    network.reset_statuses()
+    trucks = [Truck('Truck {}'.format(number), departure, network, candidate_count=scenario['candidates'],
+                    seed=scenario['seed'], speed=scenario['speed'], capacity=scenario['capacity'],
+                    cluster_size=scenario['cluster_size'], exact_stops=scenario['exact_stops'])
+              for number, departure in enumerate(scenario['departures'], 1)]
+    trucks.sort(key=lambda truck: truck.current_time)
+    event_log = EventLog()
+    if scenario['planner'] == 'fleet':
+        Fleet.FleetPlanner(trucks, scenario['capacity'], scenario['speed'], time_budget=scenario['budget'],
+                           seed=scenario['seed']).plan()
+        for truck in trucks:
+            truck.deliver_packages(event_log)
+    else:
+        for truck in trucks:
+            truck.create_route()
+            truck.deliver_packages(event_log)
+    return trucks, event_log
+
+
+# plans & drives one scenario on the worker's network and returns its row of the comparison table
+# space-time complexity: O(T*K*N^2)
+def run_scenario(scenario):
+    network = _worker_network
+    start = time.perf_counter()
+    trucks, event_log = plan_scenario(network, scenario)
+    plan_seconds = time.perf_counter() - start
+
+    lateness = [late_by for truck in trucks for late_by in truck.lateness.values()]
+    delivered = sum(len(truck.load) for truck in trucks)
+    return_times = [truck.return_time for truck in trucks if truck.load]
+    row = {'name': scenario['name'], 'planner': scenario['planner'], 'trucks': len(trucks),
+           'speed': scenario['speed'], 'capacity': scenario['capacity'],
+           'miles': round(sum(truck.tour_distance for truck in trucks), 1), 'late_packages': len(lateness),
+           'minutes_late': round(sum(lateness), 1),
+           'finish': max(return_times).strftime('%H:%M:%S') if return_times else '',
+           'undelivered': len(network.package_store.ids) - delivered, 'plan_seconds': round(plan_seconds, 3)}
+    today = trucks[0].current_time.date()
+    for check_time in scenario['check_times']:
+        when = datetime.datetime.combine(today, datetime.datetime.strptime(check_time, '%H%M').time())
+        row['delivered_by_' + check_time] = sum(1 for event in event_log.events_until(when) if event.kind == 'deliver')
+        statuses = [event_log.truck_as_of(truck.name, when) for truck in trucks]
+        row['miles_by_' + check_time] = round(sum(status[1] for status in statuses if status is not None), 1)
+    return row
+
+
+# Runs every scenario against the network in the CSV files and returns their table rows, in scenario order. With
+# workers > 1 the scenarios are planned in that many processes.
+# space-time complexity: O(S*T*K*N^2 / workers)
+def run_scenarios(scenarios, workers=1, distance_path='Distance Table.csv', package_path='Package File.csv',
+                  cache_dir=Ingest.DEFAULT_CACHE_DIR):
+    # parses the CSV files once up front so the workers all start from Ingest's cache
+    Ingest.load_distance_table(distance_path, cache_dir)
+    Ingest.load_package_rows(package_path, cache_dir)
+    if workers <= 1:
+        _init_worker(distance_path, package_path, cache_dir)
+        return [run_scenario(scenario) for scenario in scenarios]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(distance_path, package_path, cache_dir)) as executor:
+        return list(executor.map(run_scenario, scenarios))
+
+
+# returns the table's column names: COLUMNS, then the check time columns of all rows in check time order
+# space-time complexity: O(S*C*log(C))
+def table_columns(rows):
+    check_times = sorted({column.rsplit('_', 1)[1] for row in rows for column in row if column not in COLUMNS})
+    return list(COLUMNS) + [prefix + check_time for check_time in check_times
+                            for prefix in ('delivered_by_', 'miles_by_')]
+
+
+# prints the rows as a fixed-width table, leaving blank the check times a scenario did not ask for
+# space-time complexity: O(S*C)
+def print_table(rows):
+    columns = table_columns(rows)
+    cells = [columns] + [[str(row.get(column, '')) for column in columns] for row in rows]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    for line in cells:
+        print('  '.join(cell.ljust(width) if i == 0 else cell.rjust(width)
+                        for i, (cell, width) in enumerate(zip(line, widths))))
+
+
+# writes the rows to a CSV file
+# space-time complexity: O(S*C)
+def write_table(path, rows):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=table_columns(rows))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plan many what-if scenarios and compare them.')
+    parser.add_argument('scenarios', help='JSON scenario file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='processes planning scenarios')
+    parser.add_argument('--output', help='also write the comparison table to this CSV file')
+    parser.add_argument('--distances', default='Distance Table.csv')
+    parser.add_argument('--packages', default='Package File.csv')
+    args = parser.parse_args()
+
+    scenarios = load_scenarios(args.scenarios)
+    rows = run_scenarios(scenarios, min(args.workers, len(scenarios)), args.distances, args.packages)
+    print_table(rows)
+    if args.output:
+        write_table(args.output, rows)
+        print('Wrote ' + args.output)
+
+
+if __name__ == '__main__':
+    main()
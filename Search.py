@@ -0,0 +1,129 @@
+from concurrent.futures import ProcessPoolExecutor
+from Constraints import mask_from_bits
+from multiprocessing import shared_memory
+import Route
+import numpy
+import random
+
+# read-only planning data installed once in each worker process by _init_worker
+_worker_data = {}
+
+
+# Creates one semi-random package load of at most capacity packages and returns its package IDs. The load starts from
+# the must-go packages in all_packages, then adds random location groupings from the priority packages and then the
+# regular packages while they fit, or randomly drops location groupings(non-priority first) if the must-go packages
+# alone exceed capacity. The package pools are bitsets from Constraints.ConstraintModel.screen; rng is the random
+# module or any random.Random instance.
+# space-time complexity: O(N) to fill, O(N^2) worst case to drop
+def sample_package_load(rng, constraints, all_packages, high_priority_packages, priority_packages, regular_packages,
+                        capacity=16):
+    rand_pack_load = all_packages
+    load_size = rand_pack_load.bit_count()
+    # selects additional packages if space left in truck
+    if load_size < capacity:
+        rem_spots = capacity - load_size
+        location_sizes = constraints.location_sizes
+        chosen_locs = []
+        # selects randomly first from priority packages, then from regular packages
+        for pool in (priority_packages, regular_packages):
+            # qualified locations from which a random grouping of packages(all sharing the same delivery address) is
+            # selected: the pool's locations not yet loaded, in location order. The selected location, and locations
+            # with too many packages for the spots left, are dropped from it as the load fills.
+            qualified_locs = constraints.locations_in(pool & ~rand_pack_load).tolist()
+            largest = max((location_sizes[loc] for loc in qualified_locs), default=0)
+            while rem_spots > 0:
+                if largest > rem_spots:
+                    qualified_locs = [loc for loc in qualified_locs if location_sizes[loc] <= rem_spots]
+                    largest = max((location_sizes[loc] for loc in qualified_locs), default=0)
+                if len(qualified_locs) == 0:
+                    break
+                rand_loc = qualified_locs.pop(rng.randrange(len(qualified_locs)))
+                chosen_locs.append(rand_loc)
+                rem_spots -= int(location_sizes[rand_loc])
+        return constraints.package_ids_in(rand_pack_load | constraints.location_bits(chosen_locs))
+
+    # removes packages if too many loaded onto truck: randomly removes location groupings until total package amount
+    # <= capacity load limit, preferentially removing non-priority packages. Works on the loaded rows in package ID
+    # order, which shrink with every removal.
+    loaded = constraints.id_order[mask_from_bits(rand_pack_load, constraints.size)[constraints.id_order]]
+    prioritized = mask_from_bits(high_priority_packages | priority_packages, constraints.size)
+    while len(loaded) > capacity:
+        removables = loaded[~prioritized[loaded]]
+        if len(removables) == 0:
+            removables = loaded
+        row_to_remove = rng.choice(removables)
+        loaded = loaded[constraints.location_of[loaded] != constraints.location_of[row_to_remove]]
+    return set(constraints.package_ids[loaded].tolist())
+
+
+# attaches a worker process to the shared distance matrix and stores the package metadata it reads for every task
+# space-time complexity: O(N)
+def _init_worker(shm_name, shape, loc_pack_index, constraints, nearest_neighbors):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_data['shm'] = shm
+    _worker_data['distance_matrix'] = numpy.ndarray(shape, dtype=numpy.float64, buffer=shm.buf)
+    _worker_data['loc_pack_index'] = loc_pack_index
+    _worker_data['constraints'] = constraints
+    _worker_data['nearest_neighbors'] = nearest_neighbors
+
+
+# samples and evaluates one chunk of candidate loads in a worker process. Candidate k draws from its own
+# random.Random seeded with seeds[k]. Returns (distance, candidate index, package load) of the chunk's shortest route.
+# space-time complexity: O(K*N^2)
+def _evaluate_chunk(first_index, seeds, package_pools, capacity):
+    distance_matrix = _worker_data['distance_matrix']
+    loc_pack_index = _worker_data['loc_pack_index']
+    loads = [sample_package_load(random.Random(seed), _worker_data['constraints'], *package_pools, capacity)
+             for seed in seeds]
+    stop_masks = numpy.zeros((len(loads), len(distance_matrix)), dtype=bool)
+    stop_masks[:, 0] = True
+    for k, load in enumerate(loads):
+        stop_masks[k, list(loc_pack_index.locations_of(load))] = True
+    distances, tours = Route.batch_nearest_neighbor(distance_matrix, stop_masks, _worker_data['nearest_neighbors'])
+    best = int(numpy.argmin(distances))
+    return float(distances[best]), first_index + best, loads[best]
+
+
+# Runs the best-of-N random load search across a pool of worker processes. The distance matrix is copied once into
+# shared memory and the package metadata is sent once per worker, so tasks only carry their seeds and the truck's
+# package pools. Every candidate gets an independent random stream spawned from seed & the truck's name, so for a
+# given seed the chosen load does not depend on the number of workers. Use as a context manager, or call close() when
+# done.
+class CandidateSearch:
+    # space-time complexity: O(N^2)
+    def __init__(self, distance_matrix, loc_pack_index, constraints, workers, nearest_neighbors=None):
+        self.workers = workers
+        self.shm = shared_memory.SharedMemory(create=True, size=distance_matrix.nbytes)
+        shared_matrix = numpy.ndarray(distance_matrix.shape, dtype=numpy.float64, buffer=self.shm.buf)
+        shared_matrix[:] = distance_matrix
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                            initargs=(self.shm.name, distance_matrix.shape, loc_pack_index,
+                                                      constraints, nearest_neighbors))
+
+    # samples & evaluates candidate_count loads of at most capacity packages drawn from package_pools(all, high
+    # priority, priority and regular package bitsets) and returns the package load with the shortest nearest neighbor
+    # route. Ties go to the lowest candidate index. name(the truck's) is mixed into the seed, so trucks sharing a seed
+    # draw different loads.
+    # space-time complexity: O(K*N^2 / workers)
+    def best_load(self, package_pools, candidate_count, seed=None, capacity=16, name=''):
+        seed_sequence = numpy.random.SeedSequence(seed, spawn_key=tuple(name.encode()))
+        seeds = [int(child.generate_state(1)[0]) for child in seed_sequence.spawn(candidate_count)]
+        chunk_size = max(1, -(-candidate_count // (self.workers * 4)))
+        futures = [self.executor.submit(_evaluate_chunk, start, seeds[start:start + chunk_size], package_pools,
+                                        capacity)
+                   for start in range(0, candidate_count, chunk_size)]
+        results = [future.result() for future in futures]
+        return min(results, key=lambda result: (result[0], result[1]))[2]
+
+    # shuts down the worker processes and releases the shared distance matrix
+    # space-time complexity: O(1)
+    def close(self):
+        self.executor.shutdown()
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,262 @@
+# Planning service: keeps the network and the current plan in memory and answers package & route status queries over
+# a localhost HTTP/JSON API. Planning runs in worker processes(through Scenario's worker network), so status queries
+# are answered from the current plan while a new one is being planned; the new plan replaces it once it is done.
+# Endpoints, where time is HHMM(e.g. 1030) and defaults to the current time of day:
+#     GET  /health                      service is up, and the current plan version
+#     GET  /plan                        current plan: its settings and each truck's route, miles, return time & late
+#                                       packages
+#     POST /plan                        plans again with the JSON body's Scenario settings, e.g. {"planner": "fleet"},
+#                                       and returns the new plan once it is in use
+#     GET  /packages?time=HHMM          every package's details & delivery status as of time
+#     GET  /packages/<id>?time=HHMM     one package's details & delivery status as of time
+#     GET  /routes?time=HHMM            each truck's locations visited, miles driven & whether it is back, as of time
+# Run from the repository root:
+#     python Service.py [--port 8080] [--planner fleet]
+
+from Network import DeliveryNetwork
+from concurrent.futures import ProcessPoolExecutor
+import Ingest
+import Scenario
+import argparse
+import asyncio
+import datetime
+import json
+import time
+import urllib.parse
+
+# reason phrases of the response codes the service sends
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error',
+           503: 'Service Unavailable'}
+
+
+# raised while answering a request to send an error response with the passed-in HTTP status code
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Plans a completed scenario on the worker's network and returns (indexed Simulation.EventLog, truck summaries,
+# planning seconds), which are all the service keeps of a plan. A truck's optimality gap is 0.0 for a provably optimal
+# route and null when unknown. Runs in a worker process.
+# space-time complexity: O(T*K*N^2)
+def _plan(scenario):
+    start = time.perf_counter()
+    trucks, event_log = Scenario.plan_scenario(Scenario._worker_network, scenario)
+    event_log.build_index()
+    summaries = [{'name': truck.name, 'departure': truck.current_time.strftime('%H:%M:%S'), 'route': truck.route,
+                  'packages': sorted(truck.load), 'miles': round(truck.tour_distance, 1),
+                  'optimality_gap': truck.optimality_gap,
+                  'return': truck.return_time.strftime('%H:%M:%S'),
+                  'late_packages': {str(package_id): round(late_by, 1)
+                                    for package_id, late_by in sorted(truck.lateness.items())}}
+                 for truck in trucks]
+    return event_log, summaries, time.perf_counter() - start
+
+
+# one finished plan as the service answers queries from it; never changed once built
+class Plan:
+    # space-time complexity: O(1)
+    def __init__(self, version, scenario, event_log, trucks, plan_seconds):
+        self.version = version
+        self.scenario = scenario
+        self.event_log = event_log
+        self.trucks = trucks
+        self.plan_seconds = plan_seconds
+        self.date = datetime.date.today()
+
+    # returns the plan's settings & truck summaries
+    # space-time complexity: O(T*N)
+    def summary(self):
+        return {'version': self.version, 'settings': self.scenario, 'plan_seconds': round(self.plan_seconds, 3),
+                'miles': round(sum(truck['miles'] for truck in self.trucks), 1), 'trucks': self.trucks}
+
+
+# Runs the service: one DeliveryNetwork for package details, a process pool for planning and the plan in use. Use
+# start() to make the first plan, then serve(); or embed it and call replan() & the query methods directly.
+class PlanningService:
+    # space-time complexity: O(N^2)
+    def __init__(self, distance_path='Distance Table.csv', package_path='Package File.csv',
+                 cache_dir=Ingest.DEFAULT_CACHE_DIR, workers=1):
+        self.network = DeliveryNetwork(distance_path, package_path, cache_dir)
+        # loads the package details now, which also leaves the parsed CSVs in Ingest's cache for the workers
+        self.network.package_table
+        self.network.distance_matrix
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=Scenario._init_worker,
+                                            initargs=(distance_path, package_path, cache_dir))
+        self.plan = None
+        self.requested_plans = 0
+
+    # Plans the day with the passed-in Scenario settings in a worker process and puts the new plan in use, unless a
+    # plan requested later is already in use. Returns the new plan's summary. Raises ValueError for bad settings.
+    # space-time complexity: O(T*K*N^2) in a worker, O(T*N) here
+    async def replan(self, settings=None):
+        scenario = Scenario.complete_scenario(settings or {}, 'plan {}'.format(self.requested_plans + 1))
+        self.requested_plans += 1
+        version = self.requested_plans
+        loop = asyncio.get_running_loop()
+        event_log, trucks, plan_seconds = await loop.run_in_executor(self.executor, _plan, scenario)
+        plan = Plan(version, scenario, event_log, trucks, plan_seconds)
+        if self.plan is None or self.plan.version < version:
+            self.plan = plan
+        return plan.summary()
+
+    # makes the first plan
+    # space-time complexity: O(T*K*N^2)
+    async def start(self, settings=None):
+        return await self.replan(settings)
+
+    # returns the plan in use, raising RequestError if there is none yet
+    # space-time complexity: O(1)
+    def current_plan(self):
+        if self.plan is None:
+            raise RequestError(503, 'no plan yet')
+        return self.plan
+
+    # returns the datetime on the plan's day of an HHMM time string, or of the current time of day if none is given
+    # space-time complexity: O(1)
+    def check_time(self, time_string):
+        if time_string is None:
+            return datetime.datetime.combine(self.current_plan().date, datetime.datetime.now().time())
+        try:
+            check_time = datetime.datetime.strptime(time_string, '%H%M').time()
+        except ValueError:
+            raise RequestError(400, 'time must be HHMM, not ' + time_string)
+        return datetime.datetime.combine(self.current_plan().date, check_time)
+
+    # returns the passed-in package's details & delivery status as of when
+    # space-time complexity: O(log(N))
+    def package_status(self, package_id, when):
+        package = self.network.package_table.lookup(package_id)
+        if package is None:
+            raise RequestError(404, 'no package {}'.format(package_id))
+        return {'id': package_id, 'street': package[1], 'city': package[2], 'state': package[3], 'zip': package[4],
+                'deadline': package[5], 'mass': package[6], 'notes': package[7],
+                'status': self.current_plan().event_log.status_as_of(package_id, when)}
+
+    # returns each truck's locations visited, miles driven & whether it is back at the hub as of when
+    # space-time complexity: O(T*log(N)) plus the number of locations visited
+    def route_status(self, when):
+        plan = self.current_plan()
+        routes = []
+        for truck in plan.trucks:
+            route_status = plan.event_log.truck_as_of(truck['name'], when)
+            tour, miles, finished = route_status if route_status is not None else ([], 0.0, False)
+            routes.append({'name': truck['name'], 'departed': route_status is not None, 'visited': tour,
+                           'miles': round(miles, 1), 'finished': finished})
+        return routes
+
+    # Answers one request and returns (HTTP status code, JSON-serializable body). Raises RequestError for requests it
+    # cannot answer.
+    # space-time complexity: O(N*log(N)) for all packages, O(log(N)) for one
+    async def respond(self, method, target, body):
+        url = urllib.parse.urlsplit(target)
+        query = urllib.parse.parse_qs(url.query)
+        time_string = query['time'][0] if 'time' in query else None
+        parts = [part for part in url.path.split('/') if part]
+        if parts == ['plan'] and method == 'POST':
+            try:
+                settings = json.loads(body or b'{}')
+                if not isinstance(settings, dict):
+                    raise ValueError('settings must be a JSON object')
+                return 200, await self.replan(settings)
+            except ValueError as error:
+                raise RequestError(400, str(error))
+        if method != 'GET':
+            raise RequestError(405, method + ' is not supported here')
+        if parts == ['health']:
+            return 200, {'ok': True, 'plan_version': self.plan.version if self.plan is not None else None}
+        if parts == ['plan']:
+            return 200, self.current_plan().summary()
+        if parts == ['packages']:
+            when = self.check_time(time_string)
+            return 200, [self.package_status(package_id, when) for package_id in self.network.package_table.keys()]
+        if len(parts) == 2 and parts[0] == 'packages':
+            if not parts[1].isdigit():
+                raise RequestError(404, 'no package ' + parts[1])
+            return 200, self.package_status(int(parts[1]), self.check_time(time_string))
+        if parts == ['routes']:
+            return 200, self.route_status(self.check_time(time_string))
+        raise RequestError(404, 'no such endpoint: ' + url.path)
+
+    # Serves HTTP/1.1 requests on one connection, keeping it open between requests unless the client asks to close
+    # it. Every response is JSON; errors are {"error": message}.
+    # space-time complexity: O(1) per request on top of answering it
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    header_line = await reader.readline()
+                    if header_line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header_line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                    body = await reader.readexactly(int(headers.get('content-length', 0)))
+                    status, payload = await self.respond(method, target, body)
+                except RequestError as error:
+                    status, payload = error.status, {'error': str(error)}
+                except ValueError:
+                    status, payload, version = 400, {'error': 'malformed request'}, 'HTTP/1.0'
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                # any other failure still gets an answer, so the tracking page is never left without one
+                except Exception as error:
+                    status, payload = 500, {'error': 'internal error: {}'.format(error)}
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+                data = json.dumps(payload).encode()
+                writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+                             'Connection: {}\r\n\r\n'.format(status, REASONS[status], len(data),
+                                                            'keep-alive' if keep_alive else 'close').encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    # serves the API on host:port until cancelled
+    # space-time complexity: O(1) per request on top of answering it
+    async def serve(self, host='127.0.0.1', port=8080):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+    # shuts down the planning worker processes
+    # space-time complexity: O(1)
+    def close(self):
+        self.executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve package & route status over a localhost HTTP/JSON API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=1, help='processes planning routes')
+    parser.add_argument('--planner', choices=('sequential', 'fleet'), default='sequential')
+    args = parser.parse_args()
+
+    async def run():
+        service = PlanningService(workers=args.workers)
+        try:
+            summary = await service.start({'planner': args.planner})
+            print('Planned {} miles; serving on http://{}:{}'.format(summary['miles'], args.host, args.port))
+            await service.serve(args.host, args.port)
+        finally:
+            service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import bisect
+import collections
+
+# one timestamped step of a simulated delivery day. kind is one of 'depart', 'load', 'arrive', 'deliver' or 'return';
+# package_id is None except for 'load' & 'deliver' events, and miles is the truck's odometer at the event.
+Event = collections.namedtuple('Event', ['time', 'kind', 'truck', 'location', 'package_id', 'miles'])
+
+
+# Time-ordered log of every departure, package load, arrival, delivery and return of a simulated plan. Trucks record
+# their events once while driving their whole route; afterwards "as of T" questions are answered by bisecting the log
+# instead of re-running the routes. The log indexes itself on the first query after new events are recorded.
+class EventLog:
+    # space-time complexity: O(1)
+    def __init__(self):
+        self.events = []
+        self.times = []
+        self.package_history = {}
+        self.truck_history = {}
+        self.indexed = True
+
+    # appends an event to the log
+    # space-time complexity: O(1)
+    def record(self, time, kind, truck, location, package_id=None, miles=0.0):
+        self.events.append(Event(time, kind, truck, location, package_id, miles))
+        self.indexed = False
+
+    # Sorts the events by time(keeping recording order for ties) and builds per-package and per-truck event time lists:
+    # package_history[package_id] = ([times], [status strings]), and truck_history[truck] = ([times], [events]) holding
+    # the truck's depart/arrive/return events.
+    # space-time complexity: O(N*log(N))
+    def build_index(self):
+        self.events.sort(key=lambda event: event.time)
+        self.times = [event.time for event in self.events]
+        self.package_history = {}
+        self.truck_history = {}
+        for event in self.events:
+            if event.kind == 'load':
+                status = 'In route to destination'
+            elif event.kind == 'deliver':
+                status = 'Delivered at ' + event.time.strftime('%H:%M:%S')
+            else:
+                times, events = self.truck_history.setdefault(event.truck, ([], []))
+                times.append(event.time)
+                events.append(event)
+                continue
+            times, statuses = self.package_history.setdefault(event.package_id, ([], []))
+            times.append(event.time)
+            statuses.append(status)
+        self.indexed = True
+
+    # returns all events that happened at or before the passed-in time, in time order
+    # space-time complexity: O(log(N)) plus the size of the result
+    def events_until(self, when):
+        if not self.indexed:
+            self.build_index()
+        return self.events[:bisect.bisect_right(self.times, when)]
+
+    # returns the passed-in package's delivery status string as of the passed-in time
+    # space-time complexity: O(log(N))
+    def status_as_of(self, package_id, when):
+        if not self.indexed:
+            self.build_index()
+        times, statuses = self.package_history.get(package_id, ((), ()))
+        position = bisect.bisect_right(times, when)
+        return statuses[position - 1] if position > 0 else 'At hub'
+
+    # Returns (location IDs visited, miles driven, route finished) for the passed-in truck as of the passed-in time, or
+    # None if the truck has not departed by then.
+    # space-time complexity: O(log(N)) plus the number of locations visited
+    def truck_as_of(self, truck, when):
+        if not self.indexed:
+            self.build_index()
+        times, events = self.truck_history.get(truck, ((), ()))
+        position = bisect.bisect_right(times, when)
+        if position == 0:
+            return None
+        past_events = events[:position]
+        tour = [event.location for event in past_events if event.kind != 'depart']
+        return [0] + tour, past_events[-1].miles, past_events[-1].kind == 'return'
@@ -0,0 +1,86 @@
+import functools
+import json
+import numpy
+import time
+
+# callback receiving each telemetry record, or None while telemetry is disabled
+_sink = None
+
+
+# Turns telemetry on. Every record(a dict holding at least 'event' and 'ts', the Unix time it was emitted) is passed
+# to callback, or written to stream as one line of JSON. Telemetry is off until enabled; while off, instrumented code
+# only pays for one check of _sink per phase.
+# space-time complexity: O(1)
+def enable(callback=None, stream=None):
+    global _sink
+    if callback is None and stream is None:
+        raise ValueError('telemetry needs a callback or a stream')
+    if callback is None:
+        def callback(record):
+            stream.write(json.dumps(record) + '\n')
+    _sink = callback
+
+
+# turns telemetry off
+# space-time complexity: O(1)
+def disable():
+    global _sink
+    _sink = None
+
+
+# returns whether telemetry is on
+# space-time complexity: O(1)
+def enabled():
+    return _sink is not None
+
+
+# stamps a record with the current time and hands it to the sink, if telemetry is on
+# space-time complexity: O(1)
+def emit(record):
+    if _sink is not None:
+        record['ts'] = time.time()
+        _sink(record)
+
+
+# Decorator timing a planning phase. With telemetry on, every call emits a 'phase' record holding the phase name, the
+# name of the object the method belongs to(e.g. the truck), its wall & CPU seconds, and whatever metrics(owner)
+# returns once the phase is done. With telemetry off the method is called straight through.
+# space-time complexity: O(1) on top of the phase
+def phase(name, metrics=None):
+    def decorate(function):
+        @functools.wraps(function)
+        def timed(owner, *args, **kwargs):
+            if _sink is None:
+                return function(owner, *args, **kwargs)
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            result = function(owner, *args, **kwargs)
+            record = {'event': 'phase', 'phase': name, 'owner': getattr(owner, 'name', None),
+                      'wall_s': time.perf_counter() - wall_start, 'cpu_s': time.process_time() - cpu_start}
+            if metrics is not None:
+                record.update(metrics(owner))
+            emit(record)
+            return result
+        return timed
+    return decorate
+
+
+# returns the candidate count and best & mean tour distances of an array of candidate tour distances
+# space-time complexity: O(N)
+def distance_summary(distances):
+    distances = numpy.asarray(distances, dtype=float)
+    if len(distances) == 0:
+        return {'candidates': 0}
+    return {'candidates': len(distances), 'best_distance': float(distances.min()),
+            'mean_distance': float(distances.mean())}
+
+
+# emits a 'hashtable' record with the key count and mean & longest lookup probe lengths of a hashtable, if telemetry
+# is on
+# space-time complexity: O(N) when on, O(1) when off
+def record_table(name, table):
+    if _sink is None:
+        return
+    probe_lengths = table.probe_lengths()
+    emit({'event': 'hashtable', 'table': name, 'type': type(table).__name__, 'keys': len(probe_lengths),
+          'mean_probe': sum(probe_lengths) / len(probe_lengths) if probe_lengths else 0.0,
+          'max_probe': max(probe_lengths, default=0)})
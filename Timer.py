@@ -2,6 +2,7 @@ import datetime
 
 
 # converts user input to datetime object which corresponds to end_time for each truck's route processing algorithm.
+# Returns None once the user enters 'q', leaving it to the caller to stop asking.
 # space-time complexity: O(1)
 def delivery_status_timer():
     start_date = datetime.date.today()
@@ -13,7 +14,7 @@ def delivery_status_timer():
         entry_string = input('To check delivery status, enter time in format HHMM between 0800 & 1700 (enter \'q\' to '
                              'exit): ')
         if entry_string == 'q' or entry_string == 'Q':
-            exit()
+            return None
 
         end_time = None
         try:
@@ -32,3 +33,23 @@ def delivery_status_timer():
                 return end_date_time
             else:
                 print('Please enter a valid time between 0800 & 1700.')
+
+
+# converts a time string such as '10:30 AM' or '9:05 am' to minutes after midnight
+# space-time complexity: O(1)
+def parse_minutes(time_string):
+    parsed = datetime.datetime.strptime(time_string.upper().replace(' ', ''), '%I:%M%p')
+    return parsed.hour * 60 + parsed.minute
+
+
+# converts minutes after midnight(as from minutes_after_midnight) to an 'HH:MM:SS' string
+# space-time complexity: O(1)
+def format_minutes(minute):
+    hours, seconds = divmod(round(minute * 60), 3600)
+    return '{:02d}:{:02d}:{:02d}'.format(hours, seconds // 60, seconds % 60)
+
+
+# converts a datetime to(fractional) minutes after midnight
+# space-time complexity: O(1)
+def minutes_after_midnight(date_time):
+    return date_time.hour * 60 + date_time.minute + date_time.second / 60
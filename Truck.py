@@ -1,368 +1,310 @@
-from HashTable import ChainingHashTable
-import Location
-import Package
+from Package import PackageStatus
+import Network
+import Route
+import Search
+import Telemetry
+import Timer
 import datetime
+import numpy
 import random
 
 
-class Truck:
-    # creates a hashtable each for package info, location info, and for mapping package IDs to location IDs
-    package_table = Package.create_package_table()
-    loc_table = Location.create_location_table()
-    loc_pack_table = Location.create_loc_package_table(loc_table, package_table)
+# telemetry metrics describing a truck's current route
+# space-time complexity: O(N)
+def _route_metrics(truck):
+    return {'stops': max(len(truck.route) - 2, 0), 'packages': len(truck.load),
+            'distance': Route.tour_distance(truck.network.distance_matrix, truck.route),
+            'late_packages': len(truck.lateness), 'optimality_gap': truck.optimality_gap}
+
+
+# telemetry metrics describing a truck's candidate loads & the route cache they were looked up in
+# space-time complexity: O(K)
+def _candidate_metrics(truck):
+    route_cache = truck.network.route_cache
+    return dict(Telemetry.distance_summary(truck.candidate_distances), cache_hits=route_cache.hits,
+                cache_misses=route_cache.misses, cache_size=len(route_cache))
+
 
-    # Truck constructor creates object-specific name, location hashtable, route distance & timer, package list,
-    # and list of location sets
+class Truck:
+    # Truck constructor creates object-specific name, location array, route distance & timer, package list,
+    # and list of location sets. candidate_count sets how many random package loads are evaluated per route, and
+    # improvement_moves & improvement_budget(seconds) configure the local search run on the chosen route. workers > 1
+    # searches the loads in that many processes. speed(miles per hour) & capacity(packages per load) describe the
+    # truck, cluster_size turns on cluster-first route construction for larger routes, and routes of at most exact_stops
+    # stops(0 to Route.EXACT_STOP_LIMIT, else ValueError) are solved exactly instead of by local search. A seed makes
+    # the search reproducible: single-process trucks then draw loads from their own random.Random, seeded from the
+    # seed & truck name so trucks sharing a seed draw different loads; without one they draw from the random module.
+    # network is the Network.DeliveryNetwork to plan against; trucks created without one share
+    # Network.default_network().
     # space-time complexity: O(1)
-    def __init__(self, name, current_time):
+    def __init__(self, name, current_time, network=None, candidate_count=30, improvement_moves=('2-opt', 'or-opt'),
+                 improvement_budget=0.25, workers=1, seed=None, speed=18.0, capacity=16, cluster_size=None,
+                 exact_stops=15):
+        if not 0 <= exact_stops <= Route.EXACT_STOP_LIMIT:
+            raise ValueError('exact_stops must be 0 to {}, not {}'.format(Route.EXACT_STOP_LIMIT, exact_stops))
         self.name = name
+        self.network = network if network is not None else Network.default_network()
+        # truck number used to match 'Can only be on truck N' notes, e.g. 2 for 'Truck 2'
+        self.number = int(name.split()[-1]) if name.split()[-1].isdigit() else 0
         today = datetime.datetime.today()
         time_obj = datetime.datetime.strptime(current_time, '%H:%M:%S').time()
         self.current_time = datetime.datetime.combine(today, time_obj)
-        self.destination_table = ChainingHashTable(len(Truck.loc_table.table))
+        self.destination_table = numpy.array([0], dtype=numpy.intp)
         self.loc_list = []
         self.tour_distance = 0
-        self.package_set_list = [set() for _ in range(30)]
+        self.return_time = self.current_time
+        self.candidate_count = candidate_count
+        self.package_set_list = [set() for _ in range(candidate_count)]
+        self.improvement_moves = improvement_moves
+        self.improvement_budget = improvement_budget
+        self.route = [0, 0]
+        self.baseline_distance = 0
+        self.nearest_neighbor_tour = [0, 0]
+        self.lateness = {}
+        # lower bound on the route's distance & how far above it the route is(0.0 when provably optimal); the gap is
+        # None until the route is improved
+        self.lower_bound = 0.0
+        self.optimality_gap = None
+        # IDs of the packages the truck carries
+        self.load = set()
+        # nearest neighbor distances of the candidate loads last evaluated
+        self.candidate_distances = numpy.zeros(0)
+        self.workers = workers
+        self.seed = seed
+        self.rng = random if seed is None else random.Random('{}/{}'.format(seed, name))
+        self.speed = speed
+        self.minutes_per_mile = 60.0 / speed
+        self.capacity = capacity
+        self.cluster_size = cluster_size
+        self.exact_stops = exact_stops
+        self.package_pools = 0, 0, 0, 0
 
+    # Plans the truck's route. With more than one worker, the random load search runs in a process pool and only the
+    # winning load is mapped & routed here.
+    @Telemetry.phase('create_route', _route_metrics)
     def create_route(self):
-        self.screen_packages()
+        if self.workers > 1:
+            self.classify_packages()
+            network = self.network
+            with Search.CandidateSearch(network.distance_matrix, network.loc_pack_index, network.constraints,
+                                        self.workers, network.nearest_neighbors) as search:
+                self.package_set_list = [search.best_load(self.package_pools, self.candidate_count, self.seed,
+                                                          self.capacity, self.name)]
+        else:
+            self.screen_packages()
         self.map_packages_to_locations()
         self.determine_best_route()
+        self.construct_route()
+        self.improve_route()
+
+    # Sorts the packages still at the hub by delivery deadlines, required groupings, flight delays, etc. into the
+    # pools random loads are drawn from: must-go packages, high priority(co-delivered) packages, priority(deadline
+    # before end of day) packages and regular packages. Stores them as a tuple of bitsets in package_pools, screened by
+    # the network's compiled Constraints.ConstraintModel; packages sharing a location or that must be delivered together
+    # always stay in the same pool.
+    # space-time complexity: O(N)
+    @Telemetry.phase('classify_packages',
+                     lambda truck: {'pool_sizes': [pool.bit_count() for pool in truck.package_pools]})
+    def classify_packages(self):
+        self.package_pools = self.network.constraints.screen(self.network.package_store.statuses,
+                                                             Timer.minutes_after_midnight(self.current_time),
+                                                             self.number)
 
     # Selects packages to load based on delivery deadlines, required groupings, flight delays, etc. Results in list
-    # of 30 sets across 30 semi-randomized iterations. Each set first selects for delivery priority and/or
-    # constraints before adding additional, randomly-selected package IDs up to the limit of 16 packages.
-    # space-time complexity: O(N^2)
+    # of candidate_count sets across as many semi-randomized iterations. Each set first selects for delivery priority
+    # and/or constraints before adding additional, randomly-selected package IDs up to the truck's capacity.
+    # space-time complexity: O(K*N)
+    @Telemetry.phase('screen_packages', lambda truck: {'candidates': len(truck.package_set_list)})
     def screen_packages(self):
-        all_packages = set(range(1, len(Truck.package_table.table) + 1))
-        high_priority_packages = set()
-        priority_packages = set()
-        regular_packages = set()
-        non_deliverables = set()
-        today = datetime.datetime.today()
-
-        # removes from the delivery pool all currently non-deliverable packages
-        # space-time complexity: O(N^2)
-        for pack_id in all_packages:
-            pack_value = Truck.package_table.lookup(str(pack_id))
-            if pack_value is not None and (
-                    (self.current_time < today.replace(hour=10, minute=5, second=0) and 'Wrong address' in pack_value[
-                        7]) or
-                    (self.current_time < today.replace(hour=9, minute=5, second=0) and 'Delayed' in pack_value[7]) or
-                    (('Truck 1' or 'Truck 3') in self.name and 'truck 2' in pack_value[7]) or (
-                            'At hub' not in pack_value[8])):
-                for pack_list in Truck.loc_pack_table.table:
-                    if pack_id in pack_list:
-                        non_deliverables.update(set(pack_list))
-                        break
-        all_packages -= non_deliverables
-
-        # removes from the delivery pool all packages that must be delivered together
-        # space-time complexity: O(N^2)
-        for pack_id in all_packages:
-            pack_value = Truck.package_table.lookup(str(pack_id))
-            if pack_value is not None:
-                if 'Must be delivered with' in pack_value[7]:
-                    codeliveries = [int(s) for s in pack_value[7].split() if s.isdigit()]
-                    high_priority_packages.update(codeliveries)
-                    for pack_list in Truck.loc_pack_table.table:
-                        if (pack_id in pack_list) or any(x in pack_list for x in codeliveries):
-                            high_priority_packages.update(set(pack_list))
-        all_packages -= high_priority_packages
-
-        # removes from the delivery pool all packages with morning deadlines
-        # space-time complexity: O(N^2)
-        for pack_id in all_packages:
-            pack_value = Truck.package_table.lookup(str(pack_id))
-            if pack_value is not None:
-                if '9:00' in pack_value[5] or '10:30' in pack_value[5]:
-                    for pack_list in Truck.loc_pack_table.table:
-                        if pack_id in pack_list:
-                            priority_packages.update(set(pack_list))
-                            break
-        all_packages -= priority_packages
-
-        # removes from the delivery pool all remaining packages
-        # space-time complexity: O(N^2)
-        for pack_id in all_packages:
-            pack_value = Truck.package_table.lookup(str(pack_id))
-            if pack_value is not None:
-                for pack_list in Truck.loc_pack_table.table:
-                    if pack_id in pack_list:
-                        regular_packages.update(set(pack_list))
-                        break
-        all_packages -= regular_packages
-
-        # reloads delivery pool with priority packages
-        all_packages.update(high_priority_packages)
-        all_packages.update(priority_packages)
-
-        # creates 30 randomly loaded package sets with priority-package preference and max load size of 16
-        # space-time complexity: O(N^2)
-        for i in range(30):
-            rand_pack_load = all_packages.copy()
-            # selects additional packages if space left in truck
-            if len(rand_pack_load) < 16:
-                rem_spots = 16 - len(rand_pack_load)
-                spots_too_small = False
-                # selects randomly first from priority packages
-                while rem_spots > 0 and not spots_too_small:
-                    spots_too_small = True
-                    qualified_pack_lists = []
-                    for pack_list in Truck.loc_pack_table.table:
-                        # checks if list of packages at a location is subset of priority packages & not subset of
-                        # packages already loaded. If so, adds it to qualified packages list from which a random
-                        # grouping of packages(all sharing the same delivery address) is selected
-                        if set(pack_list).issubset(priority_packages) and set(pack_list).isdisjoint(
-                                rand_pack_load) and rem_spots >= len(pack_list) > 0:
-                            qualified_pack_lists.append(pack_list)
-                            spots_too_small = False
-                    if len(qualified_pack_lists) > 0:
-                        rand_pack_index = random.randrange(len(qualified_pack_lists))
-                        rand_pack_list = qualified_pack_lists[rand_pack_index]
-                        rand_pack_load.update(rand_pack_list)
-                        rem_spots -= len(rand_pack_list)
+        self.classify_packages()
+        # creates candidate_count randomly loaded package sets with priority-package preference and max load size of
+        # capacity
+        for i in range(self.candidate_count):
+            self.package_set_list[i] = Search.sample_package_load(self.rng, self.network.constraints,
+                                                                  *self.package_pools, self.capacity)
 
-                spots_too_small = False
-                # if there are still spots on the truck remaining after loading priority packages, randomly selects
-                # from regular packages
-                while rem_spots > 0 and not spots_too_small:
-                    spots_too_small = True
-                    qualified_pack_lists = []
-                    for pack_list in Truck.loc_pack_table.table:
-                        # checks if list of packages at a location is subset of regular packages & not subset of
-                        # packages already loaded. If so, adds it to qualified packages list from which a random
-                        # grouping of packages(all sharing the same delivery address) is selected
-                        if set(pack_list).issubset(regular_packages) and set(pack_list).isdisjoint(
-                                rand_pack_load) and rem_spots >= len(pack_list) > 0:
-                            qualified_pack_lists.append(pack_list)
-                            spots_too_small = False
-                    if len(qualified_pack_lists) > 0:
-                        rand_pack_index = random.randrange(len(qualified_pack_lists))
-                        rand_pack_list = qualified_pack_lists[rand_pack_index]
-                        rand_pack_load.update(rand_pack_list)
-                        rem_spots -= len(rand_pack_list)
-
-            # removes packages if too many loaded onto truck
-            else:
-                # randomly removes package groupings until total package amount <= 16 load limit, preferentially
-                # removing non-priority packages
-                while len(rand_pack_load) > 16:
-                    if rand_pack_load.issubset(high_priority_packages.union(priority_packages)):
-                        pack_to_remove = random.sample(rand_pack_load, 1)[0]
-                        for pack_list in Truck.loc_pack_table.table:
-                            if int(pack_to_remove) in pack_list:
-                                rand_pack_load -= set(pack_list)
-                    else:
-                        removables = rand_pack_load.difference(high_priority_packages.union(priority_packages))
-                        pack_to_remove = random.sample(removables, 1)[0]
-                        for pack_list in Truck.loc_pack_table.table:
-                            if int(pack_to_remove) in pack_list:
-                                rand_pack_load -= set(pack_list)
-
-            # assigns this iteration's semi-random package set to an index in the object's list field.
-            self.package_set_list[i] = rand_pack_load
-
-    # iterates through 30 randomized package ID sets to produce 30 corresponding location ID sets
-    # space-time complexity: O(N^2)
+    # iterates through the randomized package ID sets to produce corresponding arrays of location IDs. Each array is
+    # sorted, always starts with the hub(location 0), and indexes directly into the shared distance matrix.
+    # space-time complexity: O(K*N*log(N))
+    @Telemetry.phase('map_packages_to_locations', lambda truck: {'candidates': len(truck.loc_list)})
     def map_packages_to_locations(self):
+        self.loc_list = []
         for i in range(len(self.package_set_list)):
-            dest_table = ChainingHashTable(len(Truck.loc_table.table))
-            # inserts hub location and distances from it into destination hashtable
-            dest_table.insert(0, (Truck.loc_table.lookup(0))[1])
-            # inserts into destination hashtable only locations(and their corresponding distances) who will receive
-            # packages with IDs in the set.
-            # space-time complexity: O(N^2)
-            for package_id in self.package_set_list[i]:
-                for loc_pack_list in Truck.loc_pack_table.table:
-                    loc_pack_index = Truck.loc_pack_table.table.index(loc_pack_list)
-                    if package_id in loc_pack_list and dest_table.lookup(loc_pack_index) is None:
-                        dest_table.insert(loc_pack_index, (Truck.loc_table.lookup(loc_pack_index))[1])
-            loc_list = []
-            # re-formats destination hashtable into pairings of a location ID and a list of tuples of neighbors & their
-            # distances from that location
-            # space-time complexity: O(N^2)
-            for bucket in dest_table.table:
-                if len(bucket) > 0:
-                    # adds only location id to loc_list
-                    loc_list.append(bucket[0][0])
-                    new_list = []
-                    for j, elem in enumerate(bucket[0][1]):
-                        tup = (j, float(elem))
-                        new_list.append(tup)
-                    bucket[0][1] = new_list
-            # filters out from the table all locations with no packages being delivered this particular route
-            # final result in the following form: [[[0, [(0, 0.0), (2, 3.8),...]]], [], [[2, [(0, 3.8), (2, 0.0),...[]]
-            # space-time complexity: O(N^2)
-            for bucket in dest_table.table:
-                if len(bucket) > 0:
-                    new_list = []
-                    table_entry = dest_table.lookup(bucket[0][0])
-                    for tup in table_entry:
-                        if tup[0] in loc_list:
-                            new_list.append(tup)
-                    bucket[0][1] = new_list
-
-            # creates a list containing each randomized list of locations and their corresponding neighbors & distances
-            tup = i, dest_table
+            # adds only locations who will receive packages with IDs in the set
+            dest_locs = {0} | self.network.loc_pack_index.locations_of(self.package_set_list[i])
+            # final result in the following form: (0, array([0, 2, 5, ...]))
+            tup = i, numpy.array(sorted(dest_locs), dtype=numpy.intp)
             self.loc_list.append(tup)
 
-    # takes in 30 location sets and returns 30 routes with distances, then sorts & selects shortest route
-    # space-time complexity: O(N^2)
+    # Evaluates the candidate location arrays with the batched nearest neighbor heuristic, then selects the shortest
+    # route. Evaluations are memoized in the network's route cache by location set, so candidates visiting the same
+    # locations as another candidate, or as one evaluated earlier, are only looked up. The shortest route's nearest
+    # neighbor tour & distance are kept as the baseline the final route is measured against.
+    # space-time complexity: O(K*N^2)
+    @Telemetry.phase('determine_best_route', _candidate_metrics)
     def determine_best_route(self):
-        distance_list = []
-        for i in range(len(self.loc_list)):
-            current_loc = 0
-            # list indicating all locations visited thus far
-            trial_tour = [current_loc]
-            trial_tour_distance = 0
-
-            # loops while current_loc has unvisited neighbors(ie. not yet in trial_tour list)
-            while len(set([adj_loc for (adj_loc, distance) in self.loc_list[i][1].lookup(current_loc)]).difference(
-                    set(trial_tour))) > 0:
-                min_distance_adj = None
-                min_distance = None
-                # iterates through list of tuples of each neighboring location & its corresponding distance
-                for each_adj_loc, each_adj_distance in self.loc_list[i][1].lookup(current_loc):
-                    # ensures trial_tour not standing still or revisiting already-visited locations
-                    if each_adj_loc != current_loc and each_adj_loc not in trial_tour:
-                        # finds the closest neighboring location across all iterations of the for loop
-                        if min_distance is not None:
-                            if min_distance > each_adj_distance:
-                                min_distance = each_adj_distance
-                                min_distance_adj = each_adj_loc
-                        else:
-                            min_distance = each_adj_distance
-                            min_distance_adj = each_adj_loc
-                closest_adj_loc = (min_distance_adj, min_distance)
-                # visits closest neighboring location
-                trial_tour.append(closest_adj_loc[0])
-                # reassigns current_loc to the closest neighboring location
-                current_loc = closest_adj_loc[0]
-                # increments trial_tour's total travel distance
-                trial_tour_distance += closest_adj_loc[1]
-            # return to hub once all locations visited
-            trial_tour.append(0)
-            trial_tour_distance += self.loc_list[i][1].lookup(current_loc)[0][1]
+        route_cache = self.network.route_cache
+        keys = [frozenset(route_locs.tolist()) for i, route_locs in self.loc_list]
+        evaluated = {}
+        for key in keys:
+            if key not in evaluated:
+                evaluated[key] = route_cache.get(key)
+        missing = [key for key, evaluation in evaluated.items() if evaluation is None]
+        if missing:
+            stop_masks = numpy.zeros((len(missing), len(self.network.distance_matrix)), dtype=bool)
+            for row, key in enumerate(missing):
+                stop_masks[row, list(key)] = True
+            distances, tours = Route.batch_nearest_neighbor(self.network.distance_matrix, stop_masks,
+                                                            self.network.nearest_neighbors)
+            for key, distance, tour in zip(missing, distances, tours):
+                evaluated[key] = float(distance), tour.copy()
+                route_cache.put(key, evaluated[key])
+        self.candidate_distances = numpy.array([evaluated[key][0] for key in keys])
+        # selects the first of the shortest routes
+        shortest_route = int(numpy.argmin(self.candidate_distances))
+        distance, tour = evaluated[keys[shortest_route]]
 
-            trial_tuple = i, trial_tour_distance
-            distance_list.append(trial_tuple)
-        distance_list.sort(key=lambda tup: tup[1])
-        # selects the 1st tuple(route #, distance) in sorted distance_list
-        shortest_route = distance_list[0]
+        # assigns to truck's final destination table the shortest route's location array
+        self.destination_table = self.loc_list[shortest_route][1]
+        self.load = set(self.package_set_list[shortest_route])
+        self.nearest_neighbor_tour = [int(loc) for loc in tour]
+        self.baseline_distance = distance
 
-        # assigns to truck's final destination table the shortest route's (of 30 trials) destination table
-        self.destination_table = self.loc_list[shortest_route[0]][1]
+    # Builds the route with deadline-aware cheapest insertion: locations are inserted earliest deadline first(farthest
+    # from the hub first among equal deadlines), each where it adds the least distance without making any stop late.
+    # A location that cannot be reached on time goes where it adds the least distance. The nearest neighbor tour is
+    # kept instead if its packages are in total no later and it is no longer. Trucks with a cluster_size build routes
+    # of more stops than that cluster-first/route-second(Route.cluster_first_route) instead.
+    # space-time complexity: O(N^2), or O(N*(c + N/c)) for clusters of c stops
+    @Telemetry.phase('construct_route', _route_metrics)
+    def construct_route(self):
+        distance_matrix = self.network.distance_matrix
+        deadlines = self.network.stop_deadlines
+        depart = Timer.minutes_after_midnight(self.current_time)
+        route_locs = sorted((int(loc) for loc in self.destination_table[1:]),
+                            key=lambda loc: (deadlines[loc], -distance_matrix[0, loc], loc))
+        if self.cluster_size is not None and len(route_locs) > self.cluster_size:
+            stops = Route.cluster_first_route(distance_matrix, deadlines, self.minutes_per_mile, depart, route_locs,
+                                              self.cluster_size)
+        else:
+            stops = []
+            for loc in route_locs:
+                insertion = Route.cheapest_insertion(distance_matrix, deadlines, self.minutes_per_mile, depart, stops,
+                                                     loc)
+                if insertion is None:
+                    insertion = Route.cheapest_insertion(distance_matrix, None, self.minutes_per_mile, depart, stops,
+                                                         loc)
+                stops.insert(insertion[1], loc)
 
-    # Nearest neighbor heuristic algorithm that iterates through all locations in the hashtable to find the closest
-    # neighbors, adds those neighbors to the tour list, and adds their "edges" to the total tour distance. Repeats
-    # process with closest location until all locations visited.
-    # space-time complexity: O(N^2)
-    def deliver_packages(self, check_time):
-        # ensures route does not begin after user-entered check time.
-        if self.current_time > check_time:
-            return 0
+        def total_lateness_and_distance(route):
+            return sum(self.package_lateness(route).values()), Route.tour_distance(distance_matrix, route)
+        self.route = min([0] + stops + [0], self.nearest_neighbor_tour, key=total_lateness_and_distance)
 
-        # updates package status as truck begins delivery route
-        # space-time complexity: O(N^2)
-        for bucket in self.destination_table.table:
-            if len(bucket) > 0:
-                for package in Truck.loc_pack_table.table[bucket[0][0]]:
-                    Truck.package_table.update(str(package), 'In route to destination')
+    # Shortens the constructed route with the configured 2-opt/Or-opt local search. Every move is checked against the
+    # stops' deadlines in O(1) through Route.TimeWindows, so the improved route reaches no stop after its deadline, or
+    # later than the constructed route does where that is already late. Routes of at most exact_stops stops are instead
+    # replaced by the shortest route keeping those same deadlines(Route.held_karp), making them provably optimal;
+    # longer routes get a lower bound(Route.one_tree_bound) to report their optimality gap against. Records the
+    # packages still delivered late.
+    # space-time complexity: O(2^N*N^2) up to exact_stops stops, O(N^2) above
+    @Telemetry.phase('improve_route', _route_metrics)
+    def improve_route(self):
+        distance_matrix = self.network.distance_matrix
+        depart = Timer.minutes_after_midnight(self.current_time)
+        path = numpy.array(self.route, dtype=numpy.intp)
+        arrivals = depart + numpy.cumsum(distance_matrix[path[:-1], path[1:]]) * self.minutes_per_mile
+        deadlines = self.network.stop_deadlines.copy()
+        # a stop the constructed route reaches late may not get any later
+        deadlines[path[1:-1]] = numpy.maximum(deadlines[path[1:-1]], arrivals[:-1])
+        stops = path[1:-1]
+        exact = None
+        if len(stops) <= self.exact_stops:
+            exact = Route.held_karp(distance_matrix, stops, deadlines, depart, self.minutes_per_mile)
+        if exact is not None:
+            self.lower_bound, self.route = exact
+            self.optimality_gap = 0.0
+        else:
+            windows = Route.TimeWindows(distance_matrix, deadlines, depart, self.minutes_per_mile)
+            self.route = Route.improve_route(distance_matrix, self.route, moves=self.improvement_moves,
+                                             time_budget=self.improvement_budget, windows=windows)
+            distance = Route.tour_distance(distance_matrix, self.route)
+            self.lower_bound = Route.one_tree_bound(distance_matrix, stops, distance)
+            self.optimality_gap = distance / self.lower_bound - 1.0 if self.lower_bound > 0 else 0.0
+        self.lateness = self.package_lateness(self.route)
 
-        # flag indicating user-specified check-time occurs while route still being processed
-        out_for_delivery = False
-        current_loc = 0
-        # list indicating all locations visited thus far
-        tour = [current_loc]
+    # returns {package ID: minutes late} for the loaded packages the given route would deliver after their deadline
+    # space-time complexity: O(N)
+    def package_lateness(self, route):
+        distance_matrix = self.network.distance_matrix
+        lateness = {}
         tour_time = self.current_time
+        for prev_loc, next_loc in zip(route, route[1:]):
+            tour_time += datetime.timedelta(seconds=(distance_matrix[prev_loc, next_loc] / self.speed) * 3600.0)
+            arrival = Timer.minutes_after_midnight(tour_time)
+            for package_id in self.network.loc_pack_index.packages_at[next_loc] & self.load:
+                late_by = arrival - self.network.package_store.deadline(package_id)
+                if late_by > 0:
+                    lateness[package_id] = late_by
+        return lateness
 
-        # continues looping while current_loc's neighbors not yet visited(ie. not yet in tour list). Difference
-        # between unvisited locations & tour list approaches 0 as locations are added to the tour list in each loop
-        # iteration.
-        # space-time complexity: O(N^2)
-        while len(set([adj_loc for (adj_loc, distance) in self.destination_table.lookup(current_loc)]).difference(
-                set(tour))) > 0:
-            min_distance_adj = None
-            min_distance = None
-            # iterates through list of tuples of each neighboring location & its corresponding distance
-            for each_adj_loc, each_adj_distance in self.destination_table.lookup(current_loc):
-                # ensures tour not standing still or revisiting already-visited locations
-                if each_adj_loc != current_loc and each_adj_loc not in tour:
-                    # checks if location has a package due soon and adds location to tour regardless of distance
-                    if self.package_due_soon(each_adj_loc):
-                        tour.append(each_adj_loc)
-                        self.tour_distance += each_adj_distance
-                        if tour_time + datetime.timedelta(seconds=(each_adj_distance / 18.0) * 3600.0) > check_time:
-                            out_for_delivery = True
-                            break
-                        tour_time += datetime.timedelta(seconds=(each_adj_distance / 18.0) * 3600.0)
-                        current_loc = each_adj_loc
-                        # updates status of all packages with destinations corresponding to this location's location ID
-                        for package_id in Truck.loc_pack_table.table[current_loc]:
-                            Truck.package_table.update(str(package_id),
-                                                       'Delivered at ' + str(tour_time.strftime("%H:%M:%S")))
-                        continue
+    # Drives the whole planned route once, recording into event_log(a Simulation.EventLog) the departure, the loading of
+    # every package in the truck's load, each arrival & package delivery, and the return to the hub. Adds each "edge" to
+    # the total tour distance and marks the load's packages loaded & delivered(with their delivery times) in the package
+    # store, in bulk per stop, so trucks planned afterwards leave them alone.
+    # space-time complexity: O(N)
+    @Telemetry.phase('deliver_packages', lambda truck: {'miles': truck.tour_distance})
+    def deliver_packages(self, event_log):
+        loc_pack_index = self.network.loc_pack_index
+        tour_time = self.current_time
+        event_log.record(tour_time, 'depart', self.name, 0)
+        # updates package status as truck begins delivery route
+        for package_id in sorted(self.load):
+            event_log.record(tour_time, 'load', self.name, 0, package_id)
+        self.network.package_store.update_many(self.load, PackageStatus.EN_ROUTE)
 
-                    # finds the closest neighboring location across all iterations of the for loop
-                    if min_distance is not None:
-                        if min_distance > each_adj_distance:
-                            min_distance = each_adj_distance
-                            min_distance_adj = each_adj_loc
-                    else:
-                        min_distance = each_adj_distance
-                        min_distance_adj = each_adj_loc
-            if out_for_delivery:
-                break
-            closest_adj_loc = (min_distance_adj, min_distance)
-            # calculates seconds elapsed traveling the current edge
-            edge_seconds = (closest_adj_loc[1] / 18.0) * 3600.0
-            # if latest delivery will put tour time past user-specified end time, cancels delivery of package & breaks
-            # out of loop
-            if tour_time + datetime.timedelta(seconds=edge_seconds) > check_time:
-                out_for_delivery = True
-                break
-            # adds closest neighboring location to the tour (ie. visits closest neighbor)
-            tour.append(closest_adj_loc[0])
-            # reassigns current_loc to the closest neighboring location
-            current_loc = closest_adj_loc[0]
-            # increments tour's total travel distance
-            self.tour_distance += closest_adj_loc[1]
-            # increments tour's current datetime value by seconds elapsed this edge
-            tour_time += datetime.timedelta(seconds=edge_seconds)
-            # updates status of all packages with destinations corresponding to this location's location ID
-            for package_id in Truck.loc_pack_table.table[current_loc]:
-                Truck.package_table.update(str(package_id), 'Delivered at ' + str(tour_time.strftime("%H:%M:%S")))
-        # returning to hub
-        if not out_for_delivery:
-            tour.append(0)
-            self.tour_distance += self.destination_table.lookup(current_loc)[0][1]
+        self.tour_distance = 0
+        for prev_loc, next_loc in zip(self.route, self.route[1:]):
+            edge_distance = float(self.network.distance_matrix[prev_loc, next_loc])
+            # increments tour's total travel distance and current datetime value by time elapsed this edge
+            self.tour_distance += edge_distance
+            tour_time += datetime.timedelta(seconds=(edge_distance / self.speed) * 3600.0)
+            if next_loc == 0:
+                event_log.record(tour_time, 'return', self.name, 0, miles=self.tour_distance)
+                continue
+            event_log.record(tour_time, 'arrive', self.name, next_loc, miles=self.tour_distance)
+            # updates status of the loaded packages with destinations corresponding to this location's location ID
+            delivered = loc_pack_index.packages_at[next_loc] & self.load
+            for package_id in sorted(delivered):
+                event_log.record(tour_time, 'deliver', self.name, next_loc, package_id, self.tour_distance)
+            self.network.package_store.update_many(delivered, PackageStatus.DELIVERED,
+                                                   Timer.minutes_after_midnight(tour_time))
+        self.return_time = tour_time
 
-        self.current_time = tour_time
-        tour_minutes = (self.tour_distance / 18.0) * 60
+    # prints the locations visited, miles & minutes driven as of the passed-in check time, looked up in the event log;
+    # prints nothing if the truck has not departed by then
+    # space-time complexity: O(log(N))
+    def print_route_status(self, event_log, check_time):
+        route_status = event_log.truck_as_of(self.name, check_time)
+        if route_status is None:
+            return
+        tour, miles, finished = route_status
+        tour_minutes = miles * self.minutes_per_mile
+        miles_saved = self.baseline_distance - Route.tour_distance(self.network.distance_matrix, self.route)
 
         # prints route-specific data
         print(self.name + ' - Location IDs:', end=' ')
         print('{:<60}'.format(str(tour)), end='')
-        print('{:.0f} miles.\t'.format(self.tour_distance), end='')
-        print('{:.0f} minutes.'.format(tour_minutes))
-        if out_for_delivery:
+        print('{:.0f} miles.\t'.format(miles), end='')
+        print('{:.0f} minutes.\t'.format(tour_minutes), end='')
+        print('{:.1f} miles saved vs nearest neighbor.'.format(miles_saved), end='')
+        if self.optimality_gap == 0.0:
+            print('\tOptimal.')
+        elif self.optimality_gap is not None:
+            print('\tAt most {:.1%} above optimal.'.format(self.optimality_gap))
+        else:
+            print()
+        if self.lateness:
+            print('Late packages: ' + ', '.join('{} by {:.0f} minutes'.format(package_id, late_by)
+                                                for package_id, late_by in sorted(self.lateness.items())))
+        if not finished:
             print('Delivery still underway...')
-
-    # checks location to see if has packages due within next 30 minutes
-    # space-time complexity: O(N)
-    def package_due_soon(self, each_adj_loc):
-        pack_list = Truck.loc_pack_table.table[each_adj_loc]
-        if len(pack_list) > 0:
-            for package in pack_list:
-                if '9:00' in Truck.package_table.lookup(str(package))[5]:
-                    deadline = self.current_time.replace(hour=9, minute=0, second=0)
-                    # if deadline within 30 minutes after current_time, return True
-                    if (deadline > self.current_time) and (deadline - self.current_time).seconds / 60 < 30:
-                        return True
-                elif '10:30' in Truck.package_table.lookup(str(package))[5]:
-                    deadline = self.current_time.replace(hour=10, minute=30, second=0)
-                    # if deadline within 30 minutes after current_time, return True
-                    if (deadline > self.current_time) and (deadline - self.current_time).seconds / 60 < 30:
-                        return True
-            return False
@@ -0,0 +1,72 @@
+# Micro-benchmark comparing ChainingHashTable(at the fixed 40-bucket capacity create_package_table used) with
+# OpenAddressingHashTable. For each manifest size, both tables are filled with that many packages and then timed on a
+# random sample of insert, lookup, update & remove calls. Run from the repository root:
+#     python -m benchmarks.hash_table [--sizes 10000 100000 1000000] [--sample 1000]
+
+from HashTable import ChainingHashTable, OpenAddressingHashTable
+import argparse
+import random
+import time
+
+
+# fills a table with package IDs 1..size. The chaining table is filled by appending straight to its buckets, since
+# size calls to its insert(which scans the bucket for duplicates) would take hours at 1M packages.
+# space-time complexity: O(N)
+def fill_table(table, size, package_value):
+    if isinstance(table, ChainingHashTable):
+        for package_id in range(1, size + 1):
+            table.table[table.hash_key(package_id)].append([str(package_id), package_value])
+    else:
+        for package_id in range(1, size + 1):
+            table.insert(str(package_id), package_value)
+
+
+# returns the mean time in microseconds of calling operation once per key
+# space-time complexity: O(N)
+def time_operation(operation, keys):
+    start = time.perf_counter()
+    for key in keys:
+        operation(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+# times each table operation on sample random keys against a table already holding size packages
+# space-time complexity: O(N)
+def benchmark_table(table, size, sample, rng):
+    package_value = ['0', '', '', '', '', 'EOD', '0', '', 'At hub']
+    start = time.perf_counter()
+    fill_table(table, size, package_value)
+    fill_seconds = time.perf_counter() - start
+    existing_keys = [str(rng.randint(1, size)) for _ in range(sample)]
+    new_keys = [str(size + 1 + i) for i in range(sample)]
+    return {
+        'fill_s': fill_seconds,
+        'insert_us': time_operation(lambda key: table.insert(key, package_value), new_keys),
+        'lookup_us': time_operation(table.lookup, existing_keys),
+        'update_us': time_operation(lambda key: table.update(key, 'Delivered'), existing_keys),
+        'remove_us': time_operation(table.remove, new_keys),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare ChainingHashTable with OpenAddressingHashTable.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--sample', type=int, default=1000, help='operations timed per size')
+    parser.add_argument('--capacity', type=int, default=40, help='ChainingHashTable bucket count')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print('{:<10}{:<26}{:>10}{:>12}{:>12}{:>12}{:>12}'.format('Packages', 'Table', 'Fill s', 'Insert us',
+                                                              'Lookup us', 'Update us', 'Remove us'))
+    for size in args.sizes:
+        tables = [('ChainingHashTable({})'.format(args.capacity), ChainingHashTable(args.capacity)),
+                  ('OpenAddressingHashTable', OpenAddressingHashTable(40))]
+        for name, table in tables:
+            result = benchmark_table(table, size, args.sample, random.Random(args.seed))
+            print('{:<10}{:<26}{:>10.2f}{:>12.2f}{:>12.2f}{:>12.2f}{:>12.2f}'.format(
+                size, name, result['fill_s'], result['insert_us'], result['lookup_us'], result['update_us'],
+                result['remove_us']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+# Times each planning phase on synthetic networks of growing size and records the peak memory each phase allocates.
+# For every size, a CSV pair is generated with benchmarks.synthetic and one truck is planned & driven from it, phase
+# by phase. The truck's capacity defaults to every package of the instance, so its route grows with the instance and
+# the routing phases scale with N rather than with a fixed load. Timings are the best of --repeat runs; peak memory
+# comes from one extra run under tracemalloc, so tracing does not slow the timed runs. Results, plus each phase's
+# scaling exponent(slope of log time over log stops), are written as JSON so runs can be compared across versions. Run
+# from the repository root:
+#     python -m benchmarks.phases [--sizes 50 200 1000] [--capacity 16] [--output phases.json]
+
+from Network import DeliveryNetwork
+from Simulation import EventLog
+from Truck import Truck
+from benchmarks import synthetic
+import Ingest
+import Location
+import Package
+import argparse
+import datetime
+import json
+import numpy
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+# phases in the order the pipeline runs them
+PHASES = ('parse_distance_csv', 'parse_package_csv', 'create_package_table', 'create_package_store',
+          'create_loc_package_index', 'screen_packages', 'map_packages_to_locations', 'determine_best_route',
+          'construct_route', 'improve_route', 'deliver_packages')
+
+
+# Runs the pipeline once on a CSV pair, from parsing to driving the route of one truck carrying up to capacity
+# packages. Every phase is called through measure(phase name, function), which returns the function's result.
+# space-time complexity: O(N^2 + K*N^2)
+def run_pipeline(distance_path, package_path, candidate_count, improvement_budget, capacity, seed, measure):
+    random.seed(seed)
+    loc_descriptions, distance_matrix = measure('parse_distance_csv', lambda: Ingest.parse_distance_csv(distance_path))
+    package_rows = measure('parse_package_csv', lambda: Ingest.parse_package_csv(package_path))
+    network = DeliveryNetwork(loc_descriptions=loc_descriptions, distance_matrix=distance_matrix,
+                              package_rows=package_rows)
+    network.package_table = measure('create_package_table', lambda: Package.create_package_table(package_rows))
+    network.package_store = measure('create_package_store',
+                                    lambda: Package.create_package_store(network.package_table))
+
+    def create_loc_package_index():
+        loc_table = Location.create_location_table(loc_descriptions, distance_matrix)
+        return loc_table, Location.create_loc_package_index(loc_table, network.package_table)
+    network.loc_table, network.loc_pack_index = measure('create_loc_package_index', create_loc_package_index)
+
+    truck = Truck('Truck 1', '08:00:01', network, candidate_count=candidate_count,
+                  improvement_budget=improvement_budget, capacity=capacity)
+    measure('screen_packages', truck.screen_packages)
+    measure('map_packages_to_locations', truck.map_packages_to_locations)
+    measure('determine_best_route', truck.determine_best_route)
+    measure('construct_route', truck.construct_route)
+    measure('improve_route', truck.improve_route)
+    measure('deliver_packages', lambda: truck.deliver_packages(EventLog()))
+
+
+# returns {phase: seconds} for the fastest of repeat runs of each phase
+# space-time complexity: O(R*(N^2 + K*N^2))
+def time_phases(paths, candidate_count, improvement_budget, capacity, seed, repeat):
+    seconds = {}
+
+    def measure(phase, function):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        seconds[phase] = min(seconds.get(phase, elapsed), elapsed)
+        return result
+
+    for _ in range(repeat):
+        run_pipeline(*paths, candidate_count, improvement_budget, capacity, seed, measure)
+    return seconds
+
+
+# returns {phase: bytes} of memory allocated at each phase's peak, above what was allocated when it started
+# space-time complexity: O(N^2 + K*N^2)
+def trace_phases(paths, candidate_count, improvement_budget, capacity, seed):
+    peak_bytes = {}
+
+    def measure(phase, function):
+        tracemalloc.reset_peak()
+        allocated = tracemalloc.get_traced_memory()[0]
+        result = function()
+        peak_bytes[phase] = tracemalloc.get_traced_memory()[1] - allocated
+        return result
+
+    tracemalloc.start()
+    try:
+        run_pipeline(*paths, candidate_count, improvement_budget, capacity, seed, measure)
+    finally:
+        tracemalloc.stop()
+    return peak_bytes
+
+
+# returns each phase's least-squares slope of log(seconds) over log(stops), or None with fewer than 2 sizes
+# space-time complexity: O(S)
+def scaling_exponents(runs):
+    exponents = {}
+    for phase in PHASES:
+        points = [(run['stops'], run['seconds'][phase]) for run in runs if run['seconds'][phase] > 0]
+        if len({stops for stops, seconds in points}) < 2:
+            exponents[phase] = None
+            continue
+        log_stops = numpy.log([stops for stops, seconds in points])
+        log_seconds = numpy.log([seconds for stops, seconds in points])
+        exponents[phase] = float(numpy.polyfit(log_stops, log_seconds, 1)[0])
+    return exponents
+
+
+# returns the short hash of the checked-out commit, or None outside a git checkout
+# space-time complexity: O(1)
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time & trace each planning phase on synthetic networks.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 1000], help='locations, hub included')
+    parser.add_argument('--packages-per-stop', type=float, default=2.0)
+    parser.add_argument('--metric', choices=('euclidean', 'road'), default='euclidean')
+    parser.add_argument('--deadline-share', type=float, default=0.3)
+    parser.add_argument('--constraint-share', type=float, default=0.1,
+                        help='share of packages with a delayed, truck-only, co-delivery or wrong-address note')
+    parser.add_argument('--candidates', type=int, default=30, help='random loads evaluated per route')
+    parser.add_argument('--improvement-budget', type=float, default=0.25, help='seconds of route improvement')
+    parser.add_argument('--capacity', type=int, help='packages the truck carries(default: every package)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per size; the fastest is kept')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='phases.json', help='JSON results file')
+    args = parser.parse_args()
+
+    runs = []
+    for stops in args.sizes:
+        packages = max(1, int(stops * args.packages_per_stop))
+        capacity = args.capacity if args.capacity is not None else packages
+        share = args.constraint_share / 4
+        network = synthetic.generate_network(stops, packages, args.metric, args.deadline_share, share, share, share,
+                                             share, seed=args.seed)
+        with tempfile.TemporaryDirectory() as directory:
+            paths = synthetic.write_network(directory, *network)
+            seconds = time_phases(paths, args.candidates, args.improvement_budget, capacity, args.seed, args.repeat)
+            peak_bytes = trace_phases(paths, args.candidates, args.improvement_budget, capacity, args.seed)
+        runs.append({'stops': stops, 'packages': packages, 'capacity': capacity, 'seconds': seconds,
+                     'peak_bytes': peak_bytes})
+    exponents = scaling_exponents(runs)
+
+    # prints milliseconds per phase, one column per size, and each phase's scaling exponent
+    print('{:<28}'.format('Phase(ms) / stops') + ''.join('{:>12}'.format(run['stops']) for run in runs) +
+          '{:>10}'.format('Exponent'))
+    for phase in PHASES:
+        exponent = '' if exponents[phase] is None else '{:.2f}'.format(exponents[phase])
+        print('{:<28}'.format(phase) + ''.join('{:>12.2f}'.format(run['seconds'][phase] * 1000) for run in runs) +
+              '{:>10}'.format(exponent))
+
+    results = {
+        'commit': current_commit(),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'settings': vars(args),
+        'runs': runs,
+        'scaling_exponents': exponents,
+    }
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+    print('Wrote ' + args.output)
+
+
+if __name__ == '__main__':
+    main()
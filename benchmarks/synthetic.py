@@ -0,0 +1,125 @@
+# Generator for synthetic delivery networks in the layout of 'Distance Table.csv' & 'Package File.csv', for measuring
+# how planning scales past the sample 27-location/40-package day. Locations are scattered over a square area around a
+# central hub; 'euclidean' distances are straight lines, 'road' distances follow a street grid(Manhattan distance)
+# stretched by up to 30% depending on how well connected the two locations' streets are. Deadlines & Special Notes
+# are mixed in at the passed-in shares, worded like the sample notes so Package.PackageStore parses them the same way.
+# Run from the repository root to write a CSV pair:
+#     python -m benchmarks.synthetic --stops 500 --packages 1000 --out synthetic_day
+
+import argparse
+import csv
+import numpy
+import os
+import random
+
+# deadlines given to packages that are not due at end of day
+DEADLINES = ('9:00 AM', '10:30 AM', '12:00 PM', '2:00 PM')
+# rows of the distance matrix computed at once, which bounds the generator's temporary memory
+BLOCK_ROWS = 1024
+
+
+# Returns (location descriptions, distance matrix, package rows) for a synthetic network of stops locations(hub
+# included) and packages packages. Package rows follow the package CSV's column order. deadline_share of the packages
+# get a deadline from DEADLINES; delayed, truck-only, co-delivery & wrong-address notes are given to about their
+# shares of the packages, at most one note each.
+# space-time complexity: O(N^2)
+def generate_network(stops, packages, metric='euclidean', deadline_share=0.3, delayed_share=0.05,
+                     truck_only_share=0.05, co_delivery_share=0.02, wrong_address_share=0.01, trucks=3, area=20.0,
+                     seed=0):
+    if stops < 2:
+        raise ValueError('a network needs the hub and at least one delivery location')
+    if metric not in ('euclidean', 'road'):
+        raise ValueError('unknown metric: ' + metric)
+    generator = numpy.random.default_rng(seed)
+    rng = random.Random(seed)
+
+    points = generator.random((stops, 2)) * area
+    points[0] = area / 2
+    # how far out of the way each location's street is; a pair's detour factor is 1 plus the two added together
+    detours = generator.uniform(0.0, 0.15, stops)
+    distance_matrix = numpy.empty((stops, stops))
+    for start in range(0, stops, BLOCK_ROWS):
+        block = points[start:start + BLOCK_ROWS, None, :] - points[None, :, :]
+        if metric == 'euclidean':
+            distance_matrix[start:start + BLOCK_ROWS] = numpy.hypot(block[..., 0], block[..., 1])
+        else:
+            distance_matrix[start:start + BLOCK_ROWS] = numpy.abs(block).sum(axis=2) * \
+                (1.0 + detours[start:start + BLOCK_ROWS, None] + detours[None, :])
+    distance_matrix = numpy.round(distance_matrix, 1)
+    numpy.fill_diagonal(distance_matrix, 0.0)
+
+    loc_descriptions = ['Delivery Hub'] + ['{} Synthetic Way'.format(loc_id) for loc_id in range(1, stops)]
+    package_rows = []
+    notes = {}
+    # co-delivery groups of 2 to 4 packages; the first package of a group names the others
+    package_ids = list(range(1, packages + 1))
+    rng.shuffle(package_ids)
+    position = 0
+    while position < int(packages * co_delivery_share):
+        group = package_ids[position:position + rng.randint(2, 4)]
+        if len(group) > 1:
+            notes[group[0]] = 'Must be delivered with ' + ', '.join(str(package_id) for package_id in group[1:])
+            for package_id in group[1:]:
+                notes[package_id] = ''
+        position += len(group)
+    for package_id in package_ids[position:]:
+        draw = rng.random()
+        if draw < delayed_share:
+            notes[package_id] = 'Delayed on flight---will not arrive to depot until 9:05 am'
+        elif draw < delayed_share + truck_only_share:
+            notes[package_id] = 'Can only be on truck {}'.format(rng.randint(1, trucks))
+        elif draw < delayed_share + truck_only_share + wrong_address_share:
+            notes[package_id] = 'Wrong address listed. Corrected at 10:20 AM'
+
+    for package_id in range(1, packages + 1):
+        loc_id = rng.randrange(1, stops)
+        deadline = rng.choice(DEADLINES) if rng.random() < deadline_share else 'EOD'
+        package_rows.append((str(package_id), loc_descriptions[loc_id], 'Salt Lake City', 'UT', '84107', deadline,
+                             str(rng.randint(1, 90)), notes.get(package_id, '')))
+    return loc_descriptions, distance_matrix, package_rows
+
+
+# Writes a generated network to directory as 'Distance Table.csv'(lower triangle filled in, like the sample) and
+# 'Package File.csv'. Returns (distance CSV path, package CSV path).
+# space-time complexity: O(N^2)
+def write_network(directory, loc_descriptions, distance_matrix, package_rows):
+    os.makedirs(directory, exist_ok=True)
+    distance_path = os.path.join(directory, 'Distance Table.csv')
+    package_path = os.path.join(directory, 'Package File.csv')
+    with open(distance_path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['DISTANCE BETWEEN LOCATIONS IN MILES'] + loc_descriptions)
+        for loc_id, description in enumerate(loc_descriptions):
+            distances = ['{:.1f}'.format(distance) for distance in distance_matrix[loc_id, :loc_id + 1]]
+            writer.writerow([description] + distances + [''] * (len(loc_descriptions) - loc_id - 1))
+    with open(package_path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Package\nID', 'Address', 'City ', 'State', 'Zip', 'Delivery\nDeadline', 'Mass\nKILO',
+                         'Special Notes'])
+        writer.writerows(package_rows)
+    return distance_path, package_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic Distance Table.csv & Package File.csv pair.')
+    parser.add_argument('--stops', type=int, default=200, help='locations, hub included')
+    parser.add_argument('--packages', type=int, default=400)
+    parser.add_argument('--metric', choices=('euclidean', 'road'), default='euclidean')
+    parser.add_argument('--deadline-share', type=float, default=0.3)
+    parser.add_argument('--delayed-share', type=float, default=0.05)
+    parser.add_argument('--truck-only-share', type=float, default=0.05)
+    parser.add_argument('--co-delivery-share', type=float, default=0.02)
+    parser.add_argument('--wrong-address-share', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='synthetic_network', help='directory the CSV files are written to')
+    args = parser.parse_args()
+
+    network = generate_network(args.stops, args.packages, args.metric, args.deadline_share, args.delayed_share,
+                               args.truck_only_share, args.co_delivery_share, args.wrong_address_share,
+                               seed=args.seed)
+    for path in write_network(args.out, *network):
+        print('Wrote ' + path)
+
+
+if __name__ == '__main__':
+    main()
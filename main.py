@@ -1,35 +1,96 @@
 # Project Author: Dana K Lowe | dlowe47@wgu.edu
 
+from Network import DeliveryNetwork
+from Simulation import EventLog
 from Truck import Truck
+import Distance
+import Fleet
+import Telemetry
 import Timer
 import Package
+import argparse
 
-# takes 8AM start time, user input delivery status "check time", and creates corresponding datetime object
-check_time = Timer.delivery_status_timer()
+parser = argparse.ArgumentParser(description='Plans the day\'s truck routes and reports delivery status.')
+parser.add_argument('--fleet', action='store_true', help='plan all trucks together instead of one after another')
+parser.add_argument('--budget', type=float, default=1.0, help='seconds the fleet planner spends improving routes')
+parser.add_argument('--telemetry', metavar='PATH', help='append planning telemetry to PATH as JSON lines')
+parser.add_argument('--seed', type=int, help='seed making the plan reproducible')
+parser.add_argument('--snapshot', metavar='PATH',
+                    help='write every package\'s end-of-day status to PATH(CSV, or JSON lines if it ends in .jsonl)')
+parser.add_argument('--route-cache', metavar='PATH',
+                    help='load evaluated routes from PATH before planning and save them back after')
+parser.add_argument('--roads', nargs=2, metavar=('GRAPH', 'ADDRESSES'),
+                    help='compute distances from a road graph edge list & an address book, not the distance table')
+parser.add_argument('--road-workers', type=int, default=1, metavar='N',
+                    help='worker processes computing new --roads distances in parallel')
+args = parser.parse_args()
+telemetry_file = open(args.telemetry, 'a', buffering=1) if args.telemetry else None
+if telemetry_file is not None:
+    Telemetry.enable(stream=telemetry_file)
 
-# creates Truck objects, each with its own name, departure time, location hash table, etc.
-truck_1 = Truck('Truck 1', "08:00:01")
-truck_2 = Truck('Truck 2', "10:05:01")
-truck_3 = Truck('Truck 3', "09:05:01")
+# loads package & location data from the CSV files on first use
+distance_provider = Distance.RoadDistances(*args.roads, workers=args.road_workers) if args.roads else None
+network = DeliveryNetwork(route_cache_path=args.route_cache, distance_provider=distance_provider)
+# records every departure, load, arrival, delivery & return of the day's plan
+event_log = EventLog()
 
-# creates route using location & package CSV files, prioritization, randomization, and nearest neighbor algorithm.
-truck_1.create_route()
-# parses best available route, updates truck time & distance, and updates delivery status of relevant packages
-truck_1.deliver_packages(check_time)
+# creates Truck objects, each with its own name, departure time, route, etc., all planning against the same network
+truck_1 = Truck('Truck 1', "08:00:01", network, seed=args.seed)
+truck_2 = Truck('Truck 2', "10:05:01", network, seed=args.seed)
+truck_3 = Truck('Truck 3', "09:05:01", network, seed=args.seed)
+trucks = [truck_1, truck_3, truck_2]
 
-truck_3.create_route()
-truck_3.deliver_packages(check_time)
+if args.fleet:
+    # assigns & sequences every package across all trucks at once, then drives each truck's route
+    unassigned = Fleet.FleetPlanner(trucks, time_budget=args.budget, seed=args.seed).plan()
+    if unassigned:
+        print('No truck can take packages', sorted(unassigned))
+    for truck in trucks:
+        truck.deliver_packages(event_log)
+else:
+    # creates route using location & package CSV files, prioritization, randomization, and nearest neighbor algorithm.
+    truck_1.create_route()
+    # drives the whole route once, recording its events and updating delivery status of relevant packages
+    truck_1.deliver_packages(event_log)
 
-truck_2.create_route()
-truck_2.deliver_packages(check_time)
+    truck_3.create_route()
+    truck_3.deliver_packages(event_log)
 
-# calculates and prints sum of all route distances
-total_distance = truck_1.tour_distance + truck_2.tour_distance + truck_3.tour_distance
-print('\n{:.1f} total miles.\n'.format(total_distance))
+    truck_2.create_route()
+    truck_2.deliver_packages(event_log)
+    network.save_route_cache()
 
-print('Package status as of', check_time, '...\n')
-print('{:<4}{:<30}{:<18}{:<8}{:<5}{:<11}{:<2}'.format('ID', 'Street', 'City', 'Zip', 'Kgs', 'Deadline', 'Delivery '
-                                                                                                        'Status'))
-# accesses hashtable lookup function to print status of all packages as of the user-specified check time
-for entry in Truck.package_table.table:
-    Package.get_package_info(Truck.package_table, entry[0][0])
+if args.snapshot:
+    # writes the end-of-day status of every package in one pass
+    count = Package.write_snapshot(args.snapshot, network.package_table, network.package_store)
+    print('Wrote {} packages to {}'.format(count, args.snapshot))
+
+# planning is over, so nothing more is recorded
+if telemetry_file is not None:
+    Telemetry.disable()
+    telemetry_file.close()
+
+# answers delivery status checks from the recorded plan until the user enters 'q'
+while True:
+    # takes user input delivery status "check time" and creates corresponding datetime object
+    check_time = Timer.delivery_status_timer()
+    if check_time is None:
+        break
+    for truck in trucks:
+        truck.print_route_status(event_log, check_time)
+
+    # calculates and prints sum of all route distances driven as of the check time
+    total_distance = 0
+    for truck in trucks:
+        route_status = event_log.truck_as_of(truck.name, check_time)
+        if route_status is not None:
+            total_distance += route_status[1]
+    print('\n{:.1f} total miles.\n'.format(total_distance))
+
+    print('Package status as of', check_time, '...\n')
+    print('{:<4}{:<30}{:<18}{:<8}{:<5}{:<11}{:<2}'.format('ID', 'Street', 'City', 'Zip', 'Kgs', 'Deadline', 'Delivery '
+                                                                                                            'Status'))
+    # prints status of all packages as of the user-specified check time
+    for package_id, p_info in network.package_table.items():
+        Package.print_package_info(p_info, event_log.status_as_of(package_id, check_time))
+    print()
@@ -0,0 +1,109 @@
+# Run from the repository root: python -m pytest tests
+
+import Fleet
+import Route
+import Timer
+from Network import DeliveryNetwork
+from Truck import Truck
+import pytest
+
+DEPARTURES = (('Truck 1', '08:00:01'), ('Truck 3', '09:05:01'), ('Truck 2', '10:05:01'))
+
+
+# returns the sample day's trucks, all planning against one fresh network
+def sample_trucks(departures=DEPARTURES):
+    network = DeliveryNetwork()
+    return [Truck(name, departure, network, seed=7) for name, departure in departures]
+
+
+# returns {package ID: minute its truck reaches its location} for every package the trucks carry, at 18 mph
+def delivery_minutes(trucks):
+    minutes = {}
+    for truck in trucks:
+        network = truck.network
+        reached = {}
+        clock = Timer.minutes_after_midnight(truck.current_time)
+        for a, b in zip(truck.route, truck.route[1:-1]):
+            clock += network.distance_matrix[a, b] * 60.0 / 18.0
+            reached.setdefault(b, clock)
+        for package_id in truck.load:
+            minutes[package_id] = reached[network.loc_pack_index.location_of[package_id]]
+    return minutes
+
+
+@pytest.fixture(scope='module')
+def sample_plan():
+    trucks = sample_trucks()
+    unassigned = Fleet.FleetPlanner(trucks, time_budget=0.2, seed=7).plan()
+    return trucks, unassigned
+
+
+def test_every_package_rides_exactly_one_truck(sample_plan):
+    trucks, unassigned = sample_plan
+    loads = [truck.load for truck in trucks]
+    assert unassigned == set()
+    assert sum(len(load) for load in loads) == len(set().union(*loads)) == len(trucks[0].network.package_store.ids)
+
+
+def test_loads_fit_the_capacity_and_the_routes_visit_them(sample_plan):
+    trucks, unassigned = sample_plan
+    for truck in trucks:
+        location_of = truck.network.loc_pack_index.location_of
+        assert len(truck.load) <= 16
+        assert truck.route[0] == truck.route[-1] == 0
+        assert {location_of[package_id] for package_id in truck.load} == set(truck.route[1:-1])
+
+
+def test_baseline_is_a_nearest_neighbor_tour_over_the_route(sample_plan):
+    trucks, unassigned = sample_plan
+    for truck in trucks:
+        tour = truck.nearest_neighbor_tour
+        assert sorted(tour[1:-1]) == sorted(truck.route[1:-1])
+        assert truck.baseline_distance == pytest.approx(Route.tour_distance(truck.network.distance_matrix, tour))
+        distance_matrix = truck.network.distance_matrix
+        for position in range(1, len(tour) - 1):
+            rest = tour[position:-1]
+            assert distance_matrix[tour[position - 1], tour[position]] == min(distance_matrix[tour[position - 1], rest])
+
+
+def test_truck_only_packages_ride_their_truck(sample_plan):
+    trucks, unassigned = sample_plan
+    store = trucks[0].network.package_store
+    for truck in trucks:
+        for package_id in truck.load:
+            assert store.required_trucks[store.index[package_id]] in (0, truck.number)
+
+
+def test_packages_leave_after_reaching_the_hub_and_arrive_by_their_deadlines(sample_plan):
+    trucks, unassigned = sample_plan
+    store = trucks[0].network.package_store
+    for truck in trucks:
+        for package_id in truck.load:
+            assert store.available_at[store.index[package_id]] <= Timer.minutes_after_midnight(truck.current_time)
+    for package_id, minute in delivery_minutes(trucks).items():
+        assert minute <= store.deadlines[store.index[package_id]] + 1e-9
+    assert all(not truck.lateness for truck in trucks)
+
+
+def test_co_delivered_packages_share_a_truck(sample_plan):
+    trucks, unassigned = sample_plan
+    truck_of = {package_id: truck.name for truck in trucks for package_id in truck.load}
+    for package_id, partner_ids in trucks[0].network.package_store.co_deliveries.items():
+        assert all(truck_of[partner_id] == truck_of[package_id] for partner_id in partner_ids)
+
+
+def test_packages_beyond_the_capacity_are_unassigned():
+    trucks = sample_trucks()
+    unassigned = Fleet.FleetPlanner(trucks, capacity=8, time_budget=0.1, seed=7).plan()
+    loads = [truck.load for truck in trucks]
+    assert all(len(load) <= 8 for load in loads)
+    assert unassigned.isdisjoint(set().union(*loads))
+    assert len(unassigned) + sum(len(load) for load in loads) == len(trucks[0].network.package_store.ids)
+
+
+def test_truck_only_packages_without_their_truck_are_unassigned():
+    trucks = sample_trucks((('Truck 1', '10:30:01'), ('Truck 3', '10:30:01')))
+    store = trucks[0].network.package_store
+    truck_2_only = {package_id for package_id in store.ids if store.required_trucks[store.index[package_id]] == 2}
+    unassigned = Fleet.FleetPlanner(trucks, capacity=40, time_budget=0.1, seed=7).plan()
+    assert truck_2_only and truck_2_only <= unassigned
@@ -0,0 +1,98 @@
+# Run from the repository root: python -m pytest tests
+
+from HashTable import OpenAddressingHashTable
+import pytest
+import random
+
+
+# asserts the table holds exactly the entries of expected(a dict), through every way of reading it
+def assert_same(table, expected):
+    assert len(table) == len(expected)
+    assert table.keys() == sorted(expected)
+    assert table.items() == sorted(expected.items())
+    assert sorted(table.slot_items()) == sorted(expected.items())
+    assert len(table.probe_lengths()) == len(expected)
+    for key, value in expected.items():
+        assert table.lookup(key) == value
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_random_inserts_removes_and_reinserts_match_a_dict(seed):
+    rng = random.Random(seed)
+    table = OpenAddressingHashTable(initial_cap=2)
+    expected = {}
+    capacities = set()
+    for step in range(3000):
+        key = rng.randrange(400)
+        action = rng.random()
+        if action < 0.5:
+            table.insert(key, step)
+            expected[key] = step
+        elif action < 0.8:
+            assert table.remove(key) == (key in expected)
+            expected.pop(key, None)
+        else:
+            assert table.lookup(key) == expected.get(key)
+        capacities.add(len(table.keys_array))
+        if step % 250 == 0:
+            assert_same(table, expected)
+    assert_same(table, expected)
+    # the table grew through several resizes while keys were being removed & re-inserted
+    assert len(capacities) >= 3
+
+
+def test_removed_keys_are_found_again_after_a_resize():
+    table = OpenAddressingHashTable(initial_cap=4)
+    expected = {}
+    for key in range(100):
+        table.insert(key, str(key))
+        expected[key] = str(key)
+    for key in range(0, 100, 2):
+        assert table.remove(key)
+        del expected[key]
+    capacity = len(table.keys_array)
+    for key in range(100, 300):
+        table.insert(key, str(key))
+        expected[key] = str(key)
+    assert len(table.keys_array) > capacity
+    for key in range(0, 100, 2):
+        assert table.lookup(key) is None
+        table.insert(key, 'again')
+        expected[key] = 'again'
+    assert_same(table, expected)
+
+
+def test_tombstones_do_not_grow_the_table():
+    table = OpenAddressingHashTable()
+    for key in range(10000):
+        table.insert(key, key)
+        assert table.remove(key)
+    assert len(table) == 0
+    assert len(table.keys_array) == 16
+    assert table.lookup(9999) is None
+
+
+def test_sequential_keys_spread_without_long_probes():
+    table = OpenAddressingHashTable()
+    for key in range(1, 10001):
+        table.insert(key, key)
+    slots = len(table.keys_array)
+    assert all(0 <= table.hash_key(key) < slots for key in range(1, 10001))
+    assert max(table.probe_lengths()) <= 3
+    assert len(table) <= slots * table.max_load
+
+
+def test_keys_may_be_numeric_strings_but_not_negative():
+    table = OpenAddressingHashTable()
+    table.insert('12', 'twelve')
+    assert table.lookup(12) == table.lookup('12') == 'twelve'
+    with pytest.raises(ValueError):
+        table.insert(-1, 'negative')
+
+
+def test_update_sets_the_delivery_status_column():
+    table = OpenAddressingHashTable()
+    table.insert(7, ['7', 'street', 'city', 'state', 'zip', 'EOD', '1', '', 'At hub'])
+    assert table.update(7, 'Delivered')
+    assert table.lookup(7)[8] == 'Delivered'
+    assert table.update(8, 'Delivered') is None
@@ -0,0 +1,33 @@
+# Run from the repository root: python -m pytest tests
+
+import Ingest
+import os
+
+
+# writes a 2-location distance CSV to path whose one distance is miles, with the passed-in modification time
+def write_table(path, miles, mtime_ns):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', newline='') as table:
+        table.write('address,hub,stop\nHub,0,{0}\nStop,{0},0\n'.format(miles))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_same_named_sources_in_different_directories_get_separate_caches(tmp_path):
+    first, second = str(tmp_path / 'east' / 'table.csv'), str(tmp_path / 'west' / 'table.csv')
+    write_table(first, 1.5, 10 ** 18)
+    write_table(second, 2.5, 10 ** 18)
+    cache_dir = str(tmp_path / 'cache')
+    assert Ingest.load_distance_table(first, cache_dir)[1][0, 1] == 1.5
+    assert Ingest.load_distance_table(second, cache_dir)[1][0, 1] == 2.5
+    assert Ingest.load_distance_table(first, cache_dir)[1][0, 1] == 1.5
+
+
+def test_cache_is_reused_while_the_source_is_unchanged(tmp_path):
+    source, cache_dir = str(tmp_path / 'table.csv'), str(tmp_path / 'cache')
+    write_table(source, 1.5, 10 ** 18)
+    Ingest.load_distance_table(source, cache_dir)
+    data_path, meta_path = Ingest.cache_paths(source, cache_dir, '.npy')
+    assert Ingest.read_fresh_metadata(source, data_path, meta_path)['source'] == os.path.abspath(source)
+    write_table(source, 3.5, 10 ** 18 + 1)
+    assert Ingest.read_fresh_metadata(source, data_path, meta_path) is None
+    assert Ingest.load_distance_table(source, cache_dir)[1][0, 1] == 3.5
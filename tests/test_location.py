@@ -0,0 +1,46 @@
+# Run from the repository root: python -m pytest tests
+
+import Fleet
+import Ingest
+import Location
+import Package
+from Network import DeliveryNetwork
+from Simulation import EventLog
+from Truck import Truck
+
+
+# the sample day's package rows with package 4's street changed to one missing from the distance table
+def unmatched_rows():
+    rows = [list(row) for row in Ingest.load_package_rows()]
+    rows[3][1] = '999 Nowhere Ln'
+    return [tuple(row) for row in rows]
+
+
+def test_unmatched_street_is_left_out_of_the_index():
+    descriptions, distance_matrix = Ingest.load_distance_table()
+    loc_table = Location.create_location_table(descriptions, distance_matrix)
+    index = Location.create_loc_package_index(loc_table, Package.create_package_table(unmatched_rows()))
+    assert 4 not in index.location_of
+    assert index.locations_of({4}) == set()
+    assert index.location_groups({4, 40}) == index.packages_at[index.location_of[40]]
+
+
+def test_day_plans_around_an_unmatched_street():
+    network = DeliveryNetwork(package_rows=unmatched_rows())
+    event_log = EventLog()
+    loaded = set()
+    for name, departure in (('Truck 1', '08:00:01'), ('Truck 3', '09:05:01'), ('Truck 2', '10:05:01')):
+        truck = Truck(name, departure, network, seed=7)
+        truck.create_route()
+        truck.deliver_packages(event_log)
+        loaded |= truck.load
+    assert 4 not in loaded
+    assert network.package_store.status_text(4) == 'At hub'
+    assert len(loaded) == len(network.package_store.ids) - 1
+
+
+def test_fleet_reports_an_unmatched_street_as_unassigned():
+    network = DeliveryNetwork(package_rows=unmatched_rows())
+    trucks = [Truck(name, departure, network, seed=7)
+              for name, departure in (('Truck 1', '08:00:01'), ('Truck 3', '09:05:01'), ('Truck 2', '10:05:01'))]
+    assert Fleet.FleetPlanner(trucks, seed=7).plan() == {4}
@@ -0,0 +1,70 @@
+# Run from the repository root: python -m pytest tests
+
+from Package import NOT_DELIVERED, SNAPSHOT_COLUMNS, PackageStatus
+import Ingest
+import Package
+import csv
+import json
+import pytest
+import random
+
+
+# returns the sample day's (package hashtable, package store)
+def sample_packages():
+    package_table = Package.create_package_table(Ingest.load_package_rows())
+    return package_table, Package.create_package_store(package_table)
+
+
+# gives random packages random statuses through update_many and returns {package ID: (status, minute)} as set
+def random_statuses(package_store, seed):
+    rng = random.Random(seed)
+    expected = {package_id: (PackageStatus.AT_HUB, NOT_DELIVERED) for package_id in package_store.ids}
+    for _ in range(20):
+        package_ids = rng.sample(list(package_store.ids), rng.randrange(1, 10))
+        status = rng.choice(list(PackageStatus))
+        minute = rng.randrange(480, 1020) + rng.choice((0.0, 0.5))
+        package_store.update_many(package_ids, status, minute)
+        for package_id in package_ids:
+            expected[package_id] = status, minute if status == PackageStatus.DELIVERED else NOT_DELIVERED
+    return expected
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_update_many_sets_statuses_and_delivery_times(seed):
+    package_table, package_store = sample_packages()
+    expected = random_statuses(package_store, seed)
+    for package_id, (status, minute) in expected.items():
+        row = package_store.index[package_id]
+        assert package_store.statuses[row] == status
+        assert package_store.delivered_at[row] == minute
+    for status in PackageStatus:
+        assert package_store.with_status(status) == {package_id for package_id, (package_status, minute)
+                                                     in expected.items() if package_status == status}
+    package_store.reset()
+    assert package_store.with_status(PackageStatus.AT_HUB) == set(package_store.ids)
+    assert set(package_store.delivered_at) == {NOT_DELIVERED}
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.jsonl'])
+def test_snapshot_holds_every_package_and_its_live_status(tmp_path, extension):
+    package_table, package_store = sample_packages()
+    random_statuses(package_store, 0)
+    path = str(tmp_path / ('snapshot' + extension))
+    assert Package.write_snapshot(path, package_table, package_store) == len(package_store.ids)
+    with open(path, newline='') as snapshot_file:
+        if extension == '.jsonl':
+            rows = [json.loads(line) for line in snapshot_file]
+        else:
+            reader = csv.reader(snapshot_file)
+            assert tuple(next(reader)) == SNAPSHOT_COLUMNS
+            rows = [dict(zip(SNAPSHOT_COLUMNS, row)) for row in reader]
+    assert sorted(int(row['id']) for row in rows) == sorted(package_store.ids)
+    for row in rows:
+        package_id = int(row['id'])
+        p_info = package_table.lookup(package_id)
+        assert [row[column] for column in SNAPSHOT_COLUMNS[1:8]] == [str(value) for value in p_info[1:8]]
+        assert row['status'] == package_store.status_text(package_id)
+        if package_store.statuses[package_store.index[package_id]] == PackageStatus.DELIVERED:
+            assert row['status'] == 'Delivered at ' + row['delivered_at']
+        else:
+            assert row['delivered_at'] == ''
@@ -0,0 +1,154 @@
+# Run from the repository root: python -m pytest tests
+
+import Route
+import itertools
+import numpy
+import pytest
+
+
+# returns a random symmetric distance matrix over size locations, location 0 being the hub
+def random_matrix(rng, size):
+    points = rng.random((size, 2)) * 10
+    return numpy.sqrt(((points[:, None] - points[None]) ** 2).sum(axis=2))
+
+
+# returns the minute each stop of cycle(the tour without its return to the hub) is reached, the hub's return last
+def arrival_times(distance_matrix, cycle, depart, minutes_per_mile):
+    path = list(cycle) + [cycle[0]]
+    return depart + numpy.cumsum([0.0] + [distance_matrix[a, b] for a, b in zip(path, path[1:])]) * minutes_per_mile
+
+
+# returns whether every stop of cycle is reached by its deadline
+def on_time(distance_matrix, deadlines, cycle, depart, minutes_per_mile):
+    arrivals = arrival_times(distance_matrix, cycle, depart, minutes_per_mile)[1:-1]
+    return bool((arrivals <= deadlines[list(cycle[1:])] + 1e-9).all())
+
+
+# Returns (distance matrix, deadlines, cycle, windows) for a random tour of size locations driven from minute 480 at
+# 3 minutes per mile. Every stop is on time, about half of them with little slack, the rest without a deadline.
+def timed_tour(seed, size):
+    rng = numpy.random.default_rng(seed)
+    distance_matrix = random_matrix(rng, size)
+    cycle = [0] + [int(loc) for loc in rng.permutation(numpy.arange(1, size))]
+    arrivals = arrival_times(distance_matrix, cycle, 480.0, 3.0)
+    deadlines = numpy.full(size, numpy.inf)
+    for position, loc in enumerate(cycle[1:], 1):
+        if rng.random() < 0.5:
+            deadlines[loc] = arrivals[position] + rng.random() * 10
+    windows = Route.TimeWindows(distance_matrix, deadlines, 480.0, 3.0)
+    windows.rebuild(cycle)
+    return distance_matrix, deadlines, cycle, windows
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_two_opt_feasible_matches_simulated_arrivals(seed):
+    distance_matrix, deadlines, cycle, windows = timed_tour(seed, 9)
+    for lo in range(1, len(cycle)):
+        for hi in range(lo + 1, len(cycle)):
+            moved = cycle[:lo] + cycle[lo:hi + 1][::-1] + cycle[hi + 1:]
+            assert windows.two_opt_feasible(lo, hi) == on_time(distance_matrix, deadlines, moved, 480.0, 3.0)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_or_opt_feasible_matches_simulated_arrivals(seed):
+    distance_matrix, deadlines, cycle, windows = timed_tour(seed, 9)
+    n = len(cycle)
+    for s in range(1, n):
+        for e in range(s, min(s + 3, n)):
+            for x in range(n):
+                if s - 1 <= x <= e:
+                    continue
+                for reverse in (False, True):
+                    segment = cycle[s:e + 1][::-1] if reverse else cycle[s:e + 1]
+                    rest = cycle[:s] + cycle[e + 1:]
+                    insert_at = rest.index(cycle[x]) + 1
+                    moved = rest[:insert_at] + segment + rest[insert_at:]
+                    assert windows.or_opt_feasible(s, e, x, reverse) == \
+                        on_time(distance_matrix, deadlines, moved, 480.0, 3.0)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_improve_route_with_windows_keeps_every_stop_on_time(seed):
+    distance_matrix, deadlines, cycle, windows = timed_tour(seed, 30)
+    tour = Route.improve_route(distance_matrix, cycle + [0], time_budget=5.0, windows=windows)
+    assert sorted(tour[:-1]) == sorted(cycle) and tour[0] == tour[-1] == 0
+    assert on_time(distance_matrix, deadlines, tour[:-1], 480.0, 3.0)
+    assert Route.tour_distance(distance_matrix, tour) <= Route.tour_distance(distance_matrix, cycle + [0]) + 1e-9
+
+
+# returns a random symmetric matrix of small whole-number distances over size locations, so most rows hold ties
+def tied_matrix(rng, size):
+    distance_matrix = rng.integers(1, 4, (size, size)).astype(float)
+    distance_matrix = numpy.minimum(distance_matrix, distance_matrix.T)
+    numpy.fill_diagonal(distance_matrix, 0.0)
+    return distance_matrix
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('neighbor_count', [1, 3, 8, 25])
+def test_nearest_unvisited_matches_a_full_scan(seed, neighbor_count):
+    rng = numpy.random.default_rng(seed)
+    distance_matrix = tied_matrix(rng, 25)
+    nearest_neighbors = Route.nearest_neighbor_lists(distance_matrix, neighbor_count)
+    unvisited = rng.random((40, 25)) < rng.random((40, 1))
+    current_locs = rng.integers(0, 25, 40)
+    unvisited[numpy.arange(40), current_locs] = False
+    active = unvisited.any(axis=1)
+    next_locs, step_distances = Route.nearest_unvisited(distance_matrix, nearest_neighbors, unvisited, current_locs,
+                                                        active)
+    scanned = numpy.where(unvisited, distance_matrix[current_locs], numpy.inf)
+    assert (next_locs[active] == numpy.argmin(scanned, axis=1)[active]).all()
+    assert (step_distances[active] == scanned.min(axis=1)[active]).all()
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('neighbor_count', [1, 4, 30])
+def test_batch_nearest_neighbor_tours_match_with_neighbor_lists(seed, neighbor_count):
+    rng = numpy.random.default_rng(seed)
+    distance_matrix = tied_matrix(rng, 30)
+    stop_masks = rng.random((50, 30)) < 0.5
+    distances, tours = Route.batch_nearest_neighbor(distance_matrix, stop_masks)
+    listed_distances, listed_tours = Route.batch_nearest_neighbor(
+        distance_matrix, stop_masks, Route.nearest_neighbor_lists(distance_matrix, neighbor_count))
+    assert (listed_distances == distances).all()
+    assert all((listed == tour).all() for listed, tour in zip(listed_tours, tours))
+
+
+# returns (distance, tour) for the shortest tour through stops found by trying every order, keeping each stop's
+# deadline when deadlines is given, or None if no order does
+def brute_force_tour(distance_matrix, stops, deadlines, depart, minutes_per_mile):
+    best = None
+    for order in itertools.permutations(stops):
+        cycle = [0] + list(order)
+        if deadlines is not None and not on_time(distance_matrix, deadlines, cycle, depart, minutes_per_mile):
+            continue
+        distance = Route.tour_distance(distance_matrix, cycle + [0])
+        if best is None or distance < best[0]:
+            best = distance, cycle + [0]
+    return best
+
+
+@pytest.mark.parametrize('seed', range(40))
+@pytest.mark.parametrize('timed', [False, True])
+def test_held_karp_matches_every_permutation(seed, timed):
+    rng = numpy.random.default_rng(seed)
+    distance_matrix = random_matrix(rng, 10)
+    stops = [int(loc) for loc in rng.choice(numpy.arange(1, 10), int(rng.integers(0, 8)), replace=False)]
+    deadlines = rng.random(10) * 120 + 480 if timed else None
+    best = brute_force_tour(distance_matrix, stops, deadlines, 480.0, 3.0)
+    exact = Route.held_karp(distance_matrix, stops, deadlines, 480.0, 3.0)
+    if best is None:
+        assert exact is None
+        return
+    distance, tour = exact
+    assert distance == pytest.approx(best[0])
+    assert Route.tour_distance(distance_matrix, tour) == pytest.approx(distance)
+    assert tour[0] == tour[-1] == 0 and sorted(tour[1:-1]) == sorted(stops)
+    if timed:
+        assert on_time(distance_matrix, deadlines, tour[:-1], 480.0, 3.0)
+
+
+def test_held_karp_rejects_more_than_the_stop_limit():
+    distance_matrix = random_matrix(numpy.random.default_rng(0), Route.EXACT_STOP_LIMIT + 2)
+    with pytest.raises(ValueError):
+        Route.held_karp(distance_matrix, range(1, Route.EXACT_STOP_LIMIT + 2))
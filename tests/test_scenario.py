@@ -0,0 +1,17 @@
+# Run from the repository root: python -m pytest tests
+
+import Scenario
+import pytest
+
+
+@pytest.mark.parametrize('settings', [{'speed': 'fast'}, {'speed': 0}, {'capacity': 2.5}, {'candidates': True},
+                                      {'exact_stops': '9'}, {'exact_stops': 21}, {'budget': -1}, {'seed': 1.5},
+                                      {'cluster_size': 0}, {'departures': '08:00:01'}, {'check_times': [1030]}])
+def test_settings_of_the_wrong_type_are_rejected(settings):
+    with pytest.raises(ValueError):
+        Scenario.complete_scenario(settings, 'bad')
+
+
+def test_missing_settings_take_the_defaults():
+    scenario = Scenario.complete_scenario({'speed': 25, 'seed': None}, 'fast')
+    assert scenario == dict(Scenario.DEFAULTS, name='fast', speed=25, seed=None)
@@ -0,0 +1,80 @@
+# Run from the repository root: python -m pytest tests
+
+from Simulation import EventLog
+import datetime
+import random
+import pytest
+
+START = datetime.datetime(2026, 1, 5, 8, 0)
+
+
+# returns a log of two trucks' days recorded out of time order, and the events in the order they were recorded
+def random_log(seed):
+    rng = random.Random(seed)
+    recorded = []
+    for truck, depart in (('Truck 2', 65), ('Truck 1', 0)):
+        clock, miles = depart, 0.0
+        recorded.append((START + datetime.timedelta(minutes=clock), 'depart', truck, 0, None, miles))
+        packages = rng.sample(range(1, 41), 8) if truck == 'Truck 1' else rng.sample(range(41, 81), 8)
+        for package_id in packages:
+            recorded.append((START + datetime.timedelta(minutes=clock), 'load', truck, 0, package_id, miles))
+        for package_id in packages:
+            # some stops are reached at the same minute as the previous one
+            clock += rng.choice((0, 3, 7))
+            miles += rng.random() * 2
+            location = rng.randrange(1, 27)
+            recorded.append((START + datetime.timedelta(minutes=clock), 'arrive', truck, location, None, miles))
+            recorded.append((START + datetime.timedelta(minutes=clock), 'deliver', truck, location, package_id, miles))
+        clock += 10
+        miles += 3.0
+        recorded.append((START + datetime.timedelta(minutes=clock), 'return', truck, 0, None, miles))
+    log = EventLog()
+    for event in recorded:
+        log.record(*event)
+    return log, recorded
+
+
+# the package's status at when, found by scanning every recorded event
+def scanned_status(recorded, package_id, when):
+    status = 'At hub'
+    for time, kind, truck, location, event_package_id, miles in sorted(recorded, key=lambda event: event[0]):
+        if event_package_id == package_id and time <= when:
+            status = 'In route to destination' if kind == 'load' else 'Delivered at ' + time.strftime('%H:%M:%S')
+    return status
+
+
+# the truck's (tour, miles, finished) at when, found by scanning every recorded event
+def scanned_truck(recorded, truck, when):
+    past = [event for event in sorted(recorded, key=lambda event: event[0])
+            if event[2] == truck and event[0] <= when and event[1] in ('depart', 'arrive', 'return')]
+    if not past:
+        return None
+    return [0] + [event[3] for event in past if event[1] != 'depart'], past[-1][5], past[-1][1] == 'return'
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_queries_match_a_scan_of_every_event(seed):
+    log, recorded = random_log(seed)
+    for minute in range(-5, 200, 1):
+        when = START + datetime.timedelta(minutes=minute)
+        assert [tuple(event) for event in log.events_until(when)] == \
+            sorted((event for event in recorded if event[0] <= when), key=lambda event: event[0])
+        for package_id in range(1, 81):
+            assert log.status_as_of(package_id, when) == scanned_status(recorded, package_id, when)
+        for truck in ('Truck 1', 'Truck 2', 'Truck 3'):
+            assert log.truck_as_of(truck, when) == scanned_truck(recorded, truck, when)
+
+
+def test_events_recorded_after_a_query_are_indexed():
+    log = EventLog()
+    log.record(START, 'depart', 'Truck 1', 0)
+    log.record(START, 'load', 'Truck 1', 0, 5)
+    assert log.status_as_of(5, START) == 'In route to destination'
+    assert log.truck_as_of('Truck 1', START) == ([0], 0.0, False)
+    later = START + datetime.timedelta(minutes=30)
+    log.record(later, 'arrive', 'Truck 1', 4, miles=9.0)
+    log.record(later, 'deliver', 'Truck 1', 4, 5, 9.0)
+    assert log.status_as_of(5, later) == 'Delivered at 08:30:00'
+    assert log.status_as_of(5, later - datetime.timedelta(seconds=1)) == 'In route to destination'
+    assert log.truck_as_of('Truck 1', later) == ([0, 4], 9.0, False)
+    assert len(log.events_until(later)) == 4